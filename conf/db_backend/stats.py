@@ -0,0 +1,55 @@
+import threading
+
+# =========================================================
+# DB 연결 통계
+# 설명: conf.db_backend의 지속 연결 백엔드가 기록하는 프로세스 단위 카운터입니다.
+#       MySQL 드라이버 없이도 import할 수 있도록 백엔드와 분리해 두었습니다. (운영 API / 테스트용)
+# =========================================================
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.in_use = 0
+        self.connects = 0
+        self.reuses = 0
+        self.closes = 0
+        self.health_checks = 0
+        self.health_check_failures = 0
+        self.connect_seconds = 0.0
+        self.max_connect_seconds = 0.0
+
+    def add(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def record_connect(self, seconds):
+        with self._lock:
+            self.open += 1
+            self.connects += 1
+            self.connect_seconds += seconds
+            self.max_connect_seconds = max(self.max_connect_seconds, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            acquired = self.connects + self.reuses
+            return {
+                "open": self.open,
+                "in_use": self.in_use,
+                "idle": self.open - self.in_use,
+                "connects": self.connects,
+                "reuses": self.reuses,
+                "closes": self.closes,
+                "reuse_ratio": round(self.reuses / acquired, 3) if acquired else 0.0,
+                "health_checks": self.health_checks,
+                "health_check_failures": self.health_check_failures,
+                # 연결 대기 시간 = 새 연결의 TCP + 인증 핸드셰이크 시간 (재사용이면 0)
+                "avg_wait_ms": round(self.connect_seconds / acquired * 1000, 2) if acquired else 0.0,
+                "avg_connect_ms": round(self.connect_seconds / self.connects * 1000, 2) if self.connects else 0.0,
+                "max_connect_ms": round(self.max_connect_seconds * 1000, 2),
+            }
+
+
+pool_stats = PoolStats()
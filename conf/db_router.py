@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+
+from django.conf import settings
+
+# =========================================================
+# 카탈로그 읽기 전용 복제본 라우터
+# 설명: 향수/옷 카탈로그 테이블은 import 때만 바뀌는 작은 테이블이므로,
+#       배포 시 export_catalog_replica 커맨드로 컨테이너 안의 SQLite 파일에 복사해 두고
+#       서빙 프로세스의 카탈로그 읽기는 네트워크 없이 그 파일에서 합니다.
+#       - 쓰기(사용자/점수/피드백 포함)와 나머지 읽기는 모두 MySQL(default)
+#       - 복제본 버전이 MySQL의 카탈로그 버전과 다르면(import 이후) MySQL에서 읽음
+#       - 관리 커맨드는 항상 MySQL을 봅니다. (wsgi.py에서 enable_catalog_replica()를 부른 서빙 프로세스만 사용)
+# =========================================================
+REPLICA_ALIAS = "catalog"
+
+CATALOG_TABLES = frozenset({
+    "perfume", "perfume_season", "perfume_classification", "perfume_color",
+    "clothes_color", "상의_하의", "원피스", "perfume_feature",
+})
+
+# 복제본 버전 확인 간격 (초)
+STALENESS_CHECK_INTERVAL = 30.0
+
+_enabled = False
+_fresh = False
+_last_checked = 0.0
+_lock = threading.Lock()
+
+
+def is_catalog_model(model):
+    return model._meta.db_table in CATALOG_TABLES
+
+
+def enable_catalog_replica():
+    """서빙 프로세스 시작 시 호출. 복제본 파일이 있으면 카탈로그 읽기를 복제본으로 보냅니다."""
+    global _enabled, _last_checked
+
+    path = settings.CATALOG_REPLICA_PATH
+    if not os.path.exists(path):
+        print(f"ℹ️ [CatalogReplica] 복제본 없음 ({path}) → 카탈로그도 MySQL에서 읽습니다.")
+        return False
+    _enabled = True
+    _last_checked = 0.0
+    return is_replica_fresh()
+
+
+def disable_catalog_replica(reason):
+    global _enabled
+    if _enabled:
+        print(f"⚠️ [CatalogReplica] 복제본 사용 중지: {reason}")
+    _enabled = False
+
+
+def is_replica_fresh():
+    """복제본 버전 == MySQL 카탈로그 버전인지 (STALENESS_CHECK_INTERVAL마다 한 번만 확인)"""
+    global _fresh, _last_checked
+
+    if not _enabled:
+        return False
+    if time.monotonic() - _last_checked < STALENESS_CHECK_INTERVAL:
+        return _fresh
+
+    with _lock:
+        now = time.monotonic()
+        if now - _last_checked < STALENESS_CHECK_INTERVAL:
+            return _fresh
+
+        from django.db import connections
+        from ui.recommend.catalog import current_catalog_version
+
+        try:
+            primary = current_catalog_version()
+            replica = current_catalog_version(using=REPLICA_ALIAS)
+        except Exception as e:
+            disable_catalog_replica(f"버전 확인 실패 ({e})")
+            return False
+
+        fresh = primary == replica
+        if fresh != _fresh:
+            state = "사용" if fresh else "오래됨 → MySQL에서 읽음"
+            print(f"📚 [CatalogReplica] 복제본 v{replica} / MySQL v{primary}: {state}")
+        if not fresh:
+            # 파일이 다시 export되면 다음 확인 때 새 파일을 열도록 현재 연결을 닫습니다.
+            connections[REPLICA_ALIAS].close()
+        _fresh = fresh
+        _last_checked = now
+        return fresh
+
+
+class CatalogReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not is_catalog_model(model):
+            return None
+        return REPLICA_ALIAS if is_replica_fresh() else "default"
+
+    def db_for_write(self, model, **hints):
+        # 복제본에서 읽은 객체의 관계 매니저로 만든 행도 항상 MySQL에 씁니다.
+        if is_catalog_model(model):
+            # 관리자/API가 카탈로그를 직접 고치면 이 프로세스의 복제본은 더 이상 맞지 않습니다.
+            disable_catalog_replica(f"{model._meta.db_table} 쓰기 발생")
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 복제본은 MySQL 카탈로그의 복사본이므로 두 DB 객체 사이의 관계를 허용합니다.
+        return {obj1._state.db, obj2._state.db} <= {"default", REPLICA_ALIAS}
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == REPLICA_ALIAS:
+            return False
+        return None
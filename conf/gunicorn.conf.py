@@ -0,0 +1,13 @@
+# =========================================================
+# gunicorn 설정 (Dockerfile CMD에서 -c로 지정)
+# 설명: --preload 마스터에서 앱을 로드한 뒤 fork된 각 워커가 자기 DB 연결을 미리 엽니다.
+# =========================================================
+
+
+def post_fork(server, worker):
+    try:
+        from conf.db_backend.base import prewarm_connections
+        prewarm_connections()
+    except Exception as e:
+        # DB가 아직 준비되지 않았으면 첫 요청에서 연결합니다.
+        print(f"⚠️ [DB] 연결 pre-warm 실패 (첫 요청 시 연결): {e}")
@@ -60,15 +60,34 @@ WSGI_APPLICATION = "conf.wsgi.application"
 # 3. Database 설정 (도커 환경 대응)
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        # MySQL 백엔드 + 연결 통계 (conf/db_backend/base.py)
+        'ENGINE': 'conf.db_backend',
         'NAME': os.getenv('DB_NAME', 'perfume'),
         'USER': os.getenv('DB_USER'),
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST'), # 여기서 .env의 RDS 주소를 읽음
         'PORT': '3306',
+        # 지속 연결: 요청마다 RDS에 TCP + 인증 핸드셰이크를 하지 않고 워커 스레드의 연결을 재사용
+        # (RDS wait_timeout보다 짧게 유지, 0이면 요청마다 새 연결)
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '600')),
+        # 재사용 전 ping으로 끊긴 연결(RDS 재시작, 페일오버 등)을 걸러냄
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', '5')),
+        },
     }
 }
 
+# 카탈로그 읽기 전용 복제본 (export_catalog_replica 커맨드가 배포 시 생성, conf/db_router.py 참고)
+# 서빙 프로세스의 향수/옷 카탈로그 읽기는 이 파일에서, 나머지 읽기와 모든 쓰기는 MySQL에서 합니다.
+CATALOG_REPLICA_PATH = os.getenv('CATALOG_REPLICA_PATH', os.path.join(BASE_DIR, 'catalog_replica.sqlite3'))
+DATABASES['catalog'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': f"file:{CATALOG_REPLICA_PATH}?mode=ro",  # 읽기 전용으로 열기
+    'CONN_MAX_AGE': None,
+}
+DATABASE_ROUTERS = ['conf.db_router.CatalogReplicaRouter']
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -14,3 +14,23 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "conf.settings")
 
 application = get_wsgi_application()
+
+# 서빙 프로세스 warm-up: gunicorn --preload면 마스터에서 한 번 로드하고 워커들이 fork로 공유합니다.
+# (관리 커맨드는 wsgi를 거치지 않으므로 모델을 읽지 않습니다)
+try:
+    from ui.recommend.model_registry import style_models
+    style_models.warm_up()
+except Exception as e:
+    print(f"⚠️ [ModelRegistry] warm-up 실패 (첫 요청 시 다시 로드): {e}")
+
+# 카탈로그 복제본(SQLite)이 있으면 카탈로그 읽기를 복제본으로 보냅니다. (버전이 MySQL과 같을 때만)
+try:
+    from conf.db_router import enable_catalog_replica
+    enable_catalog_replica()
+except Exception as e:
+    print(f"⚠️ [CatalogReplica] 복제본 사용 설정 실패 (MySQL에서 읽음): {e}")
+
+# --preload 마스터에서 열린 DB 연결이 있으면 fork 전에 닫습니다. (워커끼리 소켓을 공유하지 않도록)
+# 워커별 연결은 gunicorn post_fork 훅(conf/gunicorn.conf.py)에서 미리 엽니다.
+from django.db import connections
+connections.close_all()
@@ -9,6 +9,8 @@ from django.conf import settings
 from django.templatetags.static import static
 from django.utils.safestring import mark_safe
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
 from django.db.models import Q
 
 # DRF(Django REST Framework) 관련 임포트
@@ -17,6 +19,7 @@ from rest_framework import viewsets, filters, status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework.permissions import IsAdminUser
 
 # 모델 및 시리얼라이저 임포트
 from .models import (
@@ -43,8 +46,16 @@ from ui.models import Score, Perfume, TopBottom, Dress
 
 
 # from .recommend.calculation_v3 import myscore_cal #ver3 style score 수정
-from .recommend.calculation_v4 import myscore_cal  # ver4
+from .recommend.calculation_v4 import (  # ver4
+    myscore_cal_cached, recommendation_state, latest_weight_id, DEFAULT_TOP_K, MAX_TOP_K
+)
+from .recommend.result_cache import outfit_signature
 from .recommend.weight_cal import find_best_weights  # 가중치 update
+from .recommend.catalog import get_catalog
+from .recommend.score_store import write_scores
+from .results import store_result, resolve_result, resolve_user_id
+from .search import get_search_index
+from .sequences import next_id, SMELLING_USER_SEQUENCE, MY_NOTE_SESSION_KEY
 
 from django.db import transaction
 from rest_framework.renderers import JSONRenderer
@@ -257,6 +268,36 @@ from .serializers import UserInputSerializer
 from ui.models import UserInfo, Score, TopBottom, Dress, ClothesColor
 
 
+# =========================================================
+# [기능] 계산은 트랜잭션 밖, 저장은 짧은 atomic 블록
+# 설명: 스타일 예측/점수 계산은 DB 트랜잭션 없이 먼저 하고, 저장 직전에 prepare_write로
+#       입력이 그대로인지 확인합니다. prepare_write가 None을 돌려주면(사용자 코디나 가중치가 바뀜)
+#       load_user()로 최신 입력을 다시 읽어 재계산합니다. 마지막 시도는 확인 없이 저장합니다.
+# =========================================================
+SCORE_WRITE_ATTEMPTS = 3
+
+
+def score_and_write(load_user, k, prepare_write, require_scores=False):
+    for attempt in range(1, SCORE_WRITE_ATTEMPTS + 1):
+        user_row = load_user()
+        state = recommendation_state()
+        scores = myscore_cal_cached(user_row, k=k, state=state)
+        if require_scores and not scores:
+            # 결과가 비면 기존 Score를 건드리지 않습니다.
+            return user_row, scores, None
+
+        with transaction.atomic():
+            target = prepare_write(user_row, state, force=attempt == SCORE_WRITE_ATTEMPTS)
+            if target is None:
+                print(f"🔁 [재계산] 입력이 바뀌어 다시 계산합니다. ({attempt}/{SCORE_WRITE_ATTEMPTS})")
+                continue
+
+            for s in scores:
+                s.user = target  # 새로 저장된 UserInfo면 user_id를 다시 채웁니다.
+            report = write_scores({target.user_id: scores})
+        return target, scores, report
+
+
 class UserInputView(APIView):
     """
     [기능]
@@ -305,85 +346,102 @@ class UserInputView(APIView):
             user_bottom_obj = None
             user_dress_obj = None
 
-            with transaction.atomic():
-                # --- [A] 투피스(상의+하의) 검사 (기존 로직 유지) ---
-                if data.get('top') and data.get('bottom'):
-                    top_color_kr = map_color.get(data.get('top_color'))
-                    bottom_color_kr = map_color.get(data.get('bottom_color'))
-
-                    # 색상 객체 조회
-                    top_color_obj = ClothesColor.objects.get(color=top_color_kr)
-                    bottom_color_obj = ClothesColor.objects.get(color=bottom_color_kr)
-
-                    # [Strict] DB에서 해당 카테고리와 색상을 가진 상의가 있는지 찾기
-                    top_cat_kr = map_item.get(data['top'])
-                    user_top_obj = TopBottom.objects.filter(
-                        top_category=top_cat_kr,
-                        top_color=top_color_obj
-                    ).first()
-
-                    # [Strict] DB에서 해당 카테고리와 색상을 가진 하의가 있는지 찾기
-                    bottom_cat_kr = map_item.get(data['bottom'])
-                    user_bottom_obj = TopBottom.objects.filter(
-                        bottom_category=bottom_cat_kr,
-                        bottom_color=bottom_color_obj
-                    ).first()
-
-                    # 데이터가 없으면 에러 발생
-                    if not user_top_obj or not user_bottom_obj:
-                        missing = []
-                        if not user_top_obj: missing.append(f"상의({top_cat_kr}-{top_color_kr})")
-                        if not user_bottom_obj: missing.append(f"하의({bottom_cat_kr}-{bottom_color_kr})")
-                        raise ValueError(f"❌ [데이터 없음] 선택하신 {', '.join(missing)} 데이터가 의류 DB에 존재하지 않습니다.")
-
-                # --- [B] 원피스 검사 (기존 로직 유지) ---
-                elif data.get('onepiece'):
-                    onepiece_color_kr = map_color.get(data.get('onepiece_color'))
-
-                    try:
-                        dress_color_obj = ClothesColor.objects.get(color=onepiece_color_kr)
-                    except ClothesColor.DoesNotExist:
-                        raise ValueError(f" DB에 '{onepiece_color_kr}' 색상 정보가 없습니다.")
-
-                    # 해당 색상의 원피스 데이터 조회
-                    user_dress_obj = Dress.objects.filter(
-                        dress_color=dress_color_obj
-                    ).first()
-
-                    if not user_dress_obj:
-                        raise ValueError(f" [데이터 없음] 현재 DB에 '{onepiece_color_kr}' 색상의 원피스 데이터가 존재하지 않습니다.")
-
-                # --- [C] UserInfo 생성 (기존 필드 유지, recipient/situation은 넣지 않음) ---
-                new_user_info = UserInfo.objects.create(
-                    season=final_season,
-                    disliked_accord=dislikes_str,
-                    top_id=user_top_obj,
-                    bottom_id=user_bottom_obj,
-                    dress_id=user_dress_obj,
-                    top_img=data.get('top_img'),
-                    bottom_img=data.get('bottom_img'),
-                    dress_img=data.get('onepiece_img'),
-                    top_category=map_item.get(data.get('top')),
-                    top_color=map_color.get(data.get('top_color')),
-                    bottom_category=map_item.get(data.get('bottom')),
-                    bottom_color=map_color.get(data.get('bottom_color')),
-                    dress_color=map_color.get(data.get('onepiece_color'))
-                )
+            # 옷 조회 / 스타일 예측 / 점수 계산은 트랜잭션 밖에서 수행합니다.
+            # --- [A] 투피스(상의+하의) 검사 (기존 로직 유지) ---
+            if data.get('top') and data.get('bottom'):
+                top_color_kr = map_color.get(data.get('top_color'))
+                bottom_color_kr = map_color.get(data.get('bottom_color'))
+
+                # 색상 객체 조회
+                top_color_obj = ClothesColor.objects.get(color=top_color_kr)
+                bottom_color_obj = ClothesColor.objects.get(color=bottom_color_kr)
+
+                # [Strict] DB에서 해당 카테고리와 색상을 가진 상의가 있는지 찾기
+                top_cat_kr = map_item.get(data['top'])
+                user_top_obj = TopBottom.objects.filter(
+                    top_category=top_cat_kr,
+                    top_color=top_color_obj
+                ).first()
+
+                # [Strict] DB에서 해당 카테고리와 색상을 가진 하의가 있는지 찾기
+                bottom_cat_kr = map_item.get(data['bottom'])
+                user_bottom_obj = TopBottom.objects.filter(
+                    bottom_category=bottom_cat_kr,
+                    bottom_color=bottom_color_obj
+                ).first()
+
+                # 데이터가 없으면 에러 발생
+                if not user_top_obj or not user_bottom_obj:
+                    missing = []
+                    if not user_top_obj: missing.append(f"상의({top_cat_kr}-{top_color_kr})")
+                    if not user_bottom_obj: missing.append(f"하의({bottom_cat_kr}-{bottom_color_kr})")
+                    raise ValueError(f"❌ [데이터 없음] 선택하신 {', '.join(missing)} 데이터가 의류 DB에 존재하지 않습니다.")
+
+            # --- [B] 원피스 검사 (기존 로직 유지) ---
+            elif data.get('onepiece'):
+                onepiece_color_kr = map_color.get(data.get('onepiece_color'))
 
-                # --- [D] 자동 추천 계산 및 Score 저장 (기존 로직 유지) ---
-                print(f"🔄 [Strict 자동 추천] 사용자 ID: {new_user_info.user_id}")
+                try:
+                    dress_color_obj = ClothesColor.objects.get(color=onepiece_color_kr)
+                except ClothesColor.DoesNotExist:
+                    raise ValueError(f" DB에 '{onepiece_color_kr}' 색상 정보가 없습니다.")
+
+                # 해당 색상의 원피스 데이터 조회
+                user_dress_obj = Dress.objects.filter(
+                    dress_color=dress_color_obj
+                ).first()
+
+                if not user_dress_obj:
+                    raise ValueError(f" [데이터 없음] 현재 DB에 '{onepiece_color_kr}' 색상의 원피스 데이터가 존재하지 않습니다.")
+
+            # --- [C] UserInfo 준비 (기존 필드 유지, recipient/situation은 넣지 않음) ---
+            # 저장은 점수 계산이 끝난 뒤 짧은 트랜잭션에서 Score와 함께 합니다.
+            new_user_info = UserInfo(
+                season=final_season,
+                disliked_accord=dislikes_str,
+                top_id=user_top_obj,
+                bottom_id=user_bottom_obj,
+                dress_id=user_dress_obj,
+                top_img=data.get('top_img'),
+                bottom_img=data.get('bottom_img'),
+                dress_img=data.get('onepiece_img'),
+                top_category=map_item.get(data.get('top')),
+                top_color=map_color.get(data.get('top_color')),
+                bottom_category=map_item.get(data.get('bottom')),
+                bottom_color=map_color.get(data.get('bottom_color')),
+                dress_color=map_color.get(data.get('onepiece_color'))
+            )
 
-                top3_scores = myscore_cal(new_user_info.user_id)
+            def prepare_write(user_row, state, force=False):
+                # 계산 중 가중치가 바뀌었으면 다시 계산, 선택된 옷 행이 삭제됐으면 에러
+                garments_ok = all(
+                    model.objects.filter(pk=obj.pk).exists()
+                    for model, obj in ((TopBottom, user_top_obj), (TopBottom, user_bottom_obj), (Dress, user_dress_obj))
+                    if obj is not None
+                )
+                if not garments_ok:
+                    raise ValueError("❌ [데이터 없음] 선택하신 의류 데이터가 처리 중 삭제되었습니다.")
+                if not force and latest_weight_id() != state[0]:
+                    return None
+                user_row.save()
+                return user_row
+
+            # --- [D] 자동 추천 계산 및 Score 저장 ---
+            print(f"🔄 [Strict 자동 추천] 코디 계산 시작")
+            new_user_info, top3_scores, _ = score_and_write(
+                lambda: new_user_info, data.get('top_k', DEFAULT_TOP_K), prepare_write
+            )
+            print(f"🔄 [Strict 자동 추천] 사용자 ID: {new_user_info.user_id}")
 
-                # 기존 점수 삭제 및 새 점수 저장
-                Score.objects.filter(user=new_user_info).delete()
-                for s in top3_scores:
-                    s.save()
+            # 결과 페이지가 "내" 결과를 찾도록 결과 핸들을 세션에 저장 (페이로드도 미리 캐시)
+            result_handle = store_result(request, new_user_info.user_id)
+            payload = resolve_result(request)
 
             return Response({
                 "message": "코디 저장 및 추천 완료",
                 "user_id": new_user_info.user_id,
-                "top3": [s.perfume.perfume_name for s in top3_scores]
+                "result_handle": result_handle,
+                "top3": [p["perfume_name"] for p in payload["perfumes"][:3]]
             }, status=status.HTTP_201_CREATED)
 
         except ClothesColor.DoesNotExist:
@@ -400,22 +458,11 @@ class UserOutfitAPIView(APIView):
     renderer_classes = [JSONRenderer]
 
     def get(self, request):
-        last_user = UserInfo.objects.last()
-        if not last_user:
+        result = resolve_result(request)
+        if not result:
             return Response({"error": "데이터가 없습니다."}, status=404)
 
-        # 주소가 이미 전체 URL(http로 시작)인지 체크해서 처리합니다.
-        def get_full_url(path):
-            if not path: return None
-            if path.startswith('http'): return path
-            return f"{settings.STATIC_URL}{path}"
-
-        data = {
-            "top_img": get_full_url(last_user.top_img),
-            "bottom_img": get_full_url(last_user.bottom_img),
-            "onepiece_img": get_full_url(last_user.dress_img),
-        }
-        return Response(data, status=200)
+        return Response(result["user_outfit"], status=200)
 
 class ScoreView(APIView):
     def post(self, request):
@@ -430,10 +477,23 @@ class ScoreView(APIView):
 
         try:
             user_id = int(user_id)
-
-            # 1️⃣ 점수 계산 (Top3 Score 객체 반환)
-            score_objects = myscore_cal(user_id)
-            print(" 생성된 Score 객체 수:", len(score_objects))
+            k = min(max(int(request.data.get("k", DEFAULT_TOP_K)), 1), MAX_TOP_K)
+
+            def prepare_write(user_row, state, force=False):
+                # 계산하는 동안 사용자 코디(또는 가중치)가 바뀌었으면 최신 행으로 다시 계산
+                fresh = UserInfo.objects.select_for_update().get(user_id=user_id)
+                if not force and (
+                    outfit_signature(fresh) != outfit_signature(user_row)
+                    or latest_weight_id() != state[0]
+                ):
+                    return None
+                return fresh
+
+            # 1️⃣ 점수 계산 (트랜잭션 밖, 같은 코디 서명이면 캐시 사용) → 2️⃣ 짧은 트랜잭션에서 저장
+            _, score_objects, report = score_and_write(
+                lambda: UserInfo.objects.get(user_id=user_id), k, prepare_write, require_scores=True
+            )
+            print(" 저장된 Top myscore:", [s.myscore for s in score_objects])
 
             if not score_objects:
                 return Response(
@@ -441,24 +501,13 @@ class ScoreView(APIView):
                     status=400
                 )
 
-            print(
-                " 저장될 Top3 myscore:",
-                [s.myscore for s in score_objects]
-            )
-
-            with transaction.atomic():
-                deleted_count, _ = Score.objects.filter(user_id=user_id).delete()
-                print(" 삭제된 기존 score 수:", deleted_count)
-
-                for s in score_objects:
-                    s.save()
-                    print(" 저장됨:", s.user_id, s.perfume_id, s.myscore)
-
             return Response(
                 {
                     "message": "추천 완료",
                     "count": len(score_objects),
                     "top3_myscore": [s.myscore for s in score_objects],
+                    "rows_written": report.rows,
+                    "write_seconds": report.seconds,
                 },
                 status=200
             )
@@ -530,28 +579,27 @@ class RecommendationResultAPIView(APIView):
     renderer_classes = [JSONRenderer]
 
     def get(self, request):
-        last_user = UserInfo.objects.last()
-        results = Score.objects.filter(user=last_user).select_related(
-            'perfume', 'perfume__season'
-        ).order_by('-myscore')
-
-        perfumes_data = []
-        if results.exists():
-            perfume_serializer = RecommendationResultSerializer(results, many=True)
-            perfumes_data = perfume_serializer.data
-
-        # 주소 중복 방지 로직 적용
-        def get_full_url(path):
-            if not path: return None
-            if path.startswith('http'): return path
-            return f"{settings.STATIC_URL}{path}"
+        result = resolve_result(request)
+        if not result:
+            return Response({"user_outfit": {"top_img": None, "bottom_img": None, "onepiece_img": None},
+                             "perfumes": []}, status=200)
+
+        perfumes_data = [
+            {
+                "perfume_id": p["perfume_id"],
+                "perfume_name": p["perfume_name"],
+                "brand": p["brand"],
+                "gender": p["gender"],
+                # 소수점 셋째 자리까지 반올림
+                "myscore": round(float(p["myscore"]), 3),
+                "top_season": p["top_season"],
+                "accords": p["accords"],
+            }
+            for p in result["perfumes"]
+        ]
 
         response_data = {
-            "user_outfit": {
-                "top_img": get_full_url(last_user.top_img) if last_user else None,
-                "bottom_img": get_full_url(last_user.bottom_img) if last_user else None,
-                "onepiece_img": get_full_url(last_user.dress_img) if last_user else None,
-            },
+            "user_outfit": result["user_outfit"],
             "perfumes": perfumes_data
         }
         return Response(response_data, status=200)
@@ -559,68 +607,94 @@ class RecommendationResultAPIView(APIView):
 
 # 향수 이미지 api
 
-# class PerfumeTop3ImageAPI(APIView):
-#     renderer_classes = [JSONRenderer]
-#
-#     def get(self, request):
-#         # 1. 가장 최근의 사용자 가져오기
-#         last_user = UserInfo.objects.last()
-#         if not last_user:
-#             return Response({"error": "No user info"}, status=404)
-#
-#         # 2. [수정] 강제 지정 [0, 1, 2]를 지우고 진짜 DB 쿼리 실행
-#         # 해당 유저의 점수 데이터를 가져옴
-#         top3_scores = Score.objects.filter(user=last_user).select_related('perfume').order_by('-myscore')[:3]
-#
-#         results = []
-#         for score in top3_scores:
-#             pid = score.perfume.perfume_id
-#             results.append({
-#                 "perfume_id": pid,
-#                 "image_url": f"/static/ui/perfume_images/{pid}.jpg",
-#                 "perfume_name": score.perfume.perfume_name,
-#                 "brand": score.perfume.brand,
-#                 "myscore": score.myscore,
-#                 "gender": score.perfume.gender
-#             })
-#
-#         return Response(results, status=200)
-
 class PerfumeTop3ImageAPI(APIView):
     renderer_classes = [JSONRenderer]
 
     def get(self, request):
-        target_user = UserInfo.objects.last()
-        if not target_user:
+        result = resolve_result(request)
+        if not result:
             return Response({"error": "유저 정보가 없습니다."}, status=404)
 
-        top3_scores = Score.objects.filter(user=target_user).select_related(
-            'perfume', 'perfume__mainaccord1', 'perfume__mainaccord2', 'perfume__mainaccord3'
-        ).order_by('-myscore')[:3]
-
-        results = []
-        for score in top3_scores:
-            p = score.perfume
-            accords = [a.mainaccord for a in [p.mainaccord1, p.mainaccord2, p.mainaccord3] if a]
-
-            results.append({
-                "perfume_id": p.perfume_id,
-                "perfume_name": p.perfume_name,
-                "brand": p.brand,
-                "gender": p.gender if p.gender else "Unisex",
-                "accords": accords,
-                "myscore": score.myscore,
-                "image_url": f"{settings.STATIC_URL}ui/perfume_images/{p.perfume_id}.jpg"
-            })
+        results = [
+            {
+                "perfume_id": p["perfume_id"],
+                "perfume_name": p["perfume_name"],
+                "brand": p["brand"],
+                "gender": p["gender"] if p["gender"] else "Unisex",
+                "accords": p["accords"],
+                "myscore": p["myscore"],
+                "image_url": p["image_url"],
+            }
+            for p in result["perfumes"][:3]
+        ]
         return Response(results, status=200)
 
 
+class ResultPageAPIView(APIView):
+    """
+    결과 페이지 통합 API
+    - user-outfit / perfume-top3-images / recommendation-results 를 한 번의 응답으로 합칩니다.
+    - 데이터는 세션 결과 핸들의 캐시된 페이로드(쿼리 1번으로 생성)에서 꺼냅니다.
+    - 느린 LLM 요약은 summary_url로 따로 불러오도록 미룹니다. (?include_summary=1이면 바로 포함)
+    - ?kind=someone 이면 선물용 요약 URL을 돌려줍니다.
+    """
+    renderer_classes = [JSONRenderer]
+
+    def get(self, request):
+        result = resolve_result(request)
+        if not result:
+            return Response({"error": "추천 결과가 없습니다."}, status=404)
+
+        kind = request.GET.get("kind", "for_me")
+        summary_url = reverse("someone-summary" if kind == "someone" else "recommendation-summary")
+
+        perfumes = [
+            {
+                "rank": rank,
+                "perfume_id": p["perfume_id"],
+                "perfume_name": p["perfume_name"],
+                "brand": p["brand"],
+                "gender": p["gender"] if p["gender"] else "Unisex",
+                "accords": p["accords"],
+                "top_season": p["top_season"],
+                "myscore": p["myscore"],
+                "image_url": p["image_url"],
+            }
+            for rank, p in enumerate(result["perfumes"][:3], 1)
+        ]
+
+        summary = None
+        if request.GET.get("include_summary") == "1":
+            try:
+                if kind == "someone":
+                    summary = get_someone_recommendation(
+                        result["user_id"],
+                        request.session.get('recipient') or "소중한 분",
+                        request.session.get('situation') or "특별한 날",
+                    )
+                else:
+                    summary = get_llm_recommendation(result["user_id"])
+            except Exception:
+                import traceback
+                traceback.print_exc()
+                summary = "분석 중 오류가 발생했습니다."
+
+        return Response({
+            "user_outfit": result["user_outfit"],
+            "perfumes": perfumes,
+            "summary": summary,
+            "summary_url": summary_url,
+        }, status=200)
+
+
 class RecommendationSummaryAPIView(APIView):
     renderer_classes = [JSONRenderer]
 
     def get(self, request):
 
-        target_user_id = UserInfo.objects.last().user_id
+        target_user_id = resolve_user_id(request)
+        if target_user_id is None:
+            return Response({"summary": "데이터가 없습니다."}, status=404)
 
         try:
             # 2. 강제로 지정한 ID를 LLM 함수에 전달
@@ -741,9 +815,15 @@ class MyNotePerfumeCartAPIView(APIView):
 class MyNotePerfumeSearchAPIView(APIView):
     """
     4-2 향수 검색 API
-    - name / brand 기준 검색
+    - name / brand 기준 검색 (트라이그램 색인, 일치도 → 평점 순)
+    - (선택) accords=우디,머스크 : 해당 향조를 모두 가진 향수만
+    - (선택) exclude_accords=시트러스 : 해당 향조를 가진 향수 제외
     """
 
+    @staticmethod
+    def _accord_param(request, name):
+        return [a.strip() for a in request.GET.get(name, "").split(",") if a.strip()]
+
     def get(self, request):
         raw_query = request.GET.get("q", "").strip()
         query = raw_query.replace(" ", "").replace("-", "")
@@ -751,25 +831,52 @@ class MyNotePerfumeSearchAPIView(APIView):
         if not query:
             return Response([], status=200)
 
-        perfumes = Perfume.objects.filter(
-            Q(perfume_name__icontains=raw_query) |
-            Q(brand__icontains=raw_query) |
-            Q(brand__icontains=query)
-        )[:20]
+        # 트라이그램 색인으로 순위가 매겨진 id 목록 (정규화는 위 query와 같은 방식)
+        index = get_search_index()
+        include_accords = self._accord_param(request, "accords")
+        exclude_accords = self._accord_param(request, "exclude_accords")
+        if include_accords or exclude_accords:
+            # 향조 조건은 카탈로그의 향조 역색인으로 메모리에서 거릅니다. (SQL OR 조건 없음)
+            matched_ids = index.search(raw_query, limit=None)
+            perfume_ids = get_catalog().filter_perfume_ids(matched_ids, include_accords, exclude_accords)[:20]
+        else:
+            perfume_ids = index.search(raw_query, limit=20)
 
         result = []
-        for p in perfumes:
+        for pid in perfume_ids:
+            name, brand = index.describe(pid)
             result.append({
-                "perfume_id": p.perfume_id,
-                "name": p.perfume_name,
-                "brand": p.brand,
+                "perfume_id": pid,
+                "name": name,
+                "brand": brand,
                 # 이미지: 기존 api_views 방식 그대로
-                "perfume_img_url": f"{settings.STATIC_URL}ui/perfume_images/{p.perfume_id}.jpg"
+                "perfume_img_url": f"{settings.STATIC_URL}ui/perfume_images/{pid}.jpg"
             })
 
         return Response(result, status=200)
 
 
+class MyNotePerfumeAutocompleteAPIView(APIView):
+    """
+    4-2 향수 자동완성 API
+    - ?q=접두어 → 브랜드/향수 추천 목록 (인기순)
+    - 1~3글자 접두어는 색인 생성 시 미리 계산된 목록을 그대로 반환
+    - 같은 접두어 반복 요청은 브라우저/CDN이 흡수하도록 Cache-Control을 붙입니다.
+    """
+    renderer_classes = [JSONRenderer]
+    CACHE_MAX_AGE = 60 * 10  # 10분 (카탈로그는 import 때만 바뀜)
+
+    def get(self, request):
+        prefix = request.GET.get("q", "").strip()
+        index = get_search_index()
+        suggestions = list(index.autocomplete.suggest(prefix)) if prefix else []
+
+        response = Response({"query": prefix, "suggestions": suggestions}, status=200)
+        patch_cache_control(response, public=True, max_age=self.CACHE_MAX_AGE)
+        response["X-Catalog-Version"] = str(index.version)
+        return response
+
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -780,9 +887,8 @@ from .models import UserSmellingInput
 
 class MyNotePerfumeCompleteAPIView(APIView):
     def _get_next_smelling_user_id(self):
-        # 최신 ID를 가져오는 쿼리 최적화
-        last = UserSmellingInput.objects.only('smelling_user_id').order_by("-smelling_user_id").first()
-        return last.smelling_user_id + 1 if last and last.smelling_user_id else 1
+        # MAX 조회 대신 id_sequence에서 원자적으로 하나 받음 (동시 저장에도 중복 없음)
+        return next_id(SMELLING_USER_SEQUENCE)
 
     def post(self, request):
         perfumes = request.session.get("my_note_cart", [])
@@ -836,9 +942,10 @@ class MyNotePerfumeCompleteAPIView(APIView):
             with transaction.atomic():  # 안전하게 트랜잭션으로 묶음
                 UserSmellingInput.objects.bulk_create(objs_to_create)
 
-            # 세션 정리
+            # 세션 정리 (결과 페이지는 방금 저장한 묶음 번호로 조회)
             request.session.pop("my_note_cart", None)
             request.session.pop("my_note_style", None)
+            request.session[MY_NOTE_SESSION_KEY] = smelling_user_id
             request.session.modified = True
 
             return Response({"message": "MyNote 저장 완료"}, status=200)
@@ -926,8 +1033,8 @@ class SomeoneSummaryAPIView(APIView):
     renderer_classes = [JSONRenderer]
 
     def get(self, request):
-        last_user = UserInfo.objects.last()
-        if not last_user:
+        target_user_id = resolve_user_id(request)
+        if target_user_id is None:
             return Response({"summary": "데이터가 없습니다."}, status=404)
 
         # 세션에서 선물 정보 꺼내기
@@ -937,7 +1044,7 @@ class SomeoneSummaryAPIView(APIView):
         try:
             # For Someone 전용 로직 호출
             summary_text = get_someone_recommendation(
-                last_user.user_id,
+                target_user_id,
                 recipient,
                 situation
             )
@@ -950,8 +1057,8 @@ class GiftMessageAPIView(APIView):
     renderer_classes = [JSONRenderer]
 
     def get(self, request):
-        last_user = UserInfo.objects.last()
-        if not last_user:
+        target_user_id = resolve_user_id(request)
+        if target_user_id is None:
             return Response({"messages": ["데이터가 없습니다."]}, status=404)
 
         # 1. 세션에서 선물 정보 가져오기
@@ -964,9 +1071,9 @@ class GiftMessageAPIView(APIView):
         try:
             from .recommend.gift_message_LLM import get_someone_gift_message
 
-            # [핵심 수정] last_user.user_id를 첫 번째 인자로 전달합니다.
+            # [핵심 수정] 세션 결과 핸들의 user_id를 첫 번째 인자로 전달합니다.
             messages = get_someone_gift_message(
-                last_user.user_id,
+                target_user_id,
                 recipient,
                 situation,
                 msg_type
@@ -976,4 +1083,24 @@ class GiftMessageAPIView(APIView):
         except Exception as e:
             import traceback
             traceback.print_exc()  # 터미널에 상세 에러 출력
-            return Response({"messages": ["마음을 담아 선물하세요."]}, status=500)
\ No newline at end of file
+            return Response({"messages": ["마음을 담아 선물하세요."]}, status=500)
+
+class DbPoolStatsAPIView(APIView):
+    """
+    운영용 DB 연결 통계 API (관리자 전용)
+    - 현재 워커 프로세스의 지속 연결 상태: 사용 중/유휴, 새 연결/재사용, 헬스체크, 연결 대기 시간
+    - CONN_MAX_AGE / 워커 수를 정할 때 참고합니다.
+    """
+    renderer_classes = [JSONRenderer]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        from conf.db_backend.stats import pool_stats
+
+        db = settings.DATABASES["default"]
+        return Response({
+            "pid": os.getpid(),
+            "conn_max_age": db.get("CONN_MAX_AGE", 0),
+            "health_checks": db.get("CONN_HEALTH_CHECKS", False),
+            "pool": pool_stats.snapshot(),
+        }, status=200)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from ui.models import PerfumeFeature
+from ui.recommend.catalog import bump_catalog_version
+
+
+class Command(BaseCommand):
+    help = 'perfume / perfume_season / perfume_classification / perfume_color를 합쳐 perfume_feature 테이블을 다시 만듭니다. (향수 관련 import 후 실행)'
+
+    def handle(self, *args, **options):
+        # 특징 테이블 재생성 + 카탈로그 스냅샷 갱신 (서빙 워커가 다음 요청에서 새 특징 테이블을 읽습니다)
+        version = bump_catalog_version()
+        count = PerfumeFeature.objects.count()
+
+        print(f"\n==================================================")
+        print(f"✅ 향수 특징 테이블 생성 완료!")
+        print(f"   - 향수: {count}")
+        print(f"   - 카탈로그 버전: v{version}")
+        print(f"==================================================")
@@ -0,0 +1,111 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from ui.models import TopBottom, Dress, UserInfo, StylePrediction
+from ui.recommend.calculation_v4 import outfit_features, predict_styles
+
+
+class Command(BaseCommand):
+    help = '도달 가능한 모든 코디(상의×하의 조합, 원피스)의 스타일을 미리 예측해 StylePrediction 테이블에 저장합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000, help='한 번에 예측할 코디 수')
+
+    # UserInputView는 (카테고리, 색상)마다 .first() 행(=가장 작은 id)을 고르므로 그 행들만 도달 가능합니다.
+    @staticmethod
+    def _first_per_group(rows):
+        picked = {}
+        for row_id, *group in rows:
+            picked.setdefault(tuple(group), row_id)
+        return set(picked.values())
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        chunk_size = options['chunk_size']
+
+        top_ids = self._first_per_group(
+            TopBottom.objects.filter(top_category__isnull=False, top_color__isnull=False)
+            .order_by('id').values_list('id', 'top_category', 'top_color_id')
+        )
+        bottom_ids = self._first_per_group(
+            TopBottom.objects.filter(bottom_category__isnull=False, bottom_color__isnull=False)
+            .order_by('id').values_list('id', 'bottom_category', 'bottom_color_id')
+        )
+        dress_ids = self._first_per_group(
+            Dress.objects.filter(dress_color__isnull=False)
+            .order_by('id').values_list('id', 'dress_color_id')
+        )
+
+        pairs = {(t, b) for t in top_ids for b in bottom_ids}
+        # import_user_info로 들어온 기존 사용자 코디도 포함
+        for t, b, d in UserInfo.objects.values_list('top_id_id', 'bottom_id_id', 'dress_id_id').distinct():
+            if d:
+                dress_ids.add(d)
+            elif t and b:
+                pairs.add((t, b))
+
+        print(f"--------------------------------------------------")
+        print(f"[진단] 상의 {len(top_ids)}개 × 하의 {len(bottom_ids)}개 → 투피스 조합 {len(pairs)}개")
+        print(f"[진단] 원피스 {len(dress_ids)}개")
+        print(f"--------------------------------------------------")
+
+        garments = TopBottom.objects.select_related('top_color', 'bottom_color').in_bulk(
+            {t for t, _ in pairs} | {b for _, b in pairs}
+        )
+        dresses = Dress.objects.select_related('dress_color').in_bulk(dress_ids)
+
+        predictions = []
+        fail_count = 0
+
+        def predict_chunked(entries, is_dress):
+            nonlocal fail_count
+            for i in range(0, len(entries), chunk_size):
+                chunk = entries[i:i + chunk_size]
+                try:
+                    styles = predict_styles([features for _, _, features in chunk], is_dress=is_dress)
+                except Exception as e:
+                    fail_count += len(chunk)
+                    print(f"❌ [실패] 예측 중 에러 ({len(chunk)}건 건너뜀): {e}")
+                    continue
+                for (key, ids, _), style in zip(chunk, styles):
+                    predictions.append(StylePrediction(outfit_key=key, style=style, **ids))
+                print(f"... {min(i + chunk_size, len(entries))}/{len(entries)}개 예측 완료")
+
+        two_piece = []
+        for t, b in sorted(pairs):
+            if t not in garments or b not in garments:
+                continue
+            try:
+                features = outfit_features(top=garments[t], bottom=garments[b])
+            except AttributeError:
+                fail_count += 1
+                continue
+            two_piece.append((StylePrediction.make_key(t, b, None), {'top_id': t, 'bottom_id': b}, features))
+
+        one_piece = []
+        for d in sorted(dress_ids):
+            if d not in dresses or dresses[d].dress_color is None:
+                continue
+            one_piece.append((StylePrediction.make_key(dress_id=d), {'dress_id': d}, outfit_features(dress=dresses[d])))
+
+        predict_chunked(two_piece, is_dress=False)
+        predict_chunked(one_piece, is_dress=True)
+
+        # 하나라도 실패하면 기존 표를 그대로 두고 실패로 끝냅니다. (import_all도 이 단계를 실패로 표시)
+        if fail_count:
+            raise CommandError(
+                f"❌ 스타일 예측 실패 {fail_count}건 (성공 {len(predictions)}건) → 기존 StylePrediction 표를 유지합니다."
+            )
+
+        # 전체 교체: 이전 예측(삭제된 옷 id 포함)을 지우고 새로 저장
+        with transaction.atomic():
+            StylePrediction.objects.all().delete()
+            StylePrediction.objects.bulk_create(predictions, batch_size=2000)
+
+        elapsed = time.perf_counter() - start
+        print(f"\n==================================================")
+        print(f"✅ 스타일 사전 계산 완료! ({elapsed:.1f}초)")
+        print(f"   - 저장: {len(predictions)}")
+        print(f"==================================================")
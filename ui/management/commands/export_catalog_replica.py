@@ -0,0 +1,106 @@
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.utils import ConnectionHandler
+from django.utils import timezone
+
+from ui.models import (
+    ClothesColor, PerfumeColor, TopBottom, Dress,
+    Perfume, PerfumeSeason, PerfumeClassification, PerfumeFeature, CatalogVersion
+)
+from ui.recommend.catalog import CATALOG_NAME, current_catalog_version
+
+# FK 대상이 먼저 오도록 정렬 (conf/db_router.py의 CATALOG_TABLES와 같은 테이블)
+REPLICA_MODELS = [
+    ClothesColor, PerfumeColor, TopBottom, Dress,
+    Perfume, PerfumeSeason, PerfumeClassification, PerfumeFeature,
+]
+CHUNK_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = '카탈로그 테이블을 컨테이너 안의 읽기 전용 SQLite 복제본으로 내보냅니다. (배포 시 gunicorn 시작 전에 실행)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=None, help='복제본 파일 경로 (기본: settings.CATALOG_REPLICA_PATH)')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        path = str(options['path'] or settings.CATALOG_REPLICA_PATH)
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+
+        # 복사 전에 버전을 읽습니다. 복사 중에 import가 끝나면 복제본은 이전 버전으로 남아 오래된 것으로 판정됩니다.
+        version = current_catalog_version()
+
+        # 임시 파일에 만든 뒤 한 번에 교체 (서빙 중인 프로세스가 반쯤 쓴 파일을 읽지 않도록)
+        fd, tmp_path = tempfile.mkstemp(suffix='.sqlite3', dir=directory)
+        os.close(fd)
+        replica = ConnectionHandler({
+            'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': tmp_path},
+        })['default']
+
+        counts = {}
+        try:
+            with replica.schema_editor() as editor:
+                for model in REPLICA_MODELS + [CatalogVersion]:
+                    editor.create_model(model)
+
+            with replica.constraint_checks_disabled(), replica.cursor() as cursor:
+                for model in REPLICA_MODELS:
+                    counts[model._meta.db_table] = self._copy(model, replica, cursor)
+
+                # 복제본 버전 = 복사 시작 시점의 MySQL 카탈로그 버전 (라우터의 staleness 확인용)
+                fields = CatalogVersion._meta.concrete_fields
+                cursor.execute(
+                    self._insert_sql(CatalogVersion, replica),
+                    [f.get_db_prep_save(v, replica) for f, v in zip(fields, (CATALOG_NAME, version, timezone.now()))],
+                )
+            replica.close()
+
+            os.chmod(tmp_path, 0o444)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            replica.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            print(f"❌ 카탈로그 복제본 생성 실패: {e}")
+            raise
+
+        elapsed = time.perf_counter() - start
+        print(f"\n==================================================")
+        print(f"✅ 카탈로그 복제본 생성 완료! ({elapsed:.1f}초)")
+        print(f"   - 파일: {path}")
+        print(f"   - 카탈로그 버전: v{version}")
+        for table, count in counts.items():
+            print(f"   - {table}: {count}행")
+        print(f"==================================================")
+
+    @staticmethod
+    def _insert_sql(model, replica):
+        fields = model._meta.concrete_fields
+        columns = ", ".join(replica.ops.quote_name(f.column) for f in fields)
+        placeholders = ", ".join(["%s"] * len(fields))
+        return f"INSERT INTO {replica.ops.quote_name(model._meta.db_table)} ({columns}) VALUES ({placeholders})"
+
+    def _copy(self, model, replica, cursor):
+        """MySQL(default)의 행을 그대로 복제본에 넣습니다. 넣은 행 수를 반환합니다."""
+        fields = model._meta.concrete_fields
+        sql = self._insert_sql(model, replica)
+        rows = model.objects.using('default').order_by('pk').values_list(*[f.attname for f in fields])
+
+        count = 0
+        batch = []
+        for row in rows.iterator(chunk_size=CHUNK_SIZE):
+            batch.append([f.get_db_prep_save(value, replica) for f, value in zip(fields, row)])
+            if len(batch) >= CHUNK_SIZE:
+                cursor.executemany(sql, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+            count += len(batch)
+        return count
@@ -1,31 +1,175 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
 
-from django.core.management.base import BaseCommand
+import django
+from django.core.management.base import BaseCommand, CommandError
 from django.core.management import call_command
+from django.db import connections
 
+# =========================================================
+# import 단계 의존성 (FK 기준)
+# 설명: 각 단계는 여기 적힌 단계가 모두 성공해야 시작합니다.
+#       서로 의존하지 않는 단계는 --jobs개의 워커 프로세스에서 동시에 실행되고,
+#       한 단계가 실패하면 그 단계에 (간접적으로라도) 의존하는 단계만 건너뜁니다.
+# =========================================================
+STAGES = {
+    "import_color": [],
+    "import_clothes_color": [],
+    "import_perfume": ["import_color"],                          # mainaccord → perfume_color
+    "import_season": ["import_perfume"],                         # 향수 ID 존재 확인
+    "import_classification": ["import_perfume"],                 # 부모 향수 필요
+    "import_topbottom": ["import_clothes_color"],                # 상의/하의 색상 → clothes_color
+    "import_dress": ["import_clothes_color"],                    # 원피스 색상 → clothes_color
+    "import_user_info": ["import_topbottom", "import_dress"],     # 옷 ID FK
+    "build_style_predictions": ["import_topbottom", "import_dress", "import_user_info"],
+    "import_user_smelling": ["import_topbottom", "import_dress", "import_perfume"],
+    "import_user_smelling_score": ["import_topbottom", "import_dress", "import_perfume"],
+    "import_weights": [],
+}
 
-class Command(BaseCommand):
-    help = "모든 CSV 데이터를 한 번에 import합니다."
+DONE, FAILED, BLOCKED = "완료", "실패", "건너뜀"
 
-    def handle(self, *args, **options):
-        commands = [
-            "import_color",
-            "import_clothes_color",
-            "import_season",
-            "import_perfume",
-            "import_topbottom",
-            "import_dress",
-            "import_user_info",
-            "import_classification",
-            "import_user_smelling",
-            "import_user_smelling_score",
-            "import_weights",
-        ]
-
-        for cmd in commands:
-            self.stdout.write(f"\n🚀 실행 중: {cmd}")
+
+def _init_worker():
+    # spawn/forkserver 방식의 워커는 Django를 새로 초기화해야 합니다. (fork면 이미 준비되어 있어 바로 반환)
+    django.setup()
+
+
+def _run_stage(name):
+    """한 단계를 실행하고 (이름, 성공 여부, 걸린 시간, 에러 메시지)를 반환합니다. 워커 프로세스에서 실행됩니다."""
+    start = time.perf_counter()
+    try:
+        call_command(name)
+        error = None
+    except Exception as e:
+        error = str(e) or e.__class__.__name__
+    finally:
+        connections.close_all()
+    return name, error is None, time.perf_counter() - start, error
+
+
+class _InlineExecutor:
+    """--jobs 1: 워커 프로세스 없이 현재 프로세스에서 순서대로 실행 (디버깅용)"""
+
+    def __init__(self):
+        self._results = []
+
+    def submit(self, fn, *args):
+        self._results.append(fn(*args))
+
+    def next_results(self, running):
+        results, self._results = self._results, []
+        return results
+
+    def shutdown(self):
+        pass
+
+
+class _PoolExecutor:
+    def __init__(self, jobs):
+        self._jobs = jobs
+        self._pool = self._new_pool()
+        self._futures = {}  # future → (단계 이름, 제출한 풀)
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(max_workers=self._jobs, initializer=_init_worker)
+
+    def _replace_broken_pool(self):
+        # 워커가 죽으면 ProcessPoolExecutor는 더 이상 submit을 받지 않으므로 새 풀로 바꿉니다.
+        # (깨진 풀의 future는 모두 BrokenProcessPool로 끝나 있어 next_results에서 실패로 보고됩니다)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._new_pool()
+
+    def submit(self, fn, name):
+        try:
+            future = self._pool.submit(fn, name)
+        except BrokenProcessPool:
+            self._replace_broken_pool()
+            future = self._pool.submit(fn, name)
+        self._futures[future] = (name, self._pool)
+
+    def next_results(self, running):
+        finished, _ = wait(self._futures, return_when=FIRST_COMPLETED)
+        results = []
+        for future in finished:
+            name, pool = self._futures.pop(future)
             try:
-                call_command(cmd)
-                self.stdout.write(self.style.SUCCESS(f"✅ {cmd} 완료"))
+                results.append(future.result())
             except Exception as e:
-                self.stderr.write(self.style.ERROR(f"❌ {cmd} 실패: {e}"))
-                break
+                # 워커 프로세스 자체가 죽은 경우: 그 풀에서 실행 중이던 단계만 실패 처리하고
+                # 이후 단계는 새 풀에서 계속 실행합니다. (실패한 단계에 의존하는 단계는 건너뜀)
+                if isinstance(e, BrokenProcessPool) and pool is self._pool:
+                    self._replace_broken_pool()
+                results.append((name, False, 0.0, f"워커 프로세스 오류: {e}"))
+        return results
+
+    def shutdown(self):
+        self._pool.shutdown(cancel_futures=True)
+
+
+class Command(BaseCommand):
+    help = "모든 CSV 데이터를 한 번에 import합니다. (FK 의존성이 없는 단계는 동시에 실행)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=min(4, os.cpu_count() or 1),
+                            help='동시에 실행할 워커 프로세스 수 (1이면 현재 프로세스에서 순서대로 실행)')
+
+    def handle(self, *args, **options):
+        jobs = max(1, options['jobs'])
+        start = time.perf_counter()
+
+        status = {}     # 단계 → DONE / FAILED / BLOCKED
+        timings = {}    # 단계 → 걸린 시간 (초)
+        errors = {}     # 단계 → 실패 이유
+        running = set()
+
+        # 워커가 부모의 DB 연결을 물려받지 않도록 fork 전에 모두 닫습니다.
+        connections.close_all()
+        executor = _InlineExecutor() if jobs == 1 else _PoolExecutor(jobs)
+
+        try:
+            while len(status) < len(STAGES):
+                for name, deps in STAGES.items():
+                    if name in status or name in running:
+                        continue
+                    failed_deps = [d for d in deps if status.get(d) in (FAILED, BLOCKED)]
+                    if failed_deps:
+                        status[name] = BLOCKED
+                        errors[name] = f"선행 단계 실패: {', '.join(failed_deps)}"
+                        self.stderr.write(self.style.WARNING(f"⏭️ {name} 건너뜀 ({errors[name]})"))
+                    elif all(status.get(d) == DONE for d in deps):
+                        self.stdout.write(f"\n🚀 실행 중: {name}")
+                        running.add(name)
+                        executor.submit(_run_stage, name)
+
+                if not running:
+                    continue
+
+                for name, ok, seconds, error in executor.next_results(running):
+                    running.discard(name)
+                    timings[name] = seconds
+                    if ok:
+                        status[name] = DONE
+                        self.stdout.write(self.style.SUCCESS(f"✅ {name} 완료 ({seconds:.1f}초)"))
+                    else:
+                        status[name] = FAILED
+                        errors[name] = error
+                        self.stderr.write(self.style.ERROR(f"❌ {name} 실패: {error}"))
+        finally:
+            executor.shutdown()
+
+        elapsed = time.perf_counter() - start
+        print(f"\n==================================================")
+        print(f"📋 import_all 단계별 결과 (워커 {jobs}개)")
+        for name in STAGES:
+            seconds = f"{timings[name]:7.1f}초" if name in timings else "      -  "
+            detail = f"  ({errors[name]})" if name in errors else ""
+            print(f"   - {name:<28} {status[name]:<4} {seconds}{detail}")
+        print(f"   - 전체 소요: {elapsed:.1f}초 (단계 합계 {sum(timings.values()):.1f}초)")
+        print(f"==================================================")
+
+        not_done = [name for name in STAGES if status[name] != DONE]
+        if not_done:
+            raise CommandError(f"완료되지 않은 단계: {', '.join(not_done)}")
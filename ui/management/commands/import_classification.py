@@ -1,99 +1,59 @@
-import csv
 import pandas as pd
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from ui.models import Perfume, PerfumeClassification
 from django.conf import settings
+from ui.recommend.catalog import bump_catalog_version
+from ui.management.import_engine import (
+    read_csv_chunks, add_chunk_rows_argument, column, to_str, to_int, valid_rows, dedupe, bulk_upsert, ImportReport
+)
 from pathlib import Path
 
 class Command(BaseCommand):
     help = 'perfume_classification.csv 파일을 읽어 DB에 저장합니다.'
 
+    def add_arguments(self, parser):
+        add_chunk_rows_argument(parser)
+
     def handle(self, *args, **kwargs):
         csv_path = Path(settings.BASE_DIR) /'perfume_classification.csv'
 
-        # --- 안전한 숫자 변환 함수 ---
-        def safe_int(value):
-            if pd.isna(value) or value == '': return 0
-            try:
-                # 1.0 -> 1로 변환, 쉼표 제거
-                return int(float(str(value).replace(',', '').strip()))
-            except ValueError:
-                return 0
-
         try:
-            # 1. CSV 읽기 (한글 윈도우 엑셀 파일은 cp949)
-            try:
-                df = pd.read_csv(csv_path, encoding='cp949')
-            except UnicodeDecodeError:
-                df = pd.read_csv(csv_path, encoding='utf-8')
-
-            # 컬럼 이름 공백 제거 (실수 방지)
-            df.columns = df.columns.str.strip()
-
-            # 빈값(NaN)을 None으로 처리
-            df = df.where(pd.notnull(df), None)
-
-            print(f"--------------------------------------------------")
-            print(f"[진단] 총 {len(df)}개의 향조 데이터를 읽었습니다.")
-            print(f"[진단] 컬럼 목록: {list(df.columns)}")
-            print(f"--------------------------------------------------")
-
-            success_count = 0
-            skip_count = 0
-            fail_count = 0
-
-            for index, row in df.iterrows():
-                try:
-                    # 1. Perfume ID 가져오기
-                    raw_id = row.get('perfume_id')
-                    if not raw_id:
-                        continue
-
-                    p_id = safe_int(raw_id)
+            report = ImportReport(PerfumeClassification._meta.db_table)
 
-                    # 2. 부모 향수(Perfume) 존재 확인
-                    try:
-                        perfume_obj = Perfume.objects.get(perfume_id=p_id)
-                    except Perfume.DoesNotExist:
-                        # 부모 데이터(향수)가 없으면 저장 불가 -> 건너뜀
-                        skip_count += 1
-                        continue
+            # 부모 향수(Perfume) ID는 한 번만 읽어 둡니다.
+            perfumes = report.resolver(Perfume)
 
-                    # 3. Fragrance 데이터 가져오기 (한글 텍스트)
-                    # 사진에 있는 컬럼명 'fragrance'를 찾음
-                    fragrance_val = row.get('fragrance') or row.get('Fragrance')
+            # 1. CSV 읽기 (한글 윈도우 엑셀 파일은 cp949) → 청크마다 정제 후 바로 저장
+            chunks = read_csv_chunks(csv_path, encodings=('cp949', 'utf-8'), chunk_rows=kwargs['chunk_rows'])
+            for df in chunks:
+                if not report.read:
+                    print(f"--------------------------------------------------")
+                    print(f"[진단] 컬럼 목록: {list(df.columns)}")
+                    print(f"--------------------------------------------------")
+                report.read += len(df)
 
-                    if fragrance_val:
-                        fragrance_str = str(fragrance_val).strip()
-                    else:
-                        fragrance_str = None
+                # 2. 컬럼 단위 정제 (1.0 -> 1, 쉼표 제거 / fragrance는 한글 텍스트)
+                frame = pd.DataFrame({
+                    'perfume_id': to_int(column(df, 'perfume_id')),
+                    'fragrance': to_str(column(df, 'fragrance', 'Fragrance')),
+                })
+                frame = valid_rows(frame, frame['perfume_id'].fillna(0) != 0, report, 'ID 없음')
 
-                    # 4. DB 저장 (update_or_create)
-                    # 이미 있으면 수정, 없으면 생성
-                    PerfumeClassification.objects.update_or_create(
-                        perfume=perfume_obj,
-                        defaults={
-                            'fragrance': fragrance_str
-                        }
-                    )
-                    success_count += 1
+                # 3. 부모 향수(Perfume) 존재 확인: 없으면 저장 불가 -> 건너뜀
+                frame = valid_rows(frame, perfumes.exists(frame['perfume_id'], 'perfume_id'), report, '부모ID 없음')
+                frame = dedupe(frame, ['perfume_id'])
 
-                except Exception as e:
-                    fail_count += 1
-                    print(f"❌ [실패] ID {p_id} 처리 중 에러: {e}")
+                # 4. DB 저장 (청크 단위 upsert: 이미 있으면 수정, 없으면 생성)
+                objs = [PerfumeClassification(**rec) for rec in frame.to_dict('records')]
+                bulk_upsert(PerfumeClassification, objs, update_fields=['fragrance'], report=report)
 
-                # 진행상황 출력
-                if (index + 1) % 500 == 0:
-                    print(f"... {index + 1}개 처리 중")
+            report.print_summary()
 
-            print(f"\n==================================================")
-            print(f"✅ 최종 완료!")
-            print(f"   - 성공(DB저장): {success_count}")
-            print(f"   - 건너뜀(부모ID 없음): {skip_count}")
-            print(f"   - 실패(에러): {fail_count}")
-            print(f"==================================================")
+            # 카탈로그 스냅샷 갱신 (서빙 워커가 다음 요청에서 새로 읽습니다)
+            version = bump_catalog_version()
+            print(f"📦 카탈로그 버전 갱신: v{version}")
 
         except FileNotFoundError:
-            print(f"❌ '{csv_path}' 파일을 찾을 수 없습니다. manage.py 옆에 있는지 확인하세요.")
+            raise CommandError(f"'{csv_path}' 파일을 찾을 수 없습니다. manage.py 옆에 있는지 확인하세요.")
         except Exception as e:
-            print(f"❌ 치명적 오류: {e}")
\ No newline at end of file
+            raise CommandError(f"치명적 오류: {e}") from e
@@ -1,87 +1,73 @@
-
 import pandas as pd
-from django.core.management.base import BaseCommand
-from ui.models import Dress, ClothesColor
+from django.core.management.base import BaseCommand, CommandError
+from ui.models import Dress, ClothesColor, StylePrediction
 from django.conf import settings
+from ui.management.import_engine import (
+    read_csv_chunks, add_chunk_rows_argument, column, to_str, to_int, nullable, valid_rows, dedupe, bulk_upsert, ImportReport
+)
 from pathlib import Path
 
+# 모델 필드 → CSV 컬럼 (값은 그대로 저장)
+TEXT_COLUMNS = {
+    'style': '스타일',
+    'sub_style': '서브스타일',
+    'dress_length': '원피스_기장',
+    'dress_sleeve_length': '원피스_소매기장',
+    'dress_material': '원피스_소재',
+    'dress_print': '원피스_프린트',
+    'dress_neckline': '원피스_넥라인',
+    'dress_fit': '원피스_핏',
+    'dress_detail': '원피스_디테일',
+}
+
+
 class Command(BaseCommand):
     help = '원피스.csv 파일을 읽어 Dress 테이블에 저장합니다.'
 
+    def add_arguments(self, parser):
+        add_chunk_rows_argument(parser)
+
     def handle(self, *args, **kwargs):
         csv_path = Path(settings.BASE_DIR)/'원피스.csv'
 
         try:
-            # 1. CSV 읽기 (인코딩 자동 감지)
-            try:
-                df = pd.read_csv(csv_path, encoding='cp949')
-            except UnicodeDecodeError:
-                df = pd.read_csv(csv_path, encoding='utf-8')
-
-            # 컬럼 이름 공백 제거
-            df.columns = df.columns.str.strip()
-
-            # 빈값(NaN)을 None으로 변경
-            df = df.where(pd.notnull(df), None)
-
-            print(f"--------------------------------------------------")
-            print(f"[진단] 총 {len(df)}개의 원피스 데이터를 읽었습니다.")
-            print(f"[진단] 컬럼 목록: {list(df.columns)}")
-            print(f"--------------------------------------------------")
-
-            success_count = 0
-            fail_count = 0
-
-            for index, row in df.iterrows():
-                try:
-                    # 1. 식별자(ID) 확인
-                    raw_id = row.get('식별자')
-                    if not raw_id:
-                        continue
-
-                    # 2. 색상 처리 (FK 연결을 위해 객체 가져오기)
-                    color_name = row.get('원피스_색상')
-                    color_obj = None
-
-                    if color_name:
-                        # 색상이 DB에 없으면 자동 생성 (안전을 위해)
-                        color_obj, _ = ClothesColor.objects.get_or_create(
-                            color=str(color_name).strip()
-                        )
-
-                    # 3. DB 저장 (update_or_create)
-                    Dress.objects.update_or_create(
-                        id=int(float(str(raw_id).replace(',', ''))),  # PK
-                        defaults={
-                            'style': row.get('스타일'),
-                            'sub_style': row.get('서브스타일'),
-                            'dress_length': row.get('원피스_기장'),
-                            'dress_sleeve_length': row.get('원피스_소매기장'),
-                            'dress_color': color_obj,  # FK
-                            'dress_material': row.get('원피스_소재'),
-                            'dress_print': row.get('원피스_프린트'),
-                            'dress_neckline': row.get("원피스_넥라인"),
-                            'dress_fit': row.get('원피스_핏'),
-                            'dress_detail': row.get('원피스_디테일'),
-                        }
-                    )
-                    success_count += 1
-
-                except Exception as e:
-                    fail_count += 1
-                    print(f"❌ [실패] ID {raw_id} 처리 중 에러: {e}")
-
-                # 진행상황 출력
-                if (index + 1) % 500 == 0:
-                    print(f"... {index + 1}개 처리 중")
-
-            print(f"\n==================================================")
-            print(f"✅ 최종 완료!")
-            print(f"   - 성공(DB저장): {success_count}")
-            print(f"   - 실패(에러): {fail_count}")
-            print(f"==================================================")
+            report = ImportReport(Dress._meta.db_table)
+            # 색상 FK: DB에 없는 색상은 청크마다 한 번에 자동 생성 (안전을 위해)
+            colors = report.resolver(ClothesColor, create=lambda name: ClothesColor(color=name))
+
+            # 1. CSV 읽기 (인코딩 자동 감지) → 청크마다 정제 후 바로 저장
+            chunks = read_csv_chunks(csv_path, encodings=('cp949', 'utf-8'), chunk_rows=kwargs['chunk_rows'])
+            for df in chunks:
+                if not report.read:
+                    print(f"--------------------------------------------------")
+                    print(f"[진단] 컬럼 목록: {list(df.columns)}")
+                    print(f"--------------------------------------------------")
+                report.read += len(df)
+
+                # 2. 컬럼 단위 정제 (식별자 = PK)
+                frame = pd.DataFrame({
+                    'id': to_int(column(df, '식별자')),
+                    **{field: nullable(column(df, col)) for field, col in TEXT_COLUMNS.items()},
+                    'dress_color_id': to_str(column(df, '원피스_색상')),
+                })
+                frame = valid_rows(frame, frame['id'].fillna(0) != 0, report, '식별자 없음')
+                frame = dedupe(frame, ['id'])
+
+                # 3. 색상 처리
+                frame['dress_color_id'] = colors.resolve(frame['dress_color_id'], '원피스_색상')
+
+                # 4. DB 저장 (청크 단위 upsert)
+                objs = [Dress(**rec) for rec in frame.to_dict('records')]
+                bulk_upsert(Dress, objs, update_fields=[*TEXT_COLUMNS, 'dress_color'], report=report)
+
+            report.print_summary()
+
+            # 옷 속성이 바뀌었을 수 있으므로 사전 계산된 스타일을 비웁니다. (build_style_predictions로 다시 생성)
+            cleared, _ = StylePrediction.objects.all().delete()
+            if cleared:
+                print(f"🧹 스타일 사전 계산 {cleared}건 삭제 → build_style_predictions를 다시 실행하세요.")
 
         except FileNotFoundError:
-            print(f"❌ '{csv_path}' 파일을 찾을 수 없습니다.")
+            raise CommandError(f"'{csv_path}' 파일을 찾을 수 없습니다.")
         except Exception as e:
-            print(f"❌ 치명적 오류: {e}")
+            raise CommandError(f"치명적 오류: {e}") from e
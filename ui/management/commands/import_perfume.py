@@ -1,154 +1,95 @@
-import csv
 import pandas as pd
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from ui.models import Perfume, PerfumeColor
 from django.conf import settings
+from ui.recommend.catalog import bump_catalog_version
+from ui.management.import_engine import (
+    read_csv_chunks, add_chunk_rows_argument, column, to_str, to_int, to_float, valid_rows, dedupe, bulk_upsert, ImportReport
+)
 from pathlib import Path
 
+ACCORD_FIELDS = [f'mainaccord{i}' for i in range(1, 6)]
+UPDATE_FIELDS = [
+    'url', 'perfume_name', 'brand', 'country', 'gender',
+    'rating_value', 'rating_count', 'year', 'top', 'middle', 'base',
+    *ACCORD_FIELDS,
+]
+
+
 class Command(BaseCommand):
     help = 'perfume.csv 파일을 읽어 Perfume 테이블에 저장합니다.'
 
+    def add_arguments(self, parser):
+        add_chunk_rows_argument(parser)
+
     def handle(self, *args, **kwargs):
         csv_path = Path(settings.BASE_DIR)/'perfume.csv'
 
-        # --- [1] 안전한 숫자 변환 함수 ---
-        def safe_float(value):
-            if pd.isna(value) or value == '' or value is None:
-                return 0.0
-            try:
-                # 문자열로 바꾸고, 쉼표 제거, 공백 제거
-                clean_str = str(value).replace(',', '.').strip()
-                return float(clean_str)
-            except ValueError:
-                return 0.0
-
-        def safe_int(value):
-            return int(safe_float(value))
-
         try:
-            # 1. CSV 읽기 (cp949, 실패 시 utf-8 시도)
-            try:
-                df = pd.read_csv(csv_path, encoding='cp949')
-            except UnicodeDecodeError:
-                df = pd.read_csv(csv_path, encoding='utf-8')
-
-            # 컬럼 이름 공백 제거
-            df.columns = df.columns.str.strip()
-
-            print(f"--------------------------------------------------")
-            print(f"[진단] 총 {len(df)}개의 행을 읽었습니다.")
-            print(f"[진단] 컬럼 목록: {list(df.columns)}")
-            print(f"--------------------------------------------------")
-
-            success_count = 0
-            fail_count = 0
-
-            # 중복 ID 체크용 세트
-            processed_ids = set()
-
-            for index, row in df.iterrows():
-                try:
-                    # -----------------------------------------------------------
-                    # 2. 데이터 정제
-                    # -----------------------------------------------------------
-
-                    # (1) ID 처리
-                    raw_id = row.get('perfume_id')
-                    if pd.isna(raw_id) or raw_id == '':
-                        print(f"⚠️ [건너뜀] {index + 2}번째 줄: perfume_id가 없습니다.")
-                        fail_count += 1
-                        continue
-
-                    p_id = safe_int(raw_id)
-
-                    # 중복 ID 경고
-                    if p_id in processed_ids:
-                        # print(f"ℹ️ [중복] ID {p_id}가 중복되어 덮어씁니다.")
-                        pass
-                    processed_ids.add(p_id)
-
-                    # (2) 숫자 데이터 처리 (안전 함수 사용)
-                    r_val_raw = row.get('RatingValue') or row.get('rating_value')
-                    r_cnt_raw = row.get('RatingCount') or row.get('rating_count')
-                    year_raw = row.get('Year') or row.get('year')
-
-                    r_val = safe_float(r_val_raw)
-                    r_cnt = safe_int(r_cnt_raw)
-                    p_year = safe_int(year_raw)
-                    if p_year == 0: p_year = None
-
-                    # -----------------------------------------------------------
-                    # 3. 어코드(색상) 연결
-                    # -----------------------------------------------------------
-                    accords = {}
-                    for i in range(1, 6):
-                        col_key = f'mainaccord{i}'
-                        # 대소문자 매칭 시도
-                        if col_key not in row:
-                            for c in df.columns:
-                                if c.lower() == col_key:
-                                    col_key = c
-                                    break
-
-                        accord_text = row.get(col_key)
-
-                        if pd.notna(accord_text) and str(accord_text).strip() != '':
-                            accord_obj, _ = PerfumeColor.objects.get_or_create(
-                                mainaccord=str(accord_text).strip(),
-                                defaults={'color': '#CCCCCC'}
-                            )
-                            accords[f'accord{i}'] = accord_obj
-                        else:
-                            accords[f'accord{i}'] = None
-
-                    # -----------------------------------------------------------
-                    # 4. DB 저장
-                    # -----------------------------------------------------------
-                    Perfume.objects.update_or_create(
-                        perfume_id=p_id,
-                        defaults={
-                            'url': str(row.get('url', '')).strip(),
-                            'perfume_name': str(row.get('Perfume') or row.get('perfume') or '').strip(),
-                            'brand': str(row.get('Brand') or row.get('brand') or '').strip(),
-                            'country': str(row.get('Country') or row.get('country') or '').strip(),
-                            'gender': str(row.get('Gender') or row.get('gender') or '').strip(),
-
-                            'rating_value': r_val,
-                            'rating_count': r_cnt,
-                            'year': p_year,
-
-                            'top': str(row.get('Top', '')).strip(),
-                            'middle': str(row.get('Middle', '')).strip(),
-                            'base': str(row.get('Base', '')).strip(),
-
-                            'mainaccord1': accords['accord1'],
-                            'mainaccord2': accords['accord2'],
-                            'mainaccord3': accords['accord3'],
-                            'mainaccord4': accords['accord4'],
-                            'mainaccord5': accords['accord5'],
-                        }
-                    )
-                    success_count += 1
-
-                except Exception as e:
-                    fail_count += 1
-                    print(f"❌ [실패] ID {p_id} 저장 중 에러: {e}")
-
-                if (index + 1) % 500 == 0:
-                    print(f"... {index + 1}개 처리 중")
-
-            print(f"\n==================================================")
-            print(f"✅ 최종 완료!")
-            print(f"   - CSV 전체 행: {len(df)}")
-            print(f"   - 성공(DB저장): {success_count}")
-            print(f"   - 실패(건너뜀): {fail_count}")
-            print(f"   - 실제 DB에 저장된 ID 개수: {len(processed_ids)}")
-            print(f"==================================================")
-
-            if len(df) != len(processed_ids):
-                print(f"💡 [참고] CSV 행 개수({len(df)})와 저장된 ID 개수({len(processed_ids)})가 다릅니다.")
-                print(f"   이유: CSV 파일 안에 똑같은 perfume_id가 중복되어 들어있기 때문입니다.")
-                print(f"   (Django는 중복된 ID가 나오면 에러를 내지 않고 덮어씁니다.)")
+            report = ImportReport(Perfume._meta.db_table)
+            # 어코드 FK: DB에 없는 향조는 청크마다 기본 회색으로 한 번에 생성
+            accords = report.resolver(PerfumeColor, create=lambda name: PerfumeColor(mainaccord=name, color='#CCCCCC'))
+            duplicated = 0
+
+            # 1. CSV 읽기 (cp949, 실패 시 utf-8 / 인코딩은 한 번만 확인) → 청크마다 정제 후 바로 저장
+            chunks = read_csv_chunks(csv_path, encodings=('cp949', 'utf-8'), chunk_rows=kwargs['chunk_rows'])
+            for df in chunks:
+                if not report.read:
+                    print(f"--------------------------------------------------")
+                    print(f"[진단] 컬럼 목록: {list(df.columns)}")
+                    print(f"--------------------------------------------------")
+                report.read += len(df)
+
+                # -----------------------------------------------------------
+                # 2. 컬럼 단위 정제 (평점은 '2,89'처럼 소수점 쉼표)
+                # -----------------------------------------------------------
+                lower_columns = {c.lower(): c for c in df.columns}
+                year = to_int(column(df, 'Year', 'year'), default=0, decimal_comma=True)
+
+                frame = pd.DataFrame({
+                    'perfume_id': to_int(column(df, 'perfume_id'), decimal_comma=True),
+                    'url': to_str(column(df, 'url')),
+                    'perfume_name': to_str(column(df, 'Perfume', 'perfume')).fillna(''),
+                    'brand': to_str(column(df, 'Brand', 'brand')).fillna(''),
+                    'country': to_str(column(df, 'Country', 'country')),
+                    'gender': to_str(column(df, 'Gender', 'gender')),
+                    'rating_value': to_float(column(df, 'RatingValue', 'rating_value'), default=0.0, decimal_comma=True),
+                    'rating_count': to_int(column(df, 'RatingCount', 'rating_count'), default=0, decimal_comma=True),
+                    'year': year.where(year != 0, None),
+                    'top': to_str(column(df, 'Top')),
+                    'middle': to_str(column(df, 'Middle')),
+                    'base': to_str(column(df, 'Base')),
+                    # 어코드(색상) 연결: 대소문자 매칭 시도
+                    **{
+                        f'{field}_id': to_str(column(df, field, lower_columns.get(field, field)))
+                        for field in ACCORD_FIELDS
+                    },
+                })
+                frame = valid_rows(frame, frame['perfume_id'].notna(), report, 'perfume_id 없음')
+                before_dedupe = len(frame)
+                frame = dedupe(frame, ['perfume_id'])
+                duplicated += before_dedupe - len(frame)
+
+                # -----------------------------------------------------------
+                # 3. 어코드(색상): DB에 없는 향조는 기본 회색으로 한 번에 생성
+                # -----------------------------------------------------------
+                for field in ACCORD_FIELDS:
+                    frame[f'{field}_id'] = accords.resolve(frame[f'{field}_id'], field)
+
+                # -----------------------------------------------------------
+                # 4. DB 저장 (청크 단위 upsert)
+                # -----------------------------------------------------------
+                objs = [Perfume(**rec) for rec in frame.to_dict('records')]
+                bulk_upsert(Perfume, objs, update_fields=UPDATE_FIELDS, report=report)
+
+            report.print_summary()
+
+            if duplicated:
+                print(f"💡 [참고] CSV 안에 같은 perfume_id가 중복된 행 {duplicated}개는 마지막 행으로 덮어썼습니다.")
+
+            # 카탈로그 스냅샷 갱신 (서빙 워커가 다음 요청에서 새로 읽습니다)
+            version = bump_catalog_version()
+            print(f"📦 카탈로그 버전 갱신: v{version}")
 
         except Exception as e:
-            print(f"❌ 치명적 오류: {e}")
\ No newline at end of file
+            raise CommandError(f"치명적 오류: {e}") from e
@@ -1,106 +1,70 @@
-import csv
 import pandas as pd
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from ui.models import Perfume, PerfumeSeason
 from django.conf import settings
+from ui.recommend.catalog import bump_catalog_version
+from ui.management.import_engine import (
+    read_csv_chunks, add_chunk_rows_argument, column, to_int, to_float, valid_rows, dedupe, bulk_upsert, ImportReport
+)
 from pathlib import Path
 
+SEASON_FIELDS = ['spring', 'summer', 'fall', 'winter']
+
+
 class Command(BaseCommand):
     help = 'perfume.csv 파일을 읽어 PerfumeSeason 테이블에 저장합니다.'
 
+    def add_arguments(self, parser):
+        add_chunk_rows_argument(parser)
+
     def handle(self, *args, **kwargs):
         csv_path = Path(settings.BASE_DIR)/'perfume_seasons.csv'
 
-        # --- [1] 안전한 숫자 변환 함수 ---
-        def safe_float(value):
-            if pd.isna(value) or value == '' or value is None:
-                return 0.0
-            try:
-                # 문자열로 바꾸고, 쉼표 제거, 공백 제거
-                clean_str = str(value).replace(',', '.').strip()
-                return float(clean_str)
-            except ValueError:
-                return 0.0
-
-        def safe_int(value):
-            return int(safe_float(value))
-
         try:
-            # 1. CSV 읽기
-            try:
-                df = pd.read_csv(csv_path, encoding='cp949')
-            except UnicodeDecodeError:
-                df = pd.read_csv(csv_path, encoding='utf-8')
-
-            # 컬럼 이름 공백 제거
-            df.columns = df.columns.str.strip()
-
-            print(f"--------------------------------------------------")
-            print(f"[진단] 총 {len(df)}개의 계절 데이터를 읽었습니다.")
-            print(f"[진단] 컬럼 목록: {list(df.columns)}")
-            print(f"--------------------------------------------------")
-
-            success_count = 0
-            fail_count = 0
-            skip_count = 0
-
-            for index, row in df.iterrows():
-                try:
-                    # 1. Perfume ID 확인
-                    raw_id = row.get('perfume_id')
-                    if pd.isna(raw_id):
-                        continue
-
-                    p_id = safe_int(raw_id)
-
-                    # 2. 부모 테이블(Perfume)에 해당 ID가 있는지 확인
-                    try:
-                        perfume_instance = Perfume.objects.get(perfume_id=p_id)
-                    except Perfume.DoesNotExist:
-                        # 향수 정보가 먼저 등록되지 않았으면 저장 불가
-                        # print(f"⚠️ [건너뜀] 향수 ID {p_id}가 Perfume 테이블에 없습니다.")
-                        skip_count += 1
-                        continue
-
-                    # 3. 계절 점수 데이터 정제
-                    # 대소문자 구분 없이 가져오기 시도
-                    spring_val = row.get('spring') or row.get('Spring')
-                    summer_val = row.get('summer') or row.get('Summer')
-                    fall_val = row.get('fall') or row.get('Fall')
-                    winter_val = row.get('winter') or row.get('Winter')
-
-                    # 4. DB 저장 (update_or_create)
-                    PerfumeSeason.objects.update_or_create(
-                        perfume=perfume_instance,
-                        defaults={
-                            'spring': safe_float(spring_val),
-                            'summer': safe_float(summer_val),
-                            'fall': safe_float(fall_val),
-                            'winter': safe_float(winter_val),
-                        }
-                    )
-                    success_count += 1
-
-                except Exception as e:
-                    fail_count += 1
-                    print(f"❌ [실패] ID {p_id} 처리 중 에러: {e}")
-
-                if (index + 1) % 500 == 0:
-                    print(f"... {index + 1}개 처리 중")
-
-            print(f"\n==================================================")
-            print(f"✅ 최종 완료!")
-            print(f"   - CSV 전체 행: {len(df)}")
-            print(f"   - 성공(DB저장): {success_count}")
-            print(f"   - 실패(에러): {fail_count}")
-            print(f"   - 건너뜀(향수ID 없음): {skip_count}")
-            print(f"==================================================")
-
-            if skip_count > 0:
-                print(f"💡 [참고] {skip_count}개의 데이터는 'Perfume' 테이블에 해당 ID가 없어서 건너뛰었습니다.")
+            report = ImportReport(PerfumeSeason._meta.db_table)
+
+            # 부모 테이블(Perfume)의 ID는 한 번만 읽어 둡니다.
+            perfumes = report.resolver(Perfume)
+
+            # 1. CSV 읽기 → 청크마다 정제 후 바로 저장
+            chunks = read_csv_chunks(csv_path, encodings=('cp949', 'utf-8'), chunk_rows=kwargs['chunk_rows'])
+            for df in chunks:
+                if not report.read:
+                    print(f"--------------------------------------------------")
+                    print(f"[진단] 컬럼 목록: {list(df.columns)}")
+                    print(f"--------------------------------------------------")
+                report.read += len(df)
+
+                # 2. 컬럼 단위 정제 (계절 점수는 '92,5' 같은 소수점 쉼표도 허용, 변환 실패는 0.0)
+                #    대소문자 구분 없이 가져오기 시도
+                frame = pd.DataFrame({
+                    'perfume_id': to_int(column(df, 'perfume_id'), decimal_comma=True),
+                    **{
+                        field: to_float(column(df, field, field.capitalize()), default=0.0, decimal_comma=True)
+                        for field in SEASON_FIELDS
+                    },
+                })
+                frame = valid_rows(frame, frame['perfume_id'].notna(), report, 'perfume_id 없음')
+
+                # 3. 부모 테이블(Perfume)에 해당 ID가 있는지 한 번에 확인
+                frame = valid_rows(frame, perfumes.exists(frame['perfume_id'], 'perfume_id'), report, '향수ID 없음')
+                frame = dedupe(frame, ['perfume_id'])
+
+                # 4. DB 저장 (청크 단위 upsert)
+                objs = [PerfumeSeason(**rec) for rec in frame.to_dict('records')]
+                bulk_upsert(PerfumeSeason, objs, update_fields=SEASON_FIELDS, report=report)
+
+            report.print_summary()
+
+            if report.skipped.get('향수ID 없음'):
+                print(f"💡 [참고] {report.skipped['향수ID 없음']}개의 데이터는 'Perfume' 테이블에 해당 ID가 없어서 건너뛰었습니다.")
                 print(f"   (먼저 import_perfume.py를 실행해서 향수 데이터를 모두 넣어야 합니다.)")
 
+            # 카탈로그 스냅샷 갱신 (서빙 워커가 다음 요청에서 새로 읽습니다)
+            version = bump_catalog_version()
+            print(f"📦 카탈로그 버전 갱신: v{version}")
+
         except FileNotFoundError:
-            print(f"❌ '{csv_path}' 파일을 찾을 수 없습니다.")
+            raise CommandError(f"'{csv_path}' 파일을 찾을 수 없습니다.")
         except Exception as e:
-            print(f"❌ 치명적 오류: {e}")
\ No newline at end of file
+            raise CommandError(f"치명적 오류: {e}") from e
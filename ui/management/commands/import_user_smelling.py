@@ -1,104 +1,104 @@
 
 import pandas as pd
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from ui.models import UserSmellingInput, TopBottom, Dress, Perfume
+from ui.sequences import allocate_ids, advance_sequence, SMELLING_USER_SEQUENCE
+from ui.management.import_engine import (
+    read_csv_chunks, add_chunk_rows_argument, column, to_str, to_int, dedupe, bulk_upsert, ImportReport
+)
 from django.conf import settings
 from pathlib import Path
 
+# 모델 필드 → CSV 컬럼 (문자열)
+TEXT_COLUMNS = {
+    'top_color': '상의_색상',
+    'top_category': '상의_카테고리',
+    'top_img': '상의_이미지_경로',
+    'bottom_color': '하의_색상',
+    'bottom_category': '하의_카테고리',
+    'bottom_img': '하의_이미지_경로',
+    'dress_color': '원피스_색상',
+    'dress_img': '원피스_이미지_경로',
+    'season': '계절',
+    'brand': 'Brand',
+    'perfume_img_url': 'perfume_img_url',
+}
+# 외래키 (attname) → CSV 컬럼, 참조 모델
+FK_COLUMNS = {
+    'top_id_id': ('상의_식별자', TopBottom),
+    'bottom_id_id': ('하의_식별자', TopBottom),
+    'dress_id_id': ('원피스_식별자', Dress),
+    'perfume_id_id': ('perfume_id', Perfume),
+}
+
 
 class Command(BaseCommand):
     help = 'user_smelling_input.csv 데이터를 읽어 user_smelling_input 테이블에 저장합니다.'
 
+    def add_arguments(self, parser):
+        add_chunk_rows_argument(parser)
+
     def handle(self, *args, **kwargs):
         csv_path = Path(settings.BASE_DIR) / 'user_smelling_input.csv'
-
-        # --- [안전한 데이터 변환 함수들] ---
-        def safe_int(value):
-            if pd.isna(value) or str(value).strip() == '':
-                return None
-            try:
-                return int(float(value))
-            except:
-                return None
-
-        def safe_str(value):
-            if pd.isna(value) or str(value).strip() == '':
-                return None
-            return str(value).strip()
+        chunk_rows = kwargs['chunk_rows']
 
         try:
-            # 1. CSV 읽기
-            try:
-                df = pd.read_csv(csv_path, encoding='utf-8-sig')
-            except:
-                df = pd.read_csv(csv_path, encoding='cp949')
-
-            print(f"총 {len(df)}개의 행을 처리합니다.")
-
-            success_count = 0
-            fail_count = 0
-
-            for index, row in df.iterrows():
-                try:
-                    # --- 외래키 객체 조회 (실제 DB에 해당 ID가 있는지 확인) ---
-
-                    # 1. 상의/하의 (TopBottom 모델)
-                    t_id = safe_int(row.get('상의_식별자'))
-                    top_obj = TopBottom.objects.filter(id=t_id).first() if t_id else None
-
-                    b_id = safe_int(row.get('하의_식별자'))
-                    bottom_obj = TopBottom.objects.filter(id=b_id).first() if b_id else None
-
-                    # 2. 원피스 (Dress 모델)
-                    d_id = safe_int(row.get('원피스_식별자'))
-                    dress_obj = Dress.objects.filter(id=d_id).first() if d_id else None
-
-                    # 3. 향수 (Perfume 모델)
-                    p_id = safe_int(row.get('perfume_id'))
-                    perfume_obj = Perfume.objects.filter(perfume_id=p_id).first() if p_id else None
-
-                    # --- DB 저장 ---
-                    # rate_id를 기준으로 중복 방지 (update_or_create)
-                    UserSmellingInput.objects.update_or_create(
-                        rate_id=safe_int(row.get('rate_id')),
-                        defaults={
-                            'smelling_user_id': safe_int(row.get('smelling_user_id')),
-
-                            # 상의 정보
-                            'top_id': top_obj,  # ForeignKey 객체 할당
-                            'top_color': safe_str(row.get('상의_색상')),
-                            'top_category': safe_str(row.get('상의_카테고리')),
-                            'top_img': safe_str(row.get('상의_이미지_경로')),
-
-                            # 하의 정보
-                            'bottom_id': bottom_obj,  # ForeignKey 객체 할당
-                            'bottom_color': safe_str(row.get('하의_색상')),
-                            'bottom_category': safe_str(row.get('하의_카테고리')),
-                            'bottom_img': safe_str(row.get('하의_이미지_경로')),
-
-                            # 원피스 정보
-                            'dress_id': dress_obj,  # ForeignKey 객체 할당
-                            'dress_color': safe_str(row.get('원피스_색상')),
-                            'dress_img': safe_str(row.get('원피스_이미지_경로')),
-
-                            # 공통/향수 정보
-                            'season': safe_str(row.get('계절')),
-                            'perfume_id': perfume_obj,  # ForeignKey 객체 할당
-                            'brand': safe_str(row.get('Brand')),
-                            'perfume_img_url': safe_str(row.get('perfume_img_url')),
-                            'smelling_rate': safe_int(row.get('smelling_rate')),
-                        }
-                    )
-                    success_count += 1
-
-                except Exception as e:
-                    fail_count += 1
-                    print(f"❌ {index + 1}행 처리 중 오류: {e}")
-
-                if (index + 1) % 100 == 0:
-                    print(f"... {index + 1}개 완료")
-
-            print(f"\n작업 완료! 성공: {success_count}, 실패: {fail_count}")
+            report = ImportReport(UserSmellingInput._meta.db_table)
+
+            # 외래키로 연결할 ID는 한 번만 읽어 둡니다.
+            resolvers = {field: report.resolver(model) for field, (_, model) in FK_COLUMNS.items()}
+
+            # smelling_user_id 번호 정리 (테이블 MAX 조회 없이 id_sequence 사용)
+            #    - CSV에 적힌 번호: 시퀀스를 그 최댓값 이상으로 올려 온라인 저장과 겹치지 않게 함
+            #      (청크마다 새 번호를 예약하므로 저장 전에 이 컬럼만 먼저 훑어 최댓값을 구합니다)
+            #    - 번호가 빈 행: 행마다 새 번호가 필요하므로 청크마다 블록으로 한 번에 예약
+            explicit_max = None
+            id_chunks = read_csv_chunks(csv_path, chunk_rows=chunk_rows,
+                                        usecols=lambda c: c.strip().lstrip('\ufeff') == 'smelling_user_id')
+            for df in id_chunks:
+                chunk_max = pd.Series(to_int(column(df, 'smelling_user_id')), dtype='Int64').max()
+                if not pd.isna(chunk_max):
+                    explicit_max = int(chunk_max) if explicit_max is None else max(explicit_max, int(chunk_max))
+            if explicit_max is not None:
+                advance_sequence(SMELLING_USER_SEQUENCE, explicit_max)
+
+            # 1. CSV 읽기 → 청크마다 정제 후 바로 저장
+            for df in read_csv_chunks(csv_path, chunk_rows=chunk_rows):
+                report.read += len(df)
+
+                frame = pd.DataFrame({
+                    'rate_id': to_int(column(df, 'rate_id')),
+                    'smelling_user_id': to_int(column(df, 'smelling_user_id')),
+                    **{field: to_int(column(df, col)) for field, (col, _) in FK_COLUMNS.items()},
+                    **{field: to_str(column(df, col)) for field, col in TEXT_COLUMNS.items()},
+                    'smelling_rate': to_int(column(df, 'smelling_rate')),
+                })
+
+                # 2. smelling_user_id가 빈 행에 새 번호 예약
+                missing = frame['smelling_user_id'].isna()
+                missing_count = int(missing.sum())
+                if missing_count:
+                    frame.loc[missing, 'smelling_user_id'] = list(allocate_ids(SMELLING_USER_SEQUENCE, missing_count))
+                    print(f"[진단] smelling_user_id가 없는 {missing_count}개 행에 새 번호를 예약했습니다.")
+
+                # 3. 외래키 확인 (실제 DB에 해당 ID가 있는지): 없으면 연결하지 않음 (요약에서 한꺼번에 보고)
+                for field, (col, _) in FK_COLUMNS.items():
+                    frame[field] = resolvers[field].resolve(frame[field], col)
+
+                # 4. DB 저장: rate_id를 기준으로 중복 방지 (rate_id가 빈 행은 새 행으로 추가)
+                has_rate_id = frame['rate_id'].notna()
+                frame = pd.concat([dedupe(frame[has_rate_id], ['rate_id']), frame[~has_rate_id]])
+                objs = [UserSmellingInput(**rec) for rec in frame.to_dict('records')]
+                bulk_upsert(
+                    UserSmellingInput, objs,
+                    update_fields=[
+                        'smelling_user_id', 'top_id', 'bottom_id', 'dress_id', 'perfume_id',
+                        *TEXT_COLUMNS, 'smelling_rate',
+                    ],
+                    report=report,
+                )
+
+            report.print_summary()
 
         except Exception as e:
-            print(f"🔥 치명적 오류: {e}")
+            raise CommandError(f"치명적 오류: {e}") from e
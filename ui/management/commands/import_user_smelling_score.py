@@ -1,66 +1,49 @@
 
 import pandas as pd
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from ui.models import UserSmellingMyScore
+from ui.management.import_engine import (
+    read_csv_chunks, add_chunk_rows_argument, column, to_int, to_float, valid_rows, dedupe, bulk_upsert, ImportReport
+)
 from django.conf import settings
 from pathlib import Path
 
+SCORE_COLUMNS = ['color_score', 'season_score', 'style_score', 'myscore']
+
 
 class Command(BaseCommand):
     help = 'user_smelling_myscore.csv 데이터를 읽어 DB에 저장합니다.'
 
+    def add_arguments(self, parser):
+        add_chunk_rows_argument(parser)
+
     def handle(self, *args, **kwargs):
         csv_path = Path(settings.BASE_DIR) / 'user_smelling_myscore.csv'
 
-        def safe_int(v):
-            if pd.isna(v) or str(v).strip() == '':
-                return None
-            try:
-                return int(float(v))
-            except:
-                return None
-
-        def safe_float(v):
-            if pd.isna(v) or str(v).strip() == '':
-                return None
-            try:
-                return float(v)
-            except:
-                return None
-
         try:
-            try:
-                df = pd.read_csv(csv_path, encoding='utf-8-sig')
-            except:
-                df = pd.read_csv(csv_path, encoding='cp949')
-
-            print(f"총 {len(df)}개의 행을 처리합니다.")
-
-            success = 0
-            fail = 0
-
-            for idx, row in df.iterrows():
-                try:
-                    UserSmellingMyScore.objects.update_or_create(
-                        perfume_id=safe_int(row.get('perfume_id')),
-                        user_id=safe_int(row.get('user_id')),
-                        defaults={
-                            'color_score': safe_float(row.get('color_score')),
-                            'season_score': safe_float(row.get('season_score')),
-                            'style_score': safe_float(row.get('style_score')),
-                            'myscore': safe_float(row.get('myscore')),
-                        }
-                    )
-                    success += 1
-
-                except Exception as e:
-                    fail += 1
-                    print(f"❌ {idx + 1}행 오류: {e}")
-
-                if (idx + 1) % 1000 == 0:
-                    print(f"... {idx + 1}개 완료")
-
-            print(f"\n작업 완료! 성공: {success}, 실패: {fail}")
+            report = ImportReport(UserSmellingMyScore._meta.db_table)
+
+            for df in read_csv_chunks(csv_path, chunk_rows=kwargs['chunk_rows']):
+                report.read += len(df)
+
+                frame = pd.DataFrame({
+                    'perfume_id': to_int(column(df, 'perfume_id')),
+                    'user_id': to_int(column(df, 'user_id')),
+                    **{field: to_float(column(df, field)) for field in SCORE_COLUMNS},
+                })
+                # (user_id, perfume_id) 조합이 키이므로 둘 중 하나라도 없으면 저장 불가
+                frame = valid_rows(frame, frame['perfume_id'].notna() & frame['user_id'].notna(), report, '키 없음')
+                frame = dedupe(frame, ['user_id', 'perfume_id'])
+
+                objs = [UserSmellingMyScore(**rec) for rec in frame.to_dict('records')]
+                bulk_upsert(
+                    UserSmellingMyScore, objs,
+                    update_fields=SCORE_COLUMNS,
+                    unique_fields=['user_id', 'perfume_id'],
+                    report=report,
+                )
+
+            report.print_summary()
 
         except Exception as e:
-            print(f"🔥 치명적 오류: {e}")
+            raise CommandError(f"치명적 오류: {e}") from e
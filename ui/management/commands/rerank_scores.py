@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ui.recommend.calculation_v4 import MAX_TOP_K
+from ui.recommend.rerank import rerank_scores, rerank_lock
+
+
+class Command(BaseCommand):
+    help = '최신 Weight로 모든 사용자의 Score를 다시 정렬합니다. (저장된 점수 성분 벡터 재사용)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--k', type=int, default=None,
+                            help=f'모든 사용자에게 같은 상위 개수 적용 (최대 {MAX_TOP_K}, 기본: 사용자별 기존 행 수 유지)')
+
+    def handle(self, *args, **options):
+        k = min(max(options['k'], 1), MAX_TOP_K) if options['k'] is not None else None
+        try:
+            with rerank_lock():
+                summary = rerank_scores(k=k)
+        except Exception as e:
+            raise CommandError(f'❌ 재정렬 실패: {e}') from e
+        self.stdout.write(self.style.SUCCESS(f"✅ 재정렬 완료: {summary}"))
@@ -0,0 +1,282 @@
+import codecs
+import time
+
+import numpy as np
+import pandas as pd
+from django.db import connection, transaction
+
+# =========================================================
+# CSV import 공용 엔진
+# 설명: import_* 커맨드가 공통으로 쓰는 읽기 / 검증 / 저장 도구입니다.
+#       - 검증: 행마다 safe_int를 부르는 대신 pandas 컬럼 단위로 한 번에 변환 (잘못된 값은 None/기본값)
+#       - 저장: update_or_create(행당 SELECT + INSERT/UPDATE) 대신
+#               CHUNK_SIZE개씩 bulk_create(update_conflicts=True) 한 번으로 upsert
+#               (청크 저장이 실패하면 그 청크만 행 단위로 다시 시도해 실패 행을 찾아냅니다)
+#       - 보고: 테이블별 읽은/저장/건너뜀/실패 행 수와 초당 처리 행 수
+#       - 스트리밍: CSV를 READ_CHUNK_ROWS행씩 읽어 그 청크를 저장한 뒤 다음 청크를 읽으므로
+#                   파일 크기와 상관없이 메모리 사용량이 일정합니다. (--chunk-rows 0이면 파일 전체를 한 번에)
+#       - FK: 참조 테이블의 키를 import마다 한 번만 읽어 두고(ForeignKeyResolver) 청크 단위로 확인,
+#             없는 색상/향조는 한 번에 생성, 연결되지 않은 키는 마지막 요약에서 한꺼번에 보고
+# =========================================================
+CHUNK_SIZE = 1000
+READ_CHUNK_ROWS = 50000
+SNIFF_BLOCK_BYTES = 1 << 20
+UNRESOLVED_SAMPLES = 5
+
+
+# ---------------------------------------------------------
+# [읽기] CSV → DataFrame (컬럼 이름 공백/BOM 제거)
+# ---------------------------------------------------------
+def sniff_encoding(csv_path, encodings=("utf-8-sig", "cp949")):
+    """
+    encodings를 차례로 시도해 파일 전체가 디코딩되는 첫 인코딩을 반환합니다.
+    (SNIFF_BLOCK_BYTES씩 읽으므로 큰 파일도 메모리를 쓰지 않고, CSV를 두 번 파싱하지 않습니다)
+    """
+    last_error = None
+    for encoding in encodings:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            with open(csv_path, "rb") as f:
+                while True:
+                    block = f.read(SNIFF_BLOCK_BYTES)
+                    if not block:
+                        break
+                    decoder.decode(block)
+                decoder.decode(b"", final=True)
+            return encoding
+        except UnicodeDecodeError as e:
+            last_error = e
+    raise last_error
+
+
+def _clean_columns(df):
+    df.columns = df.columns.str.strip().str.lstrip("\ufeff")
+    return df
+
+
+def read_csv_chunks(csv_path, encodings=("utf-8-sig", "cp949"), chunk_rows=READ_CHUNK_ROWS, usecols=None):
+    """chunk_rows행씩 DataFrame을 차례로 돌려줍니다. chunk_rows가 0이면 파일 전체를 한 번에 돌려줍니다."""
+    encoding = sniff_encoding(csv_path, encodings)
+    if not chunk_rows:
+        yield _clean_columns(pd.read_csv(csv_path, encoding=encoding, usecols=usecols))
+        return
+    with pd.read_csv(csv_path, encoding=encoding, usecols=usecols, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            yield _clean_columns(chunk)
+
+
+def add_chunk_rows_argument(parser):
+    parser.add_argument(
+        '--chunk-rows', type=int, default=READ_CHUNK_ROWS,
+        help=f'CSV를 이 행 수씩 읽어 바로 저장합니다. 0이면 파일 전체를 한 번에 읽습니다. (기본 {READ_CHUNK_ROWS})',
+    )
+
+
+def column(df, *names):
+    """names 중 처음으로 존재하는 컬럼 (대소문자 표기가 다른 CSV 대응). 없으면 빈 컬럼."""
+    for name in names:
+        if name in df.columns:
+            return df[name]
+    return pd.Series([None] * len(df), index=df.index, dtype=object)
+
+
+# ---------------------------------------------------------
+# [검증] 컬럼 단위 변환
+# ---------------------------------------------------------
+def _python_values(series):
+    # numpy 스칼라 대신 파이썬 int/float/str, 결측은 None (DB 드라이버에 그대로 넘길 수 있게)
+    return series.astype(object).where(series.notna(), None)
+
+
+def to_str(series):
+    """앞뒤 공백 제거, 빈 문자열/결측은 None"""
+    s = series.astype("string").str.strip()
+    return _python_values(s.mask(s.fillna("") == ""))
+
+
+def _numeric(series, decimal_comma):
+    # decimal_comma=True면 '2,89' → 2.89, 아니면 '1,234' → 1234 (천 단위 구분)
+    s = series.astype("string").str.strip().str.replace(",", "." if decimal_comma else "", regex=False)
+    return pd.to_numeric(s, errors="coerce").astype("float64")
+
+
+def to_float(series, default=None, decimal_comma=False):
+    """숫자 변환 (변환 실패/결측은 default)"""
+    values = _numeric(series, decimal_comma)
+    if default is not None:
+        values = values.fillna(default)
+    return _python_values(values)
+
+
+def to_int(series, default=None, decimal_comma=False):
+    """정수 변환 (100026.0 → 100026, 소수점 이하는 버림). 변환 실패/결측은 default"""
+    ints = np.trunc(_numeric(series, decimal_comma)).astype("Int64")
+    if default is not None:
+        ints = ints.fillna(default)
+    return _python_values(ints)
+
+
+def nullable(series):
+    """값은 그대로 두고 결측(NaN)만 None으로"""
+    return _python_values(series)
+
+
+# ---------------------------------------------------------
+# [보고] 테이블별 처리 결과
+# ---------------------------------------------------------
+class ImportReport:
+    def __init__(self, table):
+        self.table = table
+        self.read = 0
+        self.written = 0
+        self.failed = 0
+        self.skipped = {}
+        self.resolvers = {}
+        self.started = time.perf_counter()
+
+    def resolver(self, model, create=None):
+        """model의 ForeignKeyResolver (같은 import 안에서는 키 집합을 한 번만 읽도록 재사용)"""
+        if model not in self.resolvers:
+            self.resolvers[model] = ForeignKeyResolver(model, create=create)
+        return self.resolvers[model]
+
+    def skip(self, reason, count=1):
+        if count:
+            self.skipped[reason] = self.skipped.get(reason, 0) + int(count)
+
+    @property
+    def seconds(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_sec(self):
+        return self.written / self.seconds if self.seconds > 0 else 0.0
+
+    def print_summary(self):
+        print(f"\n==================================================")
+        print(f"✅ [{self.table}] 최종 완료! ({self.seconds:.2f}초, {self.rows_per_sec:,.0f} rows/s)")
+        print(f"   - CSV 전체 행: {self.read}")
+        print(f"   - 성공(DB저장): {self.written}")
+        print(f"   - 실패(에러): {self.failed}")
+        for reason, count in self.skipped.items():
+            print(f"   - 건너뜀({reason}): {count}")
+        for resolver in self.resolvers.values():
+            resolver.print_summary()
+        print(f"==================================================")
+
+
+# ---------------------------------------------------------
+# [FK] 참조 키 확인
+# ---------------------------------------------------------
+class ForeignKeyResolver:
+    """
+    참조 테이블(model)의 PK 집합을 한 번만 읽어 두고, 청크의 FK 컬럼을 메모리에서 확인합니다.
+    create가 있으면(색상/향조) 없는 키를 create(key)로 한 번에 만들고, 없으면 연결하지 않은 키를 모아 둡니다.
+    """
+
+    def __init__(self, model, create=None):
+        self.model = model
+        self.table = model._meta.db_table
+        self.create = create
+        self.keys = set(model.objects.values_list("pk", flat=True))
+        self.created = 0
+        self.unresolved = {}  # label → [행 수, 예시 키 목록]
+
+    def _missing(self, series):
+        return series.notna() & ~series.isin(self.keys)
+
+    def _record(self, series, missing, label):
+        entry = self.unresolved.setdefault(label, [0, []])
+        entry[0] += int(missing.sum())
+        for key in pd.unique(series[missing]):
+            if len(entry[1]) >= UNRESOLVED_SAMPLES:
+                break
+            if key not in entry[1]:
+                entry[1].append(key)
+
+    def resolve(self, series, label):
+        """
+        없는 키를 create로 만들거나(create가 있을 때) None으로 바꾼 컬럼을 반환합니다.
+        label은 요약에 표시할 CSV 컬럼 이름입니다.
+        """
+        missing = self._missing(series)
+        if not missing.any():
+            return series
+
+        if self.create is not None:
+            new_keys = sorted(set(series[missing]))
+            self.model.objects.bulk_create([self.create(key) for key in new_keys], ignore_conflicts=True)
+            self.keys.update(new_keys)
+            self.created += len(new_keys)
+            return series
+
+        self._record(series, missing, label)
+        return series.where(~missing, None)
+
+    def exists(self, series, label):
+        """키가 참조 테이블에 있는 행의 mask (부모 행이 꼭 필요한 경우 valid_rows와 함께 사용)"""
+        missing = series.isna() | ~series.isin(self.keys)
+        self._record(series, missing & series.notna(), label)
+        return ~missing
+
+    def print_summary(self):
+        if self.created:
+            print(f"   - 새로 만든 참조({self.table}): {self.created}")
+        for label, (count, samples) in self.unresolved.items():
+            if count:
+                examples = ", ".join(str(key) for key in samples)
+                print(f"   - ⚠️ 연결 안 됨({label} → {self.table}): {count}건 (예: {examples})")
+
+
+# ---------------------------------------------------------
+# [저장] 청크 단위 bulk upsert
+# ---------------------------------------------------------
+def bulk_upsert(model, objs, update_fields, unique_fields=None, report=None, chunk_size=CHUNK_SIZE):
+    """
+    objs를 chunk_size개씩 INSERT ... ON DUPLICATE KEY UPDATE (또는 ON CONFLICT DO UPDATE)로 저장합니다.
+    unique_fields 기본값은 PK. 저장한 행 수를 반환합니다.
+    """
+    table = model._meta.db_table
+    report = report or ImportReport(table)
+
+    options = {"update_conflicts": True, "update_fields": list(update_fields)}
+    # MySQL은 ON DUPLICATE KEY UPDATE라 충돌 대상 컬럼을 지정할 수 없습니다.
+    if connection.features.supports_update_conflicts_with_target:
+        options["unique_fields"] = list(unique_fields or [model._meta.pk.name])
+
+    written = 0
+    for start in range(0, len(objs), chunk_size):
+        chunk = objs[start:start + chunk_size]
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(chunk, **options)
+            written += len(chunk)
+        except Exception as e:
+            print(f"⚠️ [{table}] {start + 1}~{start + len(chunk)}행 청크 저장 실패 → 행 단위로 재시도: {e}")
+            for obj in chunk:
+                try:
+                    with transaction.atomic():
+                        model.objects.bulk_create([obj], **options)
+                    written += 1
+                except Exception as row_error:
+                    report.failed += 1
+                    print(f"❌ [실패] {table} {obj.pk} 저장 중 에러: {row_error}")
+
+        print(f"... [{table}] {report.written + written}개 저장")
+
+    report.written += written
+    return written
+
+
+def valid_rows(frame, mask, report, reason):
+    """mask가 False인 행은 reason으로 건너뜀 처리하고 나머지 행만 돌려줍니다."""
+    report.skip(reason, int((~mask).sum()))
+    return frame[mask]
+
+
+def dedupe(df, keys):
+    """
+    같은 키가 여러 번 나오면 마지막 행만 남깁니다. (update_or_create로 덮어쓰던 것과 같은 결과)
+    한 INSERT 안에 같은 키가 두 번 있으면 일부 DB가 upsert를 거부하기 때문입니다.
+    """
+    return df.drop_duplicates(subset=keys, keep="last")
@@ -293,3 +293,114 @@ class UserSmellingMyScore(models.Model):
             models.Index(fields=["user_id"]),
             models.Index(fields=["perfume_id"]),
         ]
+
+
+class CatalogVersion(models.Model):
+    # Table: catalog_version
+    # import_* 커맨드가 카탈로그 테이블을 갱신할 때마다 version을 올려 워커의 스냅샷을 무효화합니다.
+    name = models.CharField(max_length=50, primary_key=True, db_column="name")
+    version = models.IntegerField(default=0, db_column="version")
+    updated_at = models.DateTimeField(auto_now=True, db_column="updated_at")
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+    class Meta:
+        db_table = "catalog_version"
+        app_label = 'ui'
+
+
+class StylePrediction(models.Model):
+    # Table: style_prediction
+    # build_style_predictions 커맨드가 도달 가능한 모든 코디(상의×하의 조합, 원피스)의 예측 스타일을 미리 저장합니다.
+    # 키 형식: 투피스 "T{상의id}-B{하의id}", 원피스 "D{원피스id}"
+    outfit_key = models.CharField(max_length=50, primary_key=True, db_column="outfit_key")
+    top_id = models.IntegerField(null=True, blank=True, db_column="top_id")
+    bottom_id = models.IntegerField(null=True, blank=True, db_column="bottom_id")
+    dress_id = models.IntegerField(null=True, blank=True, db_column="dress_id")
+    style = models.CharField(max_length=50, db_column="style")
+    created_at = models.DateTimeField(auto_now_add=True, db_column="created_at")
+
+    @staticmethod
+    def make_key(top_id=None, bottom_id=None, dress_id=None):
+        if dress_id:
+            return f"D{dress_id}"
+        return f"T{top_id}-B{bottom_id}"
+
+    def __str__(self):
+        return f"{self.outfit_key} → {self.style}"
+
+    class Meta:
+        db_table = "style_prediction"
+        app_label = 'ui'
+
+
+class ScoreComponents(models.Model):
+    # Table: score_components
+    # 코디 서명(상의/하의/원피스, 계절, 비선호 향조)별 정규화된 style/color/season 점수 벡터.
+    # 가중치와 무관하므로 Weight가 바뀌면 이 벡터의 가중합만 다시 계산해 Score를 재정렬합니다.
+    # 벡터는 후보 향수 순서대로 numpy 바이트(float64, perfume_ids는 int64)로 저장합니다.
+    signature_key = models.CharField(max_length=64, primary_key=True, db_column="signature_key")
+    catalog_version = models.IntegerField(db_column="catalog_version")
+    user_style = models.CharField(max_length=50, db_column="user_style")
+    perfume_ids = models.BinaryField(db_column="perfume_ids")
+    style_scores = models.BinaryField(db_column="style_scores")
+    color_scores = models.BinaryField(db_column="color_scores")
+    season_scores = models.BinaryField(db_column="season_scores")
+    updated_at = models.DateTimeField(auto_now=True, db_column="updated_at")
+
+    def __str__(self):
+        return f"{self.signature_key[:12]} (catalog v{self.catalog_version})"
+
+    class Meta:
+        db_table = "score_components"
+        app_label = 'ui'
+
+
+class PerfumeFeature(models.Model):
+    # Table: perfume_feature
+    # 추천 계산용 향수 특징을 향수당 한 행으로 펼쳐 둔 비정규화 테이블 (카탈로그 import 후 bump_catalog_version이 다시 만듭니다)
+    # perfume / perfume_season / perfume_classification / perfume_color 네 테이블을 JOIN한 결과:
+    #   - mainaccord1~3 : 상위 3개 향조 (PerfumeColor PK)
+    #   - fragrance     : 향 분류
+    #   - *_share       : 계절 비율을 행 합계로 나눈 값 (합계가 0이면 0, 계절 정보가 없으면 NULL)
+    #   - rgb_r/g/b     : 향조 색상 6:3:1 혼합 RGB (향조가 하나라도 없으면 NULL)
+    perfume = models.OneToOneField(Perfume, primary_key=True, on_delete=models.CASCADE, related_name="feature",
+                                   db_column="perfume_id")
+    mainaccord1 = models.CharField(max_length=255, null=True, blank=True, db_column="mainaccord1")
+    mainaccord2 = models.CharField(max_length=255, null=True, blank=True, db_column="mainaccord2")
+    mainaccord3 = models.CharField(max_length=255, null=True, blank=True, db_column="mainaccord3")
+    fragrance = models.CharField(max_length=255, null=True, blank=True, db_column="fragrance")
+    spring_share = models.FloatField(null=True, blank=True, db_column="spring_share")
+    summer_share = models.FloatField(null=True, blank=True, db_column="summer_share")
+    fall_share = models.FloatField(null=True, blank=True, db_column="fall_share")
+    winter_share = models.FloatField(null=True, blank=True, db_column="winter_share")
+    rgb_r = models.FloatField(null=True, blank=True, db_column="rgb_r")
+    rgb_g = models.FloatField(null=True, blank=True, db_column="rgb_g")
+    rgb_b = models.FloatField(null=True, blank=True, db_column="rgb_b")
+    built_at = models.DateTimeField(auto_now=True, db_column="built_at")
+
+    def __str__(self):
+        return f"{self.perfume_id} ({self.fragrance})"
+
+    class Meta:
+        db_table = "perfume_feature"
+        app_label = 'ui'
+        indexes = [
+            models.Index(fields=["fragrance"]),
+        ]
+
+
+class IdSequence(models.Model):
+    # Table: id_sequence
+    # 테이블 MAX 조회 없이 번호를 나눠 주는 시퀀스 (ui/sequences.py의 allocate_ids 참고)
+    # last_value = 마지막으로 나눠 준 번호. 온라인 저장은 1개씩, 배치 import는 블록 단위로 예약합니다.
+    name = models.CharField(max_length=50, primary_key=True, db_column="name")
+    last_value = models.BigIntegerField(default=0, db_column="last_value")
+
+    def __str__(self):
+        return f"{self.name} = {self.last_value}"
+
+    class Meta:
+        db_table = "id_sequence"
+        app_label = 'ui'
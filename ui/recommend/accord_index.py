@@ -0,0 +1,63 @@
+import numpy as np
+
+# =========================================================
+# 향조 역색인 (Accord → 향수 마스크)
+# 설명: PerfumeColor.mainaccord마다 "mainaccord1~3 중에 이 향조가 있는 향수" 불리언 마스크를 한 번만 만들어 둡니다.
+#       비선호 향조 제외는 마스크 몇 개를 OR한 뒤 뒤집기만 하면 되고,
+#       검색처럼 향조 조건이 필요한 다른 API도 같은 색인을 씁니다.
+# =========================================================
+
+
+class AccordIndex:
+    """
+    - names : 향조 이름 튜플 (카탈로그 accord_names와 같은 순서)
+    - masks : (A, N) bool, masks[a, i] = i번째 향수의 상위 3개 향조에 a가 포함되는지
+    """
+
+    def __init__(self, accord_names, accord_ids):
+        self.names = tuple(accord_names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        n_accords = len(self.names)
+        n_perfumes = len(accord_ids)
+
+        # 맨 끝 한 행은 향조 누락(-1)용 더미 행으로 쓰고 버립니다.
+        masks = np.zeros((n_accords + 1, n_perfumes), dtype=bool)
+        rows = np.arange(n_perfumes)
+        for col in range(accord_ids.shape[1] if accord_ids.ndim == 2 else 0):
+            masks[accord_ids[:, col], rows] = True
+        masks = masks[:n_accords]
+        masks.setflags(write=False)
+        self.masks = masks
+        self.n_perfumes = n_perfumes
+
+    def codes(self, accords):
+        """향조 이름 목록 → 인덱스 배열 (색인에 없는 이름은 무시)"""
+        return np.array([self.index[a] for a in accords if a in self.index], dtype=np.intp)
+
+    def any_of(self, accords):
+        """(N,) 주어진 향조 중 하나라도 가진 향수"""
+        codes = self.codes(accords)
+        if len(codes) == 0:
+            return np.zeros(self.n_perfumes, dtype=bool)
+        return self.masks[codes].any(axis=0)
+
+    def all_of(self, accords):
+        """(N,) 주어진 향조를 모두 가진 향수 (색인에 없는 향조가 있으면 아무것도 없음)"""
+        accords = list(accords)
+        codes = self.codes(accords)
+        if len(codes) < len(set(accords)):
+            return np.zeros(self.n_perfumes, dtype=bool)
+        if len(codes) == 0:
+            return np.ones(self.n_perfumes, dtype=bool)
+        return self.masks[codes].all(axis=0)
+
+    def excluding(self, accords):
+        """(N,) 주어진 향조를 하나도 갖지 않은 향수 (비선호 향조 필터)"""
+        return ~self.any_of(accords)
+
+    def excluding_matrix(self, disliked):
+        """
+        (U, A) bool 사용자별 비선호 향조 표 → (U, N) 제외 여부.
+        bool 행렬곱은 "하나라도 겹치면 True"(OR of AND)로 계산됩니다.
+        """
+        return np.matmul(disliked, self.masks)
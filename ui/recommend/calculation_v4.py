@@ -1,94 +1,262 @@
 
 ############ style score 등수를 점수로 변환해서 반영
 from ui.models import (
-    UserInfo, Perfume, PerfumeClassification,
-    PerfumeColor, PerfumeSeason, Score,
-    TopBottom, Dress, ClothesColor, Weight
+    UserInfo, Score,
+    TopBottom, Dress, Weight, StylePrediction
 )
-from django.db.models import Q
-import math, re
 import pandas as pd
-import joblib
-import os
-from django.conf import settings
-from collections import defaultdict
-from sklearn.preprocessing import MinMaxScaler
+from django.db import transaction
 import numpy as np
-import itertools
+
+from ui.recommend.catalog import get_catalog, SEASON_COLUMNS
+from ui.recommend.model_registry import style_models
+from ui.recommend.result_cache import recommendation_cache, outfit_signature, CachedScore
+from ui.recommend.score_store import write_scores
+from ui.recommend.score_components import ComponentVectors, signature_key, save_components, stored_component_keys
 
 # =========================================================
-# 모델 로딩: 프로젝트 루트 경로 내 ml_models 폴더에서 학습된 모델을 로드합니다.
+# [상수] 스타일별 향 분류 점수 / 계절 매핑
+# 설명: 예측된 스타일에 어울리는 향조(Accords) 점수표와 사용자 계절 입력(한글/영어) 매핑
 # =========================================================
-BASE_PATH = os.path.join(settings.BASE_DIR, 'ui', 'recommend', 'models')
-
-# 0: 상하의(투피스)용 모델, 1: 원피스용 모델
-model_0 = joblib.load(os.path.join(BASE_PATH, "0_style_model.pkl"))
-encoder_0 = joblib.load(os.path.join(BASE_PATH, "0_clothes_encoder.pkl"))
-label_encoder_0 = joblib.load(os.path.join(BASE_PATH, "0_style_label_encoder.pkl"))
+STYLE_FRAGRANCE_SCORE = {
+    "로맨틱": {
+        "플로럴향, 달콤한향": 7,
+        "싱그러운 풀 향": 4,
+        "머스크같은 중후한향": 2,
+        "파우더느낌의 부드러운향": 6,
+        "시원하고 신선한 바다 향": 5,
+        "감귤류의 상큼한 향": 2,
+        "라벤더같은 상쾌한향": 2,
+    },
+    "섹시": {
+        "플로럴향, 달콤한향": 5,
+        "싱그러운 풀 향": 6.5,
+        "머스크같은 중후한향": 6.5,
+        "파우더느낌의 부드러운향": 3,
+        "시원하고 신선한 바다 향": 3,
+        "감귤류의 상큼한 향": 3,
+        "라벤더같은 상쾌한향": 3,
+    },
+    "소피스트케이티드": {
+        "플로럴향, 달콤한향": 6,
+        "싱그러운 풀 향": 4,
+        "머스크같은 중후한향": 4,
+        "파우더느낌의 부드러운향": 7,
+        "시원하고 신선한 바다 향": 4,
+        "감귤류의 상큼한 향": 1.5,
+        "라벤더같은 상쾌한향": 1.5,
+    },
+    "스포티": {
+        "플로럴향, 달콤한향": 5,
+        "싱그러운 풀 향": 4,
+        "머스크같은 중후한향": 2,
+        "파우더느낌의 부드러운향": 3,
+        "시원하고 신선한 바다 향": 7,
+        "감귤류의 상큼한 향": 5,
+        "라벤더같은 상쾌한향": 2,
+    },
+    "클래식": {
+        "플로럴향, 달콤한향": 3.5,
+        "싱그러운 풀 향": 4.5,
+        "머스크같은 중후한향": 2,
+        "파우더느낌의 부드러운향": 6,
+        "시원하고 신선한 바다 향": 7,
+        "감귤류의 상큼한 향": 2,
+        "라벤더같은 상쾌한향": 3.5,
+    },
+    "젠더리스": {
+        "플로럴향, 달콤한향": 5.5,
+        "싱그러운 풀 향": 5.5,
+        "머스크같은 중후한향": 2,
+        "파우더느낌의 부드러운향": 7,
+        "시원하고 신선한 바다 향": 4,
+        "감귤류의 상큼한 향": 4,
+        "라벤더같은 상쾌한향": 2,
+    },
+    "아방가르드": {
+        "플로럴향, 달콤한향": 4,
+        "싱그러운 풀 향": 2.5,
+        "머스크같은 중후한향": 1,
+        "파우더느낌의 부드러운향": 5.5,
+        "시원하고 신선한 바다 향": 7,
+        "감귤류의 상큼한 향": 5.5,
+        "라벤더같은 상쾌한향": 2.5,
+    }
+}
 
-model_1 = joblib.load(os.path.join(BASE_PATH, "1_style_model.pkl"))
-encoder_1 = joblib.load(os.path.join(BASE_PATH, "1_clothes_encoder.pkl"))
-label_encoder_1 = joblib.load(os.path.join(BASE_PATH, "1_style_label_encoder.pkl"))
+SEASON_MAP = {
+    "봄": "spring", "여름": "summer", "가을": "fall", "겨울": "winter",
+    "spring": "spring", "summer": "summer", "fall": "fall", "winter": "winter"
+}
 
 
 # =========================================================
-# [기능] 색상 문자열 파싱
-# 설명: DB의 '#FFFFFF' 또는 'rgb(255,255,255)' 문자열을 숫자 튜플 (R, G, B)로 변환합니다.
+# [기능] 계절 점수 계산 (벡터 버전)
+# 설명: (N, 4) 계절 비율 행렬(perfume_feature의 *_share)에서 사용자 계절 비율을 100점 만점으로 환산
+#       (비율은 특징 테이블을 만들 때 행 합계로 나눠 두었고, 합계 0이면 0입니다)
 # =========================================================
-def parse_rgb(x):
-    if not x:
-        raise ValueError("❌ [데이터 누락] DB에 색상 값이 비어 있는 행이 있습니다.")
+def calc_season_score_array(share_mat, user_season):
+    return share_mat[:, SEASON_COLUMNS.index(user_season)] * 100
 
-    x_str = str(x).strip()
 
-    # 1. 헥사코드 처리 (#CCCCCC 등)
-    if x_str.startswith('#'):
-        hex_val = x_str.lstrip('#')
-        if len(hex_val) == 6:
-            return tuple(int(hex_val[i:i+2], 16) for i in (0, 2, 4))
-        else:
-            raise ValueError(f"❌ [데이터 오류] 잘못된 헥사코드 형식: '{x_str}'")
+# =========================================================
+# [기능] 사용자 코디 조회
+# 설명: UserInfo가 가리키는 상의/하의/원피스 객체를 색상 FK와 함께 가져옵니다.
+# =========================================================
+def load_outfit(user_row):
+    top = bottom = dress = None
+    if user_row.top_id_id:
+        print(f"🔍 상의 병합 중 (ID: {user_row.top_id_id})...")
+        top = TopBottom.objects.select_related("top_color").get(pk=user_row.top_id_id)
+    if user_row.bottom_id_id:
+        print(f"🔍 하의 병합 중 (ID: {user_row.bottom_id_id})...")
+        bottom = TopBottom.objects.select_related("bottom_color").get(pk=user_row.bottom_id_id)
+    if user_row.dress_id_id:
+        print(f"🔍 원피스 병합 중 (ID: {user_row.dress_id_id})...")
+        dress = Dress.objects.select_related("dress_color").get(pk=user_row.dress_id_id)
+    return top, bottom, dress
 
-    # 2. 숫자 기반 형식 처리 (rgb(...) 또는 (r,g,b))
-    nums = list(map(int, re.findall(r"\d+", x_str)))
-    if len(nums) >= 3:
-        return tuple(nums[:3])
 
-    raise ValueError(f"❌ [데이터 오류] 지원하지 않는 색상 형식입니다: '{x_str}'.")
+# =========================================================
+# [기능] 코디 → 스타일 모델 입력 컬럼
+# 설명: DB 필드에서 직접 데이터를 추출하여 셋팅 (기본값 없음)
+# =========================================================
+def outfit_features(top=None, bottom=None, dress=None):
+    row = {}
+    if top is not None:
+        row["상의_카테고리"] = top.top_category
+        row["상의_색상"] = top.top_color.color  # 색상 데이터 필수
+        row["상의_소매기장"] = top.top_sleeve_length
+        row["상의_소재"] = top.top_material
+        row["상의_프린트"] = top.top_print
+        row["상의_넥라인"] = top.top_neckline
+        row["상의_핏"] = top.top_fit
+        row["상의_서브스타일"] = top.sub_style
+    if bottom is not None:
+        row["하의_카테고리"] = bottom.bottom_category
+        row["하의_색상"] = bottom.bottom_color.color
+        row["하의_기장"] = bottom.bottom_length
+        row["하의_소재"] = bottom.bottom_material
+        row["하의_핏"] = bottom.bottom_fit
+        row["하의_서브스타일"] = bottom.sub_style
+    if dress is not None:
+        row["원피스_기장"] = dress.dress_length
+        row["원피스_색상"] = dress.dress_color.color
+        row["원피스_소매기장"] = dress.dress_sleeve_length
+        row["원피스_소재"] = dress.dress_material
+        row["원피스_프린트"] = dress.dress_print
+        row["원피스_핏"] = dress.dress_fit
+        row["원피스_넥라인"] = dress.dress_neckline
+        row["원피스_디테일"] = dress.dress_detail
+        row["원피스_서브스타일"] = dress.sub_style
+
+    if row.get("상의_카테고리") == "브라탑":
+        row["상의_카테고리"] = "탑"
+    return row
 
 
 # =========================================================
-# [기능] 향수 색상 혼합
-# 설명: 향수의 상위 3개 어코드 색상을 6:3:1 비율로 혼합하여 대표 RGB 벡터를 생성
+# [기능] 스타일 예측 (배치)
+# 설명: 같은 종류(투피스/원피스)의 코디 여러 개를 한 번의 transform/predict로 예측합니다.
 # =========================================================
-def mix_rgb(a1, a2, a3):
-    # 인덱스 에러 방지를 위한 Strict 체크
-    for idx, color in enumerate([a1, a2, a3], 1):
-        if not (isinstance(color, (tuple, list)) and len(color) >= 3):
-            raise ValueError(f"❌ [데이터 오류] {idx}번째 향조의 색상 데이터가 손상되었습니다.")
+def predict_styles(feature_rows, is_dress):
+    if not feature_rows:
+        return []
+
+    df = pd.DataFrame(feature_rows)
+    if not is_dress:
+        model, encoder, label_encoder = style_models.get(0)
+        df["색상_조합"] = df["상의_색상"].astype(str) + "_" + df["하의_색상"].astype(str)
+        df["핏_조합"] = df["상의_핏"].astype(str) + "_" + df["하의_핏"].astype(str)
+    else:
+        model, encoder, label_encoder = style_models.get(1)
+
+    # 인코더를 통해 변환 후 다시 DataFrame으로 만들어 컬럼 이름표를 유지 (UserWarning 방지)
+    raw_encoded = encoder.transform(df[list(encoder.feature_names_in_)].astype("object"))
+    encoded_df = pd.DataFrame(raw_encoded, columns=encoder.get_feature_names_out())
 
-    return [a1[i] * 0.6 + a2[i] * 0.3 + a3[i] * 0.1 for i in range(3)]
+    # 모델 예측 실행
+    return list(label_encoder.inverse_transform(model.predict(encoded_df)))
 
 
 # =========================================================
-# [기능] 색상 점수 계산
-# 설명: 사용자의 옷 색상 벡터와 향수의 색상 벡터 간의 유클리드 거리를 측정하여 100점 만점으로 환산
+# [기능] 사전 계산 스타일 조회
+# 설명: build_style_predictions 커맨드가 채운 StylePrediction 표에서 PK로 스타일을 찾습니다.
+#       {outfit_key: style} 을 반환하며, 표에 없는 키는 결과에서 빠집니다.
 # =========================================================
-def calc_color_score(c_vec, f_vec):
-    dist = math.sqrt(sum((a - b) ** 2 for a, b in zip(c_vec, f_vec)))
-    return 100 * (1 - dist / (255 * math.sqrt(3)))
+def lookup_styles(outfit_keys):
+    outfit_keys = list(set(outfit_keys))
+    if not outfit_keys:
+        return {}
+    return dict(
+        StylePrediction.objects.filter(outfit_key__in=outfit_keys).values_list("outfit_key", "style")
+    )
+
 
 # =========================================================
-def myscore_cal(user_id: int) -> list[Score]:
-    print(f"\n{'=' * 60}")
-    print(f"🚀 myscore_cal 시작: user_id={user_id}")
-    print(f"{'=' * 60}\n")
+# [기능] 행 단위 Min-Max 정규화
+# 설명: sklearn MinMaxScaler와 같은 식(x * scale + min_)으로 각 행을 0~1로 변환합니다.
+#       mask가 주어지면 True인 칸만으로 최소/최대를 구합니다. (사용자 × 향수 행렬용)
+# =========================================================
+def minmax_scale(raw, mask=None):
+    raw = np.atleast_2d(np.asarray(raw, dtype=float))
+    if mask is None:
+        mask = np.ones(raw.shape, dtype=bool)
+
+    with np.errstate(invalid="ignore", over="ignore"):
+        data_min = np.where(mask, raw, np.inf).min(axis=1, keepdims=True, initial=np.inf)
+        data_max = np.where(mask, raw, -np.inf).max(axis=1, keepdims=True, initial=-np.inf)
+        data_range = data_max - data_min
+        # 범위가 0인 행은 MinMaxScaler처럼 scale을 1로 둡니다. (후보가 없는 행도 여기에 포함)
+        data_range[~(data_range >= 10 * np.finfo(float).eps)] = 1.0
+        scale = 1 / data_range
+        return raw * scale + (0 - data_min * scale)
 
+
+# =========================================================
+# [기능] 상위 k개 선택
+# 설명: 전체 정렬 대신 부분 선택(np.partition)으로 k번째 점수를 찾고, 그 이상인 후보만 정렬합니다.
+#       동점은 원래 순서를 유지하므로 sorted(..., reverse=True)[:k]와 결과가 같습니다.
+# =========================================================
+DEFAULT_TOP_K = 3
+MAX_TOP_K = 50
+
+
+def select_top_k(scores, k):
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+
+    if k < n:
+        kth_value = np.partition(scores, n - k)[n - k]
+        idx = np.flatnonzero(scores >= kth_value)
+    else:
+        idx = np.arange(n)
+
+    order = np.lexsort((idx, -scores[idx]))
+    return idx[order][:k]
+
+
+# =========================================================
+def myscore_cal(user_id: int, k: int = DEFAULT_TOP_K) -> list[Score]:
     # ---------------------------------------------------------
     # 0. 사용자 조회: UserInfo 테이블에서 사용자 정보 설정
     # ---------------------------------------------------------
     user_row = UserInfo.objects.get(user_id=user_id)
     print(f"✅ 사용자 조회 성공: {user_row}")
+    return score_user(user_row, k=k)
+
+
+# =========================================================
+# [기능] UserInfo 인스턴스 기준 추천 계산
+# 설명: 아직 저장하지 않은 UserInfo도 받을 수 있어, 뷰가 트랜잭션 밖에서 먼저 계산하고
+#       저장은 나중에 짧게 할 수 있습니다. (DB 쓰기 없음: 재정렬용 점수 성분 벡터는
+#       요청 경로에서 저장하지 않고 rerank가 myscore_cal_many(store_vectors=True)로 서명 단위 일괄 저장)
+# =========================================================
+def score_user(user_row: UserInfo, k: int = DEFAULT_TOP_K) -> list[Score]:
+    print(f"\n{'=' * 60}")
+    print(f"🚀 myscore_cal 시작: user_id={user_row.user_id}")
+    print(f"{'=' * 60}\n")
 
     dislike_accords = (
         [x.strip() for x in user_row.disliked_accord.split(",")]
@@ -99,241 +267,89 @@ def myscore_cal(user_id: int) -> list[Score]:
     # 1. 향수 필터링: 사용자가 설정한 비선호 향조를 포함하는 향수를 1차적으로 제외
     # ---------------------------------------------------------
     print("\nSTEP 1: 향수 필터링 (비선호 향조 제외)")
-    perfume_qs = Perfume.objects.exclude(
-        Q(mainaccord1__in=dislike_accords) |
-        Q(mainaccord2__in=dislike_accords) |
-        Q(mainaccord3__in=dislike_accords)
-    )
-    perfume_df = pd.DataFrame.from_records(perfume_qs.values())
+    catalog = get_catalog()
+    candidate_mask = catalog.accords.excluding(dislike_accords)
 
-    if perfume_df.empty:
+    if not candidate_mask.any():
         raise ValueError("❌ 필터링 후 조건에 맞는 향수가 없습니다.")
 
     # ---------------------------------------------------------
-    # 2. 사용자 의류 정보 병합: 선택한 상하의 또는 원피스 데이터를 모델 예측용 데이터프레임 만듬
+    # 2. 사용자 의류 정보 병합: 선택한 상하의 또는 원피스 데이터를 모델 예측용 컬럼으로 만듬
     # ---------------------------------------------------------
     print("\nSTEP 2: 사용자 의류 정보 병합")
-    df_row = pd.DataFrame([{}])
-
-    def merge_clothes(df, model_cls, obj_id, prefix):
-        """DB 필드에서 직접 데이터를 추출하여 셋팅 (기본값 없음)"""
-        print(f"🔍 {prefix} 병합 중 (ID: {obj_id})...")
-        clothes = model_cls.objects.get(pk=obj_id)
-
-        if prefix == "상의":
-            df["상의_카테고리"] = clothes.top_category
-            df["상의_색상"] = clothes.top_color.color  # 색상 데이터 필수
-            df["상의_소매기장"] = clothes.top_sleeve_length
-            df["상의_소재"] = clothes.top_material
-            df["상의_프린트"] = clothes.top_print
-            df["상의_넥라인"] = clothes.top_neckline
-            df["상의_핏"] = clothes.top_fit
-            df["상의_서브스타일"] = clothes.sub_style
-        elif prefix == "하의":
-            df["하의_카테고리"] = clothes.bottom_category
-            df["하의_색상"] = clothes.bottom_color.color
-            df["하의_기장"] = clothes.bottom_length
-            df["하의_소재"] = clothes.bottom_material
-            df["하의_핏"] = clothes.bottom_fit
-            df["하의_서브스타일"] = clothes.sub_style
-        elif prefix == "원피스":
-            df["원피스_기장"] = clothes.dress_length
-            df["원피스_색상"] = clothes.dress_color.color
-            df["원피스_소매기장"] = clothes.dress_sleeve_length
-            df["원피스_소재"] = clothes.dress_material
-            df["원피스_프린트"] = clothes.dress_print
-            df["원피스_핏"] = clothes.dress_fit
-            df["원피스_넥라인"] = clothes.dress_neckline
-            df["원피스_디테일"] = clothes.dress_detail
-            df["원피스_서브스타일"] = clothes.sub_style
-        return df
-
-    if user_row.top_id_id:
-        df_row = merge_clothes(df_row, TopBottom, user_row.top_id_id, "상의")
-    if user_row.bottom_id_id:
-        df_row = merge_clothes(df_row, TopBottom, user_row.bottom_id_id, "하의")
-    if user_row.dress_id_id:
-        df_row = merge_clothes(df_row, Dress, user_row.dress_id_id, "원피스")
-
-    if "상의_카테고리" in df_row.columns:
-        df_row["상의_카테고리"] = df_row["상의_카테고리"].replace({"브라탑": "탑"})
+    top, bottom, dress = load_outfit(user_row)
+    features = outfit_features(top, bottom, dress)
 
     # ---------------------------------------------------------
     # 3. 스타일 예측: 학습된 머신러닝 모델을 사용하여 현재 코디의 스타일을 예측
     # ---------------------------------------------------------
     print("\nSTEP 3: 스타일 예측")
-    if not user_row.dress_id_id:
-        model, encoder, label_encoder = model_0, encoder_0, label_encoder_0
-        df_row["색상_조합"] = df_row["상의_색상"].astype(str) + "_" + df_row["하의_색상"].astype(str)
-        df_row["핏_조합"] = df_row["상의_핏"].astype(str) + "_" + df_row["하의_핏"].astype(str)
-    else:
-        model, encoder, label_encoder = model_1, encoder_1, label_encoder_1
-
-    # 인코더를 통해 변환 후 다시 DataFrame으로 만들어 컬럼 이름표를 유지 (UserWarning 방지)
-    raw_encoded = encoder.transform(df_row[list(encoder.feature_names_in_)].astype("object"))
-    encoded_df = pd.DataFrame(raw_encoded, columns=encoder.get_feature_names_out())
-
-    # 모델 예측 실행
-    user_style = label_encoder.inverse_transform([model.predict(encoded_df)[0]])[0]
+    outfit_key = StylePrediction.make_key(user_row.top_id_id, user_row.bottom_id_id, user_row.dress_id_id)
+    user_style = lookup_styles([outfit_key]).get(outfit_key)
+    if user_style is None:
+        # 사전 계산 표에 없는 코디만 실시간 예측
+        print(f"ℹ️ 사전 계산된 스타일 없음 ({outfit_key}) → 모델 예측")
+        user_style = predict_styles([features], is_dress=bool(user_row.dress_id_id))[0]
     print(f"✅ 예측된 스타일: {user_style}")
 
     # ---------------------------------------------------------
     # 4. 스타일 기반 향수 필터링: 예측된 스타일에 어울리는 향조(Accords) 점수를 매핑하고 해당 향수만 추출
     # ---------------------------------------------------------
     print("\nSTEP 4: 스타일 기반 향수 필터링")
-    style_fragrance_score = {
-        "로맨틱": {
-            "플로럴향, 달콤한향": 7,
-            "싱그러운 풀 향": 4,
-            "머스크같은 중후한향": 2,
-            "파우더느낌의 부드러운향": 6,
-            "시원하고 신선한 바다 향": 5,
-            "감귤류의 상큼한 향": 2,
-            "라벤더같은 상쾌한향": 2,
-        },
-        "섹시": {
-            "플로럴향, 달콤한향": 5,
-            "싱그러운 풀 향": 6.5,
-            "머스크같은 중후한향": 6.5,
-            "파우더느낌의 부드러운향": 3,
-            "시원하고 신선한 바다 향": 3,
-            "감귤류의 상큼한 향": 3,
-            "라벤더같은 상쾌한향": 3,
-        },
-        "소피스트케이티드": {
-            "플로럴향, 달콤한향": 6,
-            "싱그러운 풀 향": 4,
-            "머스크같은 중후한향": 4,
-            "파우더느낌의 부드러운향": 7,
-            "시원하고 신선한 바다 향": 4,
-            "감귤류의 상큼한 향": 1.5,
-            "라벤더같은 상쾌한향": 1.5,
-        },
-        "스포티": {
-            "플로럴향, 달콤한향": 5,
-            "싱그러운 풀 향": 4,
-            "머스크같은 중후한향": 2,
-            "파우더느낌의 부드러운향": 3,
-            "시원하고 신선한 바다 향": 7,
-            "감귤류의 상큼한 향": 5,
-            "라벤더같은 상쾌한향": 2,
-        },
-        "클래식": {
-            "플로럴향, 달콤한향": 3.5,
-            "싱그러운 풀 향": 4.5,
-            "머스크같은 중후한향": 2,
-            "파우더느낌의 부드러운향": 6,
-            "시원하고 신선한 바다 향": 7,
-            "감귤류의 상큼한 향": 2,
-            "라벤더같은 상쾌한향": 3.5,
-        },
-        "젠더리스": {
-            "플로럴향, 달콤한향": 5.5,
-            "싱그러운 풀 향": 5.5,
-            "머스크같은 중후한향": 2,
-            "파우더느낌의 부드러운향": 7,
-            "시원하고 신선한 바다 향": 4,
-            "감귤류의 상큼한 향": 4,
-            "라벤더같은 상쾌한향": 2,
-        },
-        "아방가르드": {
-            "플로럴향, 달콤한향": 4,
-            "싱그러운 풀 향": 2.5,
-            "머스크같은 중후한향": 1,
-            "파우더느낌의 부드러운향": 5.5,
-            "시원하고 신선한 바다 향": 7,
-            "감귤류의 상큼한 향": 5.5,
-            "라벤더같은 상쾌한향": 2.5,
-        }
-    }
-
-    style_scores = style_fragrance_score[user_style]  # 매핑 실패 시 즉시 에러
+    style_scores = STYLE_FRAGRANCE_SCORE[user_style]  # 매핑 실패 시 즉시 에러
 
-    top_fragrances = list(style_scores.keys())
-    classification_df = pd.DataFrame.from_records(PerfumeClassification.objects.all().values())
-
-    filtered_ids = classification_df[classification_df["fragrance"].isin(top_fragrances)]["perfume_id"].unique()
-    perfume_df = perfume_df[perfume_df["perfume_id"].isin(filtered_ids)]
-    print(f"✅ 스타일 필터링 후 향수 개수: {len(perfume_df)}")
+    style_values = catalog.fragrance_values(style_scores)
+    candidate_mask &= ~np.isnan(style_values)
+    candidates = np.flatnonzero(candidate_mask)
+    print(f"✅ 스타일 필터링 후 향수 개수: {len(candidates)}")
 
     # ---------------------------------------------------------
     # 5. 색상 정보 준비: 옷과 향수의 대표 색상을 RGB 벡터화
     # ---------------------------------------------------------
     print("\nSTEP 5: 색상 점수 준비")
-    clothes_color_map = {c.color: parse_rgb(c.rgb_tuple) for c in ClothesColor.objects.all()}
-    perfume_color_map = {c.mainaccord: parse_rgb(c.color) for c in PerfumeColor.objects.all()}
-
-    # 사용자의 옷 색상 벡터 계산 (투피스 시 7:3 가중치 혼합)
+    # 옷 색상 점수는 카탈로그의 사전 계산 테이블에서 한 행을 꺼내 씁니다. (투피스는 7:3 혼합 행)
     if user_row.dress_id_id:
-        clothes_vec = clothes_color_map[df_row["원피스_색상"].iloc[0]]
+        color_row = catalog.color_table.row(dress_color=features["원피스_색상"])
     else:
-        top_rgb = clothes_color_map[df_row["상의_색상"].iloc[0]]
-        bottom_rgb = clothes_color_map[df_row["하의_색상"].iloc[0]]
-        clothes_vec = [top_rgb[i] * 0.7 + bottom_rgb[i] * 0.3 for i in range(3)]
+        color_row = catalog.color_table.row(
+            top_color=features["상의_색상"],
+            bottom_color=features["하의_색상"],
+        )
+
+    color_values = color_row[candidates]
+    if np.isnan(color_values).any():
+        raise ValueError("❌ [데이터 오류] 향조 색상 정보가 없는 향수가 있습니다.")
 
     # ---------------------------------------------------------
-    # 6. 계절 점수 계산: 사용자의 계절 설정(한글/영어 모두 대응)을 기반으로 계절 조화 점수를 미리 계산합니다.
+    # 6. 계절 점수 준비: 사용자의 계절 설정(한글/영어 모두 대응)과 향수별 계절 행렬을 준비합니다.
     # ---------------------------------------------------------
-    print("\nSTEP 6: 계절 점수 계산")
-    season_df = pd.DataFrame.from_records(PerfumeSeason.objects.all().values())
-    season_map = {
-        "봄": "spring", "여름": "summer", "가을": "fall", "겨울": "winter",
-        "spring": "spring", "summer": "summer", "fall": "fall", "winter": "winter"
-    }
-    user_season = season_map[user_row.season]
+    print("\nSTEP 6: 계절 점수 준비")
+    user_season = SEASON_MAP[user_row.season]
+    season_mat = catalog.season_shares[candidates]
+    if np.isnan(season_mat).any():
+        raise ValueError("❌ [데이터 누락] 계절 정보가 없는 향수가 있습니다.")
 
     # ---------------------------------------------------------
-    # 7. 최종 점수 합산: 개별 향수마다 스타일, 색상, 계절 점수를 합산하여 Score 객체를 생성합니다.
+    # 7. 최종 점수 합산: 후보 향수 전체의 스타일, 색상, 계절 점수를 배열로 한 번에 계산합니다.
+    #    기존 향수별 반복문과 식은 같지만 연산 방식이 달라 점수는 부동소수점 반올림 오차 범위에서만 같습니다.
+    #    (거의 동점인 향수끼리는 순서가 바뀔 수 있습니다)
     # ---------------------------------------------------------
-    print("\nSTEP 7: 최종 점수 계산 및 Score 객체 생성")
-    score_list = []
-    fragrance_dict = dict(zip(classification_df['perfume_id'], classification_df['fragrance']))
+    print("\nSTEP 7: 최종 점수 계산")
 
     # =========================
-    # 1차 패스: 원점수 수집
+    # 1차 패스: 원점수 수집 (행 단위 접근 없이 배열로 정렬)
     # =========================
-    style_raw = []
-    color_raw = []
-    season_raw = []
-    perfume_ids = []
-
-    for idx, (_, p_row) in enumerate(perfume_df.iterrows(), 1):
-        p_id = p_row["perfume_id"]
-        perfume_ids.append(p_id)
-
-        # 7-1. 스타일 점수
-        p_fragrance = fragrance_dict[p_id]
-        calc_style_score = style_scores[p_fragrance]
-        style_raw.append(calc_style_score)
-
-        # 7-2. 색상 점수
-        # Pandas DataFrame에서는 FK 필드명이 'mainaccord1_id' 형식이 됨을 유의
-        a1 = p_row["mainaccord1_id"]
-        a2 = p_row["mainaccord2_id"]
-        a3 = p_row["mainaccord3_id"]
-
-        color_vec = mix_rgb(perfume_color_map[a1], perfume_color_map[a2], perfume_color_map[a3])
-        color_score = calc_color_score(clothes_vec, color_vec)
-        color_raw.append(color_score)
-
-        # 7-3. 계절 점수
-        s_row = season_df[season_df["perfume_id"] == p_id].iloc[0]
-        total_season_val = s_row[["spring", "summer", "fall", "winter"]].sum()
-        season_score = (s_row[user_season] / total_season_val * 100) if total_season_val > 0 else 0
-        season_raw.append(season_score)
-
-    # numpy 변환
-    style_raw = np.array(style_raw).reshape(-1, 1)
-    color_raw = np.array(color_raw).reshape(-1, 1)
-    season_raw = np.array(season_raw).reshape(-1, 1)
+    perfume_ids = catalog.perfume_ids[candidates]
+    style_raw = style_values[candidates]
+    color_raw = color_values
+    season_raw = calc_season_score_array(season_mat, user_season)
 
     # =========================
-    #  MinMaxScaler 적용
+    #  Min-Max 정규화 적용
     # =========================
-    style_mm = MinMaxScaler().fit_transform(style_raw)
-    color_mm = MinMaxScaler().fit_transform(color_raw)
-    season_mm = MinMaxScaler().fit_transform(season_raw)
-
+    style_mm = minmax_scale(style_raw)[0]
+    color_mm = minmax_scale(color_raw)[0]
+    season_mm = minmax_scale(season_raw)[0]
 
     # =========================
     # 2차 패스: myscore 계산 & 저장 (ε smoothing 적용)
@@ -347,41 +363,298 @@ def myscore_cal(user_id: int) -> list[Score]:
     w_color = weight.color_weight
     w_season = weight.season_weight
 
-    for idx, p_id in enumerate(perfume_ids, 1):
-        s = (float(style_mm[idx - 1][0]) + EPS) / (1 + EPS)
-        c = (float(color_mm[idx - 1][0]) + EPS) / (1 + EPS)
-        se = (float(season_mm[idx - 1][0]) + EPS) / (1 + EPS)
-        myscore = w_style*s + w_color*c + w_season*se
+    s_arr = (style_mm + EPS) / (1 + EPS)
+    c_arr = (color_mm + EPS) / (1 + EPS)
+    se_arr = (season_mm + EPS) / (1 + EPS)
+    myscore_arr = w_style*s_arr + w_color*c_arr + w_season*se_arr
 
-        if idx <= 3:
-            print(
-                f"향수 #{idx} (ID:{p_id}): "
-                f"Style({s:.3f}) + Color({c:.3f}) + Season({se:.3f}) = {myscore:.3f}"
-            )
-
-        score_list.append(
-            Score(
-                user=user_row,
-                perfume_id=p_id,
-                style_score=s,
-                color_score=c,
-                season_score=se,
-                myscore=myscore,
-                user_style=user_style
-            )
+    for idx, p_id in enumerate(perfume_ids[:3], 1):
+        print(
+            f"향수 #{idx} (ID:{p_id}): "
+            f"Style({s_arr[idx - 1]:.3f}) + Color({c_arr[idx - 1]:.3f}) + "
+            f"Season({se_arr[idx - 1]:.3f}) = {myscore_arr[idx - 1]:.3f}"
         )
 
     # ---------------------------------------------------------
-    # 8. 리턴: myscore 기준 내림차순 정렬 후 상위 3개 객체 리스트를 반환
+    # 8. 리턴: myscore 기준 상위 k개만 골라 Score 객체로 만들어 반환 (나머지 향수는 객체를 만들지 않음)
     # ---------------------------------------------------------
-    top3 = sorted(score_list, key=lambda x: x.myscore, reverse=True)[:3]
+    top_idx = select_top_k(myscore_arr, k)
+    top_k = [
+        Score(
+            user=user_row,
+            perfume_id=int(perfume_ids[i]),
+            style_score=float(s_arr[i]),
+            color_score=float(c_arr[i]),
+            season_score=float(se_arr[i]),
+            myscore=float(myscore_arr[i]),
+            user_style=user_style
+        )
+        for i in top_idx
+    ]
 
     print(f"\n{'=' * 60}")
-    print("🏆 Top3 결과")
+    print(f"🏆 Top{k} 결과")
     print(f"{'=' * 60}")
-    for i, score in enumerate(top3, 1):
+    for i, score in enumerate(top_k, 1):
         print(f"{i}. Perfume ID: {score.perfume_id}, myscore: {score.myscore:.2f}")
 
     print(f"\n✅ myscore_cal 완료\n")
 
-    return top3
+    return top_k
+
+
+# =========================================================
+# [기능] 점수 성분 벡터 저장
+# 설명: 저장 실패가 추천 응답이나 바깥 트랜잭션을 깨지 않도록 savepoint 안에서 저장합니다.
+#       같은 카탈로그 버전으로 이미 저장된 서명은 다시 쓰지 않습니다. (벡터가 같으므로)
+# =========================================================
+def store_components(vectors_by_key, catalog_version):
+    if not vectors_by_key:
+        return
+    try:
+        existing = stored_component_keys(catalog_version, vectors_by_key.keys())
+        new_vectors = {key: v for key, v in vectors_by_key.items() if key not in existing}
+        with transaction.atomic():
+            saved = save_components(new_vectors)
+        if saved:
+            print(f"💾 점수 성분 벡터 저장: {saved}개 서명")
+    except Exception as e:
+        print(f"⚠️ 점수 성분 벡터 저장 실패 (재정렬 시 다시 계산): {e}")
+
+
+# =========================================================
+# [기능] 캐시를 거치는 추천
+# 설명: 같은 코디 서명(상의/하의/원피스 id, 계절, 비선호 향조) + 최신 Weight + 카탈로그 버전이면
+#       myscore_cal을 다시 돌리지 않고 저장된 상위 k개로 이 사용자의 Score 객체를 만들어 반환합니다.
+# =========================================================
+def latest_weight_id():
+    return Weight.objects.order_by("-weight_id").values_list("weight_id", flat=True).first()
+
+
+def recommendation_state():
+    """추천 결과를 좌우하는 전역 상태 (최신 Weight id, 카탈로그 버전)"""
+    return latest_weight_id(), get_catalog().version
+
+
+def myscore_cal_cached(user_row: UserInfo, k: int = DEFAULT_TOP_K, state=None) -> list[Score]:
+    weight_id, catalog_version = state or recommendation_state()
+    key = recommendation_cache.make_key(
+        outfit_signature(user_row, SEASON_MAP), weight_id, catalog_version, k
+    )
+
+    cached = recommendation_cache.get(key)
+    if cached is None:
+        scores = score_user(user_row, k=k)
+        cached = tuple(
+            CachedScore(
+                perfume_id=s.perfume_id,
+                style_score=s.style_score,
+                color_score=s.color_score,
+                season_score=s.season_score,
+                myscore=s.myscore,
+                user_style=s.user_style,
+            )
+            for s in scores
+        )
+        recommendation_cache.put(key, cached)
+        print(f"🧮 [추천 캐시] MISS → 계산 후 저장 {recommendation_cache.stats()}")
+    else:
+        print(f"🎯 [추천 캐시] HIT {recommendation_cache.stats()}")
+
+    return [Score(user=user_row, **entry._asdict()) for entry in cached]
+
+
+# =========================================================
+# [기능] 여러 사용자 일괄 추천 (배치)
+# 설명: 가중치 변경이나 카탈로그 재적재 후 여러 UserInfo의 추천을 다시 계산할 때 사용합니다.
+#       카탈로그/가중치는 한 번만 읽고, 사용자 × 향수 행렬로 점수를 한 번에 계산합니다.
+#       결과는 사용자별로 myscore_cal(user_id, k)와 같은 Score 목록이며,
+#       계산할 수 없는 사용자(코디 누락, 후보 없음 등)는 건너뛰고 로그만 남깁니다.
+#       persist=True면 score_store.write_scores로 저장합니다: 새 top-k에 없는 기존 Score 행만 지우고,
+#       나머지는 (user, perfume) 기준 bulk_create(update_conflicts=True) upsert로 한 트랜잭션에 씁니다.
+#       store_vectors=True면 재정렬용 점수 성분 벡터(ScoreComponents)도 서명 단위로 저장합니다. (rerank용)
+#       둘 다 False(기본값)면 DB에 아무것도 쓰지 않습니다.
+# =========================================================
+def myscore_cal_many(user_ids, k: int = DEFAULT_TOP_K, persist: bool = False,
+                     store_vectors: bool = False, batch_size: int = 500) -> dict[int, list[Score]]:
+    user_ids = list(dict.fromkeys(int(u) for u in user_ids))
+    print(f"\n🚀 myscore_cal_many 시작: 사용자 {len(user_ids)}명")
+
+    users = UserInfo.objects.in_bulk(user_ids)
+    missing = [u for u in user_ids if u not in users]
+    if missing:
+        print(f"⚠️ 존재하지 않는 사용자 {len(missing)}명 건너뜀: {missing[:10]}")
+
+    # ---------------------------------------------------------
+    # 1. 공용 데이터: 카탈로그 / 가중치 / 스타일·계절 점수 행을 한 번만 준비
+    # ---------------------------------------------------------
+    catalog = get_catalog()
+    weight = Weight.objects.order_by("-weight_id").first()
+    if weight is None:
+        raise ValueError("❌ Weight 테이블에 가중치 데이터가 없습니다.")
+
+    style_rows = {style: catalog.fragrance_values(table) for style, table in STYLE_FRAGRANCE_SCORE.items()}
+    season_rows = {season: calc_season_score_array(catalog.season_shares, season) for season in SEASON_COLUMNS}
+    season_missing = np.isnan(catalog.season_shares).any(axis=1)
+    color_missing = np.isnan(catalog.perfume_rgb).any(axis=1)
+
+    # ---------------------------------------------------------
+    # 2. 코디 조회 & 스타일 예측: 옷은 in_bulk로 한 번에, 예측은 투피스/원피스별로 한 번씩
+    # ---------------------------------------------------------
+    top_bottom_ids = {u.top_id_id for u in users.values()} | {u.bottom_id_id for u in users.values()}
+    top_bottoms = TopBottom.objects.select_related("top_color", "bottom_color").in_bulk(
+        [i for i in top_bottom_ids if i]
+    )
+    dresses = Dress.objects.select_related("dress_color").in_bulk(
+        [u.dress_id_id for u in users.values() if u.dress_id_id]
+    )
+
+    errors = {}
+    features = {}
+    for uid, user_row in users.items():
+        try:
+            top = top_bottoms[user_row.top_id_id] if user_row.top_id_id else None
+            bottom = top_bottoms[user_row.bottom_id_id] if user_row.bottom_id_id else None
+            dress = dresses[user_row.dress_id_id] if user_row.dress_id_id else None
+            features[uid] = outfit_features(top, bottom, dress)
+        except (KeyError, AttributeError) as e:
+            errors[uid] = f"코디 정보 누락 ({e!r})"
+
+    # 사전 계산된 스타일 표를 먼저 조회하고, 없는 코디만 모델로 예측합니다.
+    outfit_keys = {
+        uid: StylePrediction.make_key(users[uid].top_id_id, users[uid].bottom_id_id, users[uid].dress_id_id)
+        for uid in features
+    }
+    stored = lookup_styles(outfit_keys.values())
+    styles = {uid: stored[key] for uid, key in outfit_keys.items() if key in stored}
+    print(f"📚 스타일 사전 계산 적중: {len(styles)}/{len(features)}명")
+
+    for is_dress in (False, True):
+        group = [uid for uid in features if uid not in styles and bool(users[uid].dress_id_id) == is_dress]
+        if not group:
+            continue
+        try:
+            predicted = predict_styles([features[uid] for uid in group], is_dress=is_dress)
+        except Exception as e:
+            # 배치 예측이 실패하면 해당 그룹만 사용자 단위로 다시 시도해 원인 사용자를 가려냅니다.
+            print(f"⚠️ 스타일 일괄 예측 실패, 개별 예측으로 재시도: {e}")
+            predicted = []
+            for uid in group:
+                try:
+                    predicted.append(predict_styles([features[uid]], is_dress=is_dress)[0])
+                except Exception as inner:
+                    errors[uid] = f"스타일 예측 실패 ({inner})"
+                    predicted.append(None)
+        for uid, style in zip(group, predicted):
+            if style is not None:
+                styles[uid] = style
+
+    # ---------------------------------------------------------
+    # 3. 사용자별 행 인덱스 준비 (스타일/색상/계절/비선호 향조)
+    # ---------------------------------------------------------
+    scorable = []
+    for uid in user_ids:
+        if uid not in styles:
+            continue
+        user_row = users[uid]
+        try:
+            if user_row.dress_id_id:
+                color_idx = catalog.color_table.row_index(dress_color=features[uid]["원피스_색상"])
+            else:
+                color_idx = catalog.color_table.row_index(
+                    top_color=features[uid]["상의_색상"],
+                    bottom_color=features[uid]["하의_색상"],
+                )
+            season = SEASON_MAP[user_row.season]
+            style_row = style_rows[styles[uid]]
+        except KeyError as e:
+            errors[uid] = f"매핑 실패 ({e!r})"
+            continue
+
+        dislike_accords = (
+            [x.strip() for x in user_row.disliked_accord.split(",")]
+            if user_row.disliked_accord else []
+        )
+        scorable.append((uid, style_row, color_idx, season, catalog.accords.codes(dislike_accords)))
+
+    # ---------------------------------------------------------
+    # 4. 사용자 × 향수 행렬 계산 (batch_size명씩 끊어서 메모리 사용량 제한)
+    # ---------------------------------------------------------
+    EPS = 0.02  # ε smoothing 값 (myscore_cal과 동일)
+    n_accords = len(catalog.accord_names)
+    results = {}
+    components = {}
+
+    for start in range(0, len(scorable), batch_size):
+        chunk = scorable[start:start + batch_size]
+
+        # 비선호 향조: (U, A) 불리언 표 × 향조 역색인 → 하나라도 겹치면 제외
+        disliked = np.zeros((len(chunk), n_accords), dtype=bool)
+        for row, (_, _, _, _, codes) in enumerate(chunk):
+            disliked[row, codes] = True
+        excluded = catalog.accords.excluding_matrix(disliked)
+
+        style_raw = np.stack([style_row for _, style_row, _, _, _ in chunk])
+        color_raw = catalog.color_table.scores[[color_idx for _, _, color_idx, _, _ in chunk]]
+        season_raw = np.stack([season_rows[season] for _, _, _, season, _ in chunk])
+
+        mask = ~excluded & ~np.isnan(style_raw)
+
+        # myscore_cal과 같은 데이터 오류 검사 (후보에 색상/계절 정보가 빠진 경우)
+        no_candidates = ~mask.any(axis=1)
+        bad_color = (mask & color_missing).any(axis=1)
+        bad_season = (mask & season_missing).any(axis=1)
+
+        s_arr = (minmax_scale(style_raw, mask) + EPS) / (1 + EPS)
+        c_arr = (minmax_scale(color_raw, mask) + EPS) / (1 + EPS)
+        se_arr = (minmax_scale(season_raw, mask) + EPS) / (1 + EPS)
+        with np.errstate(invalid="ignore"):
+            myscore_mat = weight.style_weight*s_arr + weight.color_weight*c_arr + weight.season_weight*se_arr
+
+        for row, (uid, _, _, _, _) in enumerate(chunk):
+            if no_candidates[row]:
+                errors[uid] = "필터링 후 조건에 맞는 향수가 없습니다."
+                continue
+            if bad_color[row]:
+                errors[uid] = "향조 색상 정보가 없는 향수가 있습니다."
+                continue
+            if bad_season[row]:
+                errors[uid] = "계절 정보가 없는 향수가 있습니다."
+                continue
+
+            candidates = np.flatnonzero(mask[row])
+            top_idx = candidates[select_top_k(myscore_mat[row, candidates], k)]
+            if store_vectors:
+                components.setdefault(
+                    signature_key(outfit_signature(users[uid], SEASON_MAP)),
+                    ComponentVectors(
+                        catalog.version, styles[uid], catalog.perfume_ids[candidates],
+                        s_arr[row, candidates], c_arr[row, candidates], se_arr[row, candidates],
+                    ),
+                )
+            results[uid] = [
+                Score(
+                    user=users[uid],
+                    perfume_id=int(catalog.perfume_ids[i]),
+                    style_score=float(s_arr[row, i]),
+                    color_score=float(c_arr[row, i]),
+                    season_score=float(se_arr[row, i]),
+                    myscore=float(myscore_mat[row, i]),
+                    user_style=styles[uid]
+                )
+                for i in top_idx
+            ]
+
+    for uid, reason in errors.items():
+        print(f"❌ user_id={uid} 건너뜀: {reason}")
+
+    # ---------------------------------------------------------
+    # 5. 저장 (선택): 점수 성분 벡터 / 대상 사용자의 Score를 bulk upsert 한 번으로 교체
+    # ---------------------------------------------------------
+    if store_vectors:
+        store_components(components, catalog.version)
+    if persist and results:
+        write_scores(results)
+
+    print(f"✅ myscore_cal_many 완료: 성공 {len(results)}명 / 실패 {len(errors)}명\n")
+    return results
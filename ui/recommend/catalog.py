@@ -0,0 +1,201 @@
+import threading
+import time
+
+import numpy as np
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ui.models import ClothesColor, CatalogVersion
+from ui.recommend.colors import parse_rgb
+from ui.recommend.color_table import ColorScoreTable
+from ui.recommend.accord_index import AccordIndex
+from ui.recommend.perfume_features import load_feature_rows, collect_feature_rows, rebuild_perfume_features
+
+# =========================================================
+# 향수 카탈로그 스냅샷
+# 설명: 추천 계산에 필요한 향수 특징(perfume_feature)을 프로세스당 한 번만 읽어
+#       읽기 전용 numpy 배열로 보관합니다. import_* 커맨드가 CatalogVersion을 올리면
+#       다음 요청에서 새 스냅샷을 만들어 참조를 한 번에 교체합니다.
+# =========================================================
+CATALOG_NAME = "perfume"
+# perfume_feature 테이블이 어느 카탈로그 버전 기준으로 만들어졌는지 기록하는 CatalogVersion 행
+FEATURE_TABLE_NAME = "perfume_feature"
+SEASON_COLUMNS = ["spring", "summer", "fall", "winter"]
+
+# 버전 확인 쿼리 간격 (초). 이 시간 안의 요청은 DB를 보지 않고 현재 스냅샷을 사용합니다.
+VERSION_CHECK_INTERVAL = 5.0
+
+
+def _readonly(arr):
+    arr.setflags(write=False)
+    return arr
+
+
+class PerfumeCatalog:
+    """
+    불변 카탈로그 스냅샷. 모든 배열은 perfume_ids 순서(오름차순)로 정렬되어 있습니다.
+
+    - perfume_ids     : (N,) int64
+    - accord_names    : 향수들이 쓰는 향조 이름 튜플 (PerfumeColor.mainaccord)
+    - accord_ids      : (N, 3) int32, mainaccord1~3의 accord_names 인덱스 (없으면 -1)
+    - perfume_rgb     : (N, 3) float64, 6:3:1 혼합 RGB (향조 누락 시 NaN)
+    - fragrance_names : 향 분류 이름 튜플 (PerfumeClassification.fragrance)
+    - fragrance_ids   : (N,) int32, fragrance_names 인덱스 (없으면 -1)
+    - season_shares   : (N, 4) float64, spring/summer/fall/winter 행 합계 대비 비율 (누락 시 NaN)
+    - clothes_rgb     : {옷 색상 이름: (R, G, B)}
+    - color_table     : 옷 색상(단색/상하의 조합) × 향수 색상 점수 테이블
+    - accords         : 향조 → 향수 마스크 역색인 (비선호 제외/검색 필터)
+    """
+
+    def __init__(self, version, perfume_ids, accord_names, accord_ids, perfume_rgb,
+                 fragrance_names, fragrance_ids, season_shares, clothes_rgb):
+        self.version = version
+        self.perfume_ids = _readonly(perfume_ids)
+        self.accord_names = tuple(accord_names)
+        self.accord_ids = _readonly(accord_ids)
+        self.fragrance_names = tuple(fragrance_names)
+        self.fragrance_ids = _readonly(fragrance_ids)
+        self.season_shares = _readonly(season_shares)
+        self.clothes_rgb = dict(clothes_rgb)
+        self.perfume_rgb = _readonly(perfume_rgb)
+        self.color_table = ColorScoreTable(self.clothes_rgb, self.perfume_rgb)
+        self.accords = AccordIndex(self.accord_names, self.accord_ids)
+
+        self.position = {int(pid): i for i, pid in enumerate(self.perfume_ids)}
+
+    def __len__(self):
+        return len(self.perfume_ids)
+
+    def filter_perfume_ids(self, perfume_ids, include_accords=(), exclude_accords=()):
+        """
+        향수 id 목록에서 향조 조건에 맞는 것만 순서를 유지해 돌려줍니다.
+        include_accords는 모두 포함, exclude_accords는 하나도 포함하지 않아야 합니다. (카탈로그에 없는 id는 제외)
+        """
+        keep = np.ones(len(self), dtype=bool)
+        if include_accords:
+            keep &= self.accords.all_of(include_accords)
+        if exclude_accords:
+            keep &= self.accords.excluding(exclude_accords)
+        return [
+            pid for pid in perfume_ids
+            if pid in self.position and keep[self.position[pid]]
+        ]
+
+    def fragrance_values(self, score_map):
+        """{향 분류: 점수} 매핑을 향수별 점수 배열로 변환 (매핑에 없으면 NaN)"""
+        table = np.array([score_map.get(name, np.nan) for name in self.fragrance_names] + [np.nan], dtype=float)
+        # fragrance_ids == -1 은 마지막 NaN 칸을 가리킵니다.
+        return table[self.fragrance_ids]
+
+
+# =========================================================
+# [기능] 카탈로그 로딩
+# 설명: perfume_feature 한 번 + 옷 색상 한 번만 읽어 배열을 만듭니다.
+#       특징 테이블이 비어 있거나 다른 카탈로그 버전 기준이면(예: 버전을 올린 뒤 재생성 실패)
+#       오래된 특징을 쓰지 않도록 원본 테이블에서 같은 행을 계산해 씁니다.
+# =========================================================
+def load_catalog(version):
+    feature_version = current_catalog_version(name=FEATURE_TABLE_NAME)
+    feature_rows = load_feature_rows() if feature_version == version else []
+    if not feature_rows:
+        print(f"⚠️ [Catalog] perfume_feature(v{feature_version})가 카탈로그 v{version}와 맞지 않아 원본 테이블에서 계산합니다. "
+              f"(build_perfume_features 실행 필요)")
+        feature_rows = collect_feature_rows()
+    clothes_rgb = {color: parse_rgb(rgb) for color, rgb in ClothesColor.objects.values_list("color", "rgb_tuple")}
+
+    accord_names = sorted({a for row in feature_rows for a in row[1:4] if a is not None})
+    accord_index = {name: i for i, name in enumerate(accord_names)}
+
+    fragrance_names = sorted({row[4] for row in feature_rows if row[4] is not None})
+    fragrance_index = {name: i for i, name in enumerate(fragrance_names)}
+
+    n = len(feature_rows)
+    perfume_ids = np.empty(n, dtype=np.int64)
+    accord_ids = np.full((n, 3), -1, dtype=np.int32)
+    fragrance_ids = np.full(n, -1, dtype=np.int32)
+    season_shares = np.full((n, 4), np.nan)
+    perfume_rgb = np.full((n, 3), np.nan)
+
+    for i, (pid, a1, a2, a3, fragrance, *values) in enumerate(feature_rows):
+        perfume_ids[i] = pid
+        accord_ids[i] = [accord_index.get(a, -1) for a in (a1, a2, a3)]
+        fragrance_ids[i] = fragrance_index.get(fragrance, -1)
+        shares, rgb = values[:4], values[4:]
+        if None not in shares:
+            season_shares[i] = shares
+        if None not in rgb:
+            perfume_rgb[i] = rgb
+
+    return PerfumeCatalog(
+        version=version,
+        perfume_ids=perfume_ids,
+        accord_names=accord_names,
+        accord_ids=accord_ids,
+        perfume_rgb=perfume_rgb,
+        fragrance_names=fragrance_names,
+        fragrance_ids=fragrance_ids,
+        season_shares=season_shares,
+        clothes_rgb=clothes_rgb,
+    )
+
+
+# =========================================================
+# [기능] 카탈로그 버전 관리
+# =========================================================
+def current_catalog_version(using=None, name=CATALOG_NAME):
+    """using을 주면 그 DB(예: 카탈로그 복제본)에 기록된 버전을 읽습니다."""
+    manager = CatalogVersion.objects.using(using) if using else CatalogVersion.objects
+    version = (
+        manager.filter(name=name)
+        .values_list("version", flat=True)
+        .first()
+    )
+    return version or 0
+
+
+def bump_catalog_version():
+    """
+    import 커맨드가 카탈로그 테이블을 바꾼 뒤 호출합니다.
+    perfume_feature를 원본 테이블 기준으로 다시 만들고, 같은 트랜잭션에서 버전을 올려 새 버전 번호를 반환합니다.
+    """
+    with transaction.atomic():
+        CatalogVersion.objects.get_or_create(name=CATALOG_NAME)
+        # 버전 행을 먼저 잠가, 동시에 끝난 import(import_all --jobs)의 재생성이 한 번에 하나씩 실행되게 합니다.
+        CatalogVersion.objects.select_for_update().get(name=CATALOG_NAME)
+        rebuild_perfume_features()
+        CatalogVersion.objects.filter(name=CATALOG_NAME).update(
+            version=F("version") + 1, updated_at=timezone.now()
+        )
+        version = CatalogVersion.objects.get(name=CATALOG_NAME).version
+        CatalogVersion.objects.update_or_create(name=FEATURE_TABLE_NAME, defaults={"version": version})
+        return version
+
+
+_catalog = None
+_last_checked = 0.0
+_lock = threading.Lock()
+
+
+def get_catalog():
+    """
+    현재 프로세스의 카탈로그 스냅샷을 반환합니다.
+    버전이 바뀐 경우에만 다시 읽고, 완성된 스냅샷으로 참조를 통째로 교체합니다.
+    """
+    global _catalog, _last_checked
+
+    catalog = _catalog
+    now = time.monotonic()
+    if catalog is not None and now - _last_checked < VERSION_CHECK_INTERVAL:
+        return catalog
+
+    version = current_catalog_version()
+    _last_checked = now
+    if catalog is not None and catalog.version == version:
+        return catalog
+
+    with _lock:
+        if _catalog is None or _catalog.version != version:
+            print(f"📦 [Catalog] 향수 카탈로그 로딩 (version={version})")
+            _catalog = load_catalog(version)
+        return _catalog
@@ -0,0 +1,46 @@
+import numpy as np
+
+from ui.recommend.colors import calc_color_score_matrix
+
+# =========================================================
+# 옷 색상 × 향수 색상 점수 테이블
+# 설명: 옷 색상은 ClothesColor 몇십 개뿐이고 향수의 6:3:1 혼합 색상은 고정값이므로,
+#       단색(원피스) 21개 + 상하의 7:3 조합 21×21개에 대한 색상 점수를 카탈로그 로딩 시 한 번만 계산합니다.
+#       요청 시에는 행 하나를 꺼내(gather) 쓰기만 합니다.
+# =========================================================
+TOP_RATIO = 0.7
+BOTTOM_RATIO = 0.3
+
+
+class ColorScoreTable:
+    """
+    - color_names : 옷 색상 이름 튜플
+    - scores      : (C + C*C, N) float64
+                    0 ~ C-1 행은 단색, C + top*C + bottom 행은 상하의 조합 점수
+                    (혼합 색상이 없는 향수 칸은 NaN)
+    """
+
+    def __init__(self, clothes_rgb, perfume_rgb):
+        self.color_names = tuple(sorted(clothes_rgb))
+        self.color_index = {name: i for i, name in enumerate(self.color_names)}
+        n_colors = len(self.color_names)
+
+        base = np.array([clothes_rgb[name] for name in self.color_names], dtype=float).reshape(-1, 3)
+        # 상하의 조합 색상: top_rgb * 0.7 + bottom_rgb * 0.3 (calculation_v4와 같은 식)
+        pairs = (base[:, None, :] * TOP_RATIO + base[None, :, :] * BOTTOM_RATIO).reshape(-1, 3)
+        vecs = np.vstack([base, pairs])
+
+        scores = calc_color_score_matrix(vecs, perfume_rgb) if len(vecs) else np.empty((0, len(perfume_rgb)))
+        scores.setflags(write=False)
+        self.scores = scores
+        self._n_colors = n_colors
+
+    def row_index(self, dress_color=None, top_color=None, bottom_color=None):
+        """원피스면 단색 행, 투피스면 상하의 조합 행 번호 (없는 색상이면 KeyError)"""
+        if dress_color is not None:
+            return self.color_index[dress_color]
+        return self._n_colors + self.color_index[top_color] * self._n_colors + self.color_index[bottom_color]
+
+    def row(self, dress_color=None, top_color=None, bottom_color=None):
+        """(N,) 향수별 색상 점수 (읽기 전용 뷰)"""
+        return self.scores[self.row_index(dress_color, top_color, bottom_color)]
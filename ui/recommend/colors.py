@@ -0,0 +1,62 @@
+import math
+import re
+
+import numpy as np
+
+# =========================================================
+# [기능] 색상 문자열 파싱
+# 설명: DB의 '#FFFFFF' 또는 'rgb(255,255,255)' 문자열을 숫자 튜플 (R, G, B)로 변환합니다.
+# =========================================================
+def parse_rgb(x):
+    if not x:
+        raise ValueError("❌ [데이터 누락] DB에 색상 값이 비어 있는 행이 있습니다.")
+
+    x_str = str(x).strip()
+
+    # 1. 헥사코드 처리 (#CCCCCC 등)
+    if x_str.startswith('#'):
+        hex_val = x_str.lstrip('#')
+        if len(hex_val) == 6:
+            return tuple(int(hex_val[i:i+2], 16) for i in (0, 2, 4))
+        else:
+            raise ValueError(f"❌ [데이터 오류] 잘못된 헥사코드 형식: '{x_str}'")
+
+    # 2. 숫자 기반 형식 처리 (rgb(...) 또는 (r,g,b))
+    nums = list(map(int, re.findall(r"\d+", x_str)))
+    if len(nums) >= 3:
+        return tuple(nums[:3])
+
+    raise ValueError(f"❌ [데이터 오류] 지원하지 않는 색상 형식입니다: '{x_str}'.")
+
+
+# =========================================================
+# [기능] 향수 색상 혼합
+# 설명: 향수의 상위 3개 어코드 색상을 6:3:1 비율로 혼합하여 대표 RGB 벡터를 생성
+# =========================================================
+def mix_rgb(a1, a2, a3):
+    # 인덱스 에러 방지를 위한 Strict 체크
+    for idx, color in enumerate([a1, a2, a3], 1):
+        if not (isinstance(color, (tuple, list)) and len(color) >= 3):
+            raise ValueError(f"❌ [데이터 오류] {idx}번째 향조의 색상 데이터가 손상되었습니다.")
+
+    return [a1[i] * 0.6 + a2[i] * 0.3 + a3[i] * 0.1 for i in range(3)]
+
+
+# =========================================================
+# [기능] 색상 점수 계산
+# 설명: 사용자의 옷 색상 벡터와 향수의 색상 벡터 간의 유클리드 거리를 측정하여 100점 만점으로 환산
+# =========================================================
+def calc_color_score(c_vec, f_vec):
+    dist = math.sqrt(sum((a - b) ** 2 for a, b in zip(c_vec, f_vec)))
+    return 100 * (1 - dist / (255 * math.sqrt(3)))
+
+
+# =========================================================
+# [기능] 색상 점수 행렬 계산
+# 설명: (M, 3) 옷 색상 × (N, 3) 향수 색상 전체 조합의 점수를 (M, N) 행렬로 계산 (calc_color_score와 같은 식)
+# =========================================================
+def calc_color_score_matrix(c_mat, f_mat):
+    c = np.asarray(c_mat, dtype=float)
+    d = [c[:, None, ch] - f_mat[None, :, ch] for ch in range(3)]
+    dist = np.sqrt(d[0] ** 2 + d[1] ** 2 + d[2] ** 2)
+    return 100 * (1 - dist / (255 * math.sqrt(3)))
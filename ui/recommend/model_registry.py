@@ -0,0 +1,87 @@
+import os
+import resource
+import threading
+import time
+
+import joblib
+from django.conf import settings
+
+# =========================================================
+# 스타일 모델 레지스트리
+# 설명: 스타일 분류 모델/인코더 pickle을 처음 쓰일 때 한 번만 읽습니다.
+#       (import 시점에 읽지 않으므로 import_all 같은 관리 커맨드는 모델 비용을 내지 않음)
+#       joblib.load(mmap_mode="r")로 큰 numpy 배열은 파일을 메모리 매핑하여,
+#       gunicorn --preload에서 warm_up() 후 fork된 워커들이 같은 페이지를 공유합니다.
+#       (압축 저장된 pickle은 joblib이 매핑 없이 일반 로드합니다)
+# =========================================================
+BASE_PATH = os.path.join(settings.BASE_DIR, 'ui', 'recommend', 'models')
+
+# 0: 상하의(투피스)용 모델, 1: 원피스용 모델
+STYLE_MODEL_FILES = {
+    0: ("0_style_model.pkl", "0_clothes_encoder.pkl", "0_style_label_encoder.pkl"),
+    1: ("1_style_model.pkl", "1_clothes_encoder.pkl", "1_style_label_encoder.pkl"),
+}
+
+
+def _rss_mb():
+    """현재 프로세스 상주 메모리(MB). /proc이 없으면 최대 RSS로 대신합니다."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class StyleModelRegistry:
+    def __init__(self, files=STYLE_MODEL_FILES, base_path=BASE_PATH, mmap_mode="r"):
+        self.files = files
+        self.base_path = base_path
+        self.mmap_mode = mmap_mode
+        self._bundles = {}
+        self._load_info = {}
+        self._lock = threading.Lock()
+
+    def _load(self, kind):
+        start = time.perf_counter()
+        rss_before = _rss_mb()
+        bundle = tuple(
+            joblib.load(os.path.join(self.base_path, name), mmap_mode=self.mmap_mode)
+            for name in self.files[kind]
+        )
+        info = {
+            "seconds": round(time.perf_counter() - start, 3),
+            "rss_delta_mb": round(_rss_mb() - rss_before, 1),
+            "file_mb": round(sum(
+                os.path.getsize(os.path.join(self.base_path, name)) for name in self.files[kind]
+            ) / (1024 * 1024), 1),
+        }
+        print(f"🧠 [ModelRegistry] 스타일 모델 {kind} 로딩: {info}")
+        return bundle, info
+
+    def get(self, kind):
+        """(model, encoder, label_encoder) 반환. 처음 호출될 때만 파일을 읽습니다."""
+        bundle = self._bundles.get(kind)
+        if bundle is not None:
+            return bundle
+
+        with self._lock:
+            if kind not in self._bundles:
+                self._bundles[kind], self._load_info[kind] = self._load(kind)
+            return self._bundles[kind]
+
+    def warm_up(self):
+        """서빙 프로세스 시작 시 모든 모델을 미리 로드합니다. (--preload 마스터에서 호출)"""
+        for kind in self.files:
+            self.get(kind)
+        print(f"🔥 [ModelRegistry] warm-up 완료 (RSS {_rss_mb():.1f}MB)")
+
+    def stats(self):
+        return {
+            "loaded": sorted(self._bundles),
+            "load_info": dict(self._load_info),
+            "rss_mb": round(_rss_mb(), 1),
+        }
+
+
+style_models = StyleModelRegistry()
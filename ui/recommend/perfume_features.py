@@ -0,0 +1,77 @@
+import time
+
+from django.db import transaction
+
+from ui.models import (
+    Perfume, PerfumeClassification, PerfumeSeason,
+    PerfumeColor, PerfumeFeature
+)
+from ui.recommend.colors import parse_rgb, mix_rgb
+
+# =========================================================
+# 향수 특징 테이블 (perfume_feature)
+# 설명: 추천 계산에 필요한 향수 / 계절 / 분류 / 향조 색상 네 테이블을 향수당 한 행으로 합쳐 둡니다.
+#       계절 비율과 6:3:1 혼합 색상은 여기서 미리 계산하므로,
+#       카탈로그 로딩이나 분석 코드는 perfume_feature 한 번만 읽으면 됩니다.
+# =========================================================
+FEATURE_COLUMNS = (
+    "perfume_id", "mainaccord1", "mainaccord2", "mainaccord3", "fragrance",
+    "spring_share", "summer_share", "fall_share", "winter_share",
+    "rgb_r", "rgb_g", "rgb_b",
+)
+BATCH_SIZE = 2000
+
+
+def season_shares(spring, summer, fall, winter):
+    """계절 값을 행 합계 대비 비율로 변환 (합계가 0 이하면 모두 0)"""
+    # 기존 Series.sum()과 같은 덧셈 순서를 따릅니다.
+    total = spring + ((summer + fall) + winter)
+    if not total > 0:
+        return 0.0, 0.0, 0.0, 0.0
+    return spring / total, summer / total, fall / total, winter / total
+
+
+def collect_feature_rows():
+    """
+    원본 네 테이블을 한 번씩 읽어 FEATURE_COLUMNS 순서의 튜플 목록을 만듭니다. (perfume_id 오름차순)
+    향조 색상 문자열이 잘못되었으면 parse_rgb가 에러를 냅니다.
+    """
+    perfume_rows = Perfume.objects.order_by("perfume_id").values_list(
+        "perfume_id", "mainaccord1_id", "mainaccord2_id", "mainaccord3_id"
+    )
+    accord_rgb = {name: parse_rgb(color) for name, color in PerfumeColor.objects.values_list("mainaccord", "color")}
+    fragrance_map = dict(PerfumeClassification.objects.values_list("perfume_id", "fragrance"))
+    season_map = {
+        row[0]: row[1:]
+        for row in PerfumeSeason.objects.values_list("perfume_id", "spring", "summer", "fall", "winter")
+    }
+
+    rows = []
+    for pid, a1, a2, a3 in perfume_rows:
+        shares = season_shares(*season_map[pid]) if pid in season_map else (None, None, None, None)
+
+        colors = [accord_rgb.get(a) for a in (a1, a2, a3)]
+        rgb = tuple(mix_rgb(*colors)) if all(c is not None for c in colors) else (None, None, None)
+
+        rows.append((pid, a1, a2, a3, fragrance_map.get(pid), *shares, *rgb))
+    return rows
+
+
+def load_feature_rows():
+    """perfume_feature 테이블을 perfume_id 순서로 한 번에 읽습니다. (비어 있으면 빈 목록)"""
+    return list(PerfumeFeature.objects.order_by("perfume_id").values_list(*FEATURE_COLUMNS))
+
+
+def rebuild_perfume_features():
+    """perfume_feature 전체를 원본 테이블 기준으로 다시 만듭니다. 저장한 행 수를 반환합니다."""
+    start = time.perf_counter()
+    rows = collect_feature_rows()
+    features = [PerfumeFeature(**dict(zip(FEATURE_COLUMNS, row))) for row in rows]
+
+    # 전체 교체: 삭제된 향수의 행까지 한 번에 정리
+    with transaction.atomic():
+        PerfumeFeature.objects.all().delete()
+        PerfumeFeature.objects.bulk_create(features, batch_size=BATCH_SIZE)
+
+    print(f"🧱 [PerfumeFeature] {len(features)}행 생성 ({time.perf_counter() - start:.2f}s)")
+    return len(features)
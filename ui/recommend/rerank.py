@@ -0,0 +1,127 @@
+import fcntl
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db.models import Count
+
+from ui.models import UserInfo, Score, Weight
+from ui.recommend.catalog import get_catalog
+from ui.recommend.calculation_v4 import (
+    myscore_cal_many, select_top_k, SEASON_MAP, MAX_TOP_K
+)
+from ui.recommend.result_cache import outfit_signature
+from ui.recommend.score_components import signature_key, load_components
+from ui.recommend.score_store import write_scores
+
+# =========================================================
+# 가중치 변경 후 재정렬 (Incremental re-ranking)
+# 설명: 새 Weight가 생기면 Score가 있는 사용자 전체를 다시 정렬합니다.
+#       저장된 정규화 벡터(ScoreComponents)가 있는 코디 서명은 가중합 + top-k만 계산하고,
+#       벡터가 없거나 카탈로그 버전이 바뀐 서명의 사용자만 myscore_cal_many로 전체 계산합니다.
+#       k를 주지 않으면 사용자마다 기존 Score 행 수(= 저장할 때 고른 top_k)를 그대로 유지합니다.
+# =========================================================
+USER_FIELDS = ("user_id", "top_id", "bottom_id", "dress_id", "season", "disliked_accord")
+
+
+def rerank_scores(k: int | None = None) -> dict:
+    start = time.perf_counter()
+
+    weight = Weight.objects.order_by("-weight_id").first()
+    if weight is None:
+        raise ValueError("❌ Weight 테이블에 가중치 데이터가 없습니다.")
+    catalog = get_catalog()
+
+    users = list(
+        UserInfo.objects.annotate(score_count=Count("scores")).filter(score_count__gt=0).only(*USER_FIELDS)
+    )
+    user_k = {u.user_id: min(k or u.score_count, MAX_TOP_K) for u in users}
+    groups = defaultdict(list)
+    for user_row in users:
+        groups[signature_key(outfit_signature(user_row, SEASON_MAP))].append(user_row)
+
+    print(f"🔁 [Rerank] weight_id={weight.weight_id}, 사용자 {len(users)}명, 코디 서명 {len(groups)}개")
+
+    stored = load_components(catalog.version, groups.keys())
+    results = {}
+
+    # 1. 벡터가 있는 서명: 서명당 한 번 가중합 + top-k, 같은 서명 사용자에게 그대로 복사
+    for key, vectors in stored.items():
+        myscore = (
+            weight.style_weight*vectors.style
+            + weight.color_weight*vectors.color
+            + weight.season_weight*vectors.season
+        )
+        # 같은 서명 안에서 가장 큰 k로 한 번 고르고, 사용자별로 앞에서 자릅니다. (동점 순서가 같으므로 top-k와 같음)
+        top_idx = select_top_k(myscore, max(user_k[u.user_id] for u in groups[key]))
+        for user_row in groups[key]:
+            results[user_row.user_id] = [
+                Score(
+                    user=user_row,
+                    perfume_id=int(vectors.perfume_ids[i]),
+                    style_score=float(vectors.style[i]),
+                    color_score=float(vectors.color[i]),
+                    season_score=float(vectors.season[i]),
+                    myscore=float(myscore[i]),
+                    user_style=vectors.user_style,
+                )
+                for i in top_idx[:user_k[user_row.user_id]]
+            ]
+
+    # 2. 벡터가 없는 서명: 전체 파이프라인으로 계산 (이때 벡터도 저장됨)
+    missing_ids = [u.user_id for key, group in groups.items() if key not in stored for u in group]
+    if missing_ids:
+        print(f"🧮 [Rerank] 벡터 없는 사용자 {len(missing_ids)}명 전체 계산")
+        computed = myscore_cal_many(missing_ids, k=max(user_k[uid] for uid in missing_ids), store_vectors=True)
+        results.update({uid: scores[:user_k[uid]] for uid, scores in computed.items()})
+
+    report = write_scores(results)
+
+    summary = {
+        "weight_id": weight.weight_id,
+        "users": len(results),
+        "signatures": len(groups),
+        "reused_signatures": len(stored),
+        "recomputed_users": len(missing_ids),
+        "rows_written": report.rows,
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+    print(f"✅ [Rerank] 완료: {summary}")
+    return summary
+
+
+# =========================================================
+# [기능] 별도 프로세스로 실행
+# 설명: 서빙 워커 안의 스레드 대신 rerank_scores 관리 커맨드를 새 세션의 프로세스로 띄웁니다.
+#       워커가 재시작돼도 작업은 계속되고, 실패하면 커맨드가 에러 로그와 0이 아닌 종료 코드를 남깁니다.
+#       여러 번 요청되면 rerank_lock으로 한 번에 하나씩 실행됩니다. (각 실행은 시작 시점의 최신 Weight 기준)
+# =========================================================
+RERANK_LOCK_PATH = os.path.join(tempfile.gettempdir(), "rerank_scores.lock")
+
+
+@contextmanager
+def rerank_lock():
+    """같은 호스트의 rerank_scores 실행을 직렬화하는 파일 잠금 (앞선 실행이 끝날 때까지 대기)"""
+    with open(RERANK_LOCK_PATH, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def start_rerank_job():
+    """재정렬 관리 커맨드를 백그라운드 프로세스로 시작하고 바로 반환합니다."""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(settings.BASE_DIR, "manage.py"), "rerank_scores"],
+        cwd=settings.BASE_DIR,
+        stdin=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    print(f"🔁 [Rerank] 재정렬 프로세스 시작 (pid={process.pid})")
+    return process
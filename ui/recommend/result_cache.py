@@ -0,0 +1,102 @@
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+# =========================================================
+# 추천 결과 캐시
+# 설명: UserInputView는 입력을 카테고리+색상에 맞는 첫 번째 TopBottom/Dress 행으로 바꾸므로
+#       실제 입력 공간은 (상의 id, 하의 id 또는 원피스 id, 계절, 비선호 향조 집합)뿐입니다.
+#       이 서명 + 최신 Weight id + 카탈로그 버전 + k를 키로 상위 k개 점수를 LRU로 보관합니다.
+#       가중치나 카탈로그가 바뀌면 키가 달라지므로 예전 항목은 자연스럽게 밀려납니다.
+# =========================================================
+DEFAULT_CACHE_SIZE = 2048
+
+
+class OutfitSignature(NamedTuple):
+    top_id: int | None
+    bottom_id: int | None
+    dress_id: int | None
+    season: str | None
+    dislikes: frozenset
+
+
+class CachedScore(NamedTuple):
+    """Score 한 행의 값만 담은 불변 레코드 (사용자와 무관하므로 여러 사용자가 공유)"""
+    perfume_id: int
+    style_score: float
+    color_score: float
+    season_score: float
+    myscore: float
+    user_style: str
+
+
+def outfit_signature(user_row, season_map=None):
+    """UserInfo 한 행을 캐시 키용 정규화 서명으로 변환 (계절은 영문, 비선호 향조는 순서 무시)"""
+    season = user_row.season
+    if season_map is not None:
+        season = season_map.get(season, season)
+
+    dislikes = frozenset(
+        x.strip() for x in user_row.disliked_accord.split(",") if x.strip()
+    ) if user_row.disliked_accord else frozenset()
+
+    return OutfitSignature(
+        top_id=user_row.top_id_id,
+        bottom_id=user_row.bottom_id_id,
+        dress_id=user_row.dress_id_id,
+        season=season,
+        dislikes=dislikes,
+    )
+
+
+class RecommendationCache:
+    """스레드 안전 LRU 캐시. 값은 CachedScore 튜플입니다."""
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(signature, weight_id, catalog_version, k):
+        return signature, weight_id, catalog_version, k
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = tuple(value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+# 프로세스 전역 캐시 (gunicorn 워커마다 하나)
+recommendation_cache = RecommendationCache()
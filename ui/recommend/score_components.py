@@ -0,0 +1,95 @@
+import hashlib
+from typing import NamedTuple
+
+import numpy as np
+from django.db import connection
+
+from ui.models import ScoreComponents
+
+# =========================================================
+# 점수 성분 벡터 저장소
+# 설명: myscore_cal이 계산한 정규화(ε smoothing 포함) style/color/season 벡터를 코디 서명별로 저장합니다.
+#       같은 서명을 가진 사용자는 같은 벡터를 공유하므로 사용자 수가 아니라 서명 수만큼만 행이 생깁니다.
+#       Weight가 바뀌면 rerank 작업이 이 벡터로 가중합 + top-k만 다시 계산합니다.
+# =========================================================
+
+
+class ComponentVectors(NamedTuple):
+    catalog_version: int
+    user_style: str
+    perfume_ids: np.ndarray
+    style: np.ndarray
+    color: np.ndarray
+    season: np.ndarray
+
+
+def signature_key(signature):
+    """OutfitSignature → 고정 길이 키 (비선호 향조는 정렬해서 순서와 무관하게)"""
+    canonical = (
+        signature.top_id, signature.bottom_id, signature.dress_id,
+        signature.season, tuple(sorted(signature.dislikes)),
+    )
+    return hashlib.sha1(repr(canonical).encode("utf-8")).hexdigest()
+
+
+def _to_row(key, vectors):
+    return ScoreComponents(
+        signature_key=key,
+        catalog_version=vectors.catalog_version,
+        user_style=vectors.user_style,
+        perfume_ids=np.ascontiguousarray(vectors.perfume_ids, dtype=np.int64).tobytes(),
+        style_scores=np.ascontiguousarray(vectors.style, dtype=np.float64).tobytes(),
+        color_scores=np.ascontiguousarray(vectors.color, dtype=np.float64).tobytes(),
+        season_scores=np.ascontiguousarray(vectors.season, dtype=np.float64).tobytes(),
+    )
+
+
+def _from_row(row):
+    return ComponentVectors(
+        catalog_version=row.catalog_version,
+        user_style=row.user_style,
+        perfume_ids=np.frombuffer(bytes(row.perfume_ids), dtype=np.int64),
+        style=np.frombuffer(bytes(row.style_scores), dtype=np.float64),
+        color=np.frombuffer(bytes(row.color_scores), dtype=np.float64),
+        season=np.frombuffer(bytes(row.season_scores), dtype=np.float64),
+    )
+
+
+def save_components(vectors_by_key):
+    """{signature_key: ComponentVectors} 를 한 번의 bulk upsert로 저장합니다."""
+    if not vectors_by_key:
+        return 0
+
+    options = {
+        "update_conflicts": True,
+        "update_fields": [
+            "catalog_version", "user_style", "perfume_ids",
+            "style_scores", "color_scores", "season_scores", "updated_at",
+        ],
+    }
+    # MySQL은 ON DUPLICATE KEY UPDATE라 충돌 대상 컬럼을 지정할 수 없습니다.
+    if connection.features.supports_update_conflicts_with_target:
+        options["unique_fields"] = ["signature_key"]
+
+    ScoreComponents.objects.bulk_create(
+        [_to_row(key, vectors) for key, vectors in vectors_by_key.items()],
+        batch_size=200,
+        **options,
+    )
+    return len(vectors_by_key)
+
+
+def stored_component_keys(catalog_version, keys):
+    """keys 중 현재 카탈로그 버전으로 이미 저장된 서명 (벡터 blob은 읽지 않음)"""
+    return set(
+        ScoreComponents.objects.filter(catalog_version=catalog_version, signature_key__in=list(keys))
+        .values_list("signature_key", flat=True)
+    )
+
+
+def load_components(catalog_version, keys=None):
+    """현재 카탈로그 버전으로 계산된 벡터만 {signature_key: ComponentVectors} 로 반환합니다."""
+    qs = ScoreComponents.objects.filter(catalog_version=catalog_version)
+    if keys is not None:
+        qs = qs.filter(signature_key__in=list(keys))
+    return {row.signature_key: _from_row(row) for row in qs.iterator()}
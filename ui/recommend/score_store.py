@@ -0,0 +1,73 @@
+import time
+from typing import NamedTuple
+
+from django.db import connection, transaction
+
+from ui.models import Score
+from ui.results import invalidate_results
+
+# =========================================================
+# Score 저장 서비스
+# 설명: 사용자별 추천 결과를 (user, perfume) 유니크 키 기준 bulk upsert 한 번으로 저장합니다.
+#       새 결과에 없는 기존 행(이전 추천의 향수)은 같은 트랜잭션에서 id로 한 번에 지웁니다.
+#       단일 사용자 / 여러 사용자 배치 모두 같은 함수를 씁니다.
+# =========================================================
+SCORE_FIELDS = ["style_score", "color_score", "season_score", "myscore", "user_style"]
+BATCH_SIZE = 1000
+
+
+class WriteReport(NamedTuple):
+    users: int
+    rows: int
+    deleted: int
+    seconds: float
+
+
+def write_scores(scores_by_user) -> WriteReport:
+    """
+    scores_by_user: {user_id: [Score, ...]} 또는 Score 목록.
+    각 사용자의 Score 행 집합을 정확히 주어진 목록으로 맞춥니다. (빈 목록이면 모두 삭제)
+    """
+    start = time.perf_counter()
+
+    if not isinstance(scores_by_user, dict):
+        grouped = {}
+        for score in scores_by_user:
+            grouped.setdefault(score.user_id, []).append(score)
+        scores_by_user = grouped
+
+    user_ids = list(scores_by_user)
+    rows = [score for scores in scores_by_user.values() for score in scores]
+    keep = {(score.user_id, score.perfume_id) for score in rows}
+
+    options = {"update_conflicts": True, "update_fields": SCORE_FIELDS}
+    # MySQL은 ON DUPLICATE KEY UPDATE라 충돌 대상 컬럼을 지정할 수 없습니다.
+    if connection.features.supports_update_conflicts_with_target:
+        options["unique_fields"] = ["user", "perfume"]
+
+    with transaction.atomic():
+        stale_ids = [
+            score_id
+            for score_id, user_id, perfume_id in Score.objects.filter(user_id__in=user_ids)
+            .values_list("id", "user_id", "perfume_id")
+            if (user_id, perfume_id) not in keep
+        ]
+        deleted = 0
+        for i in range(0, len(stale_ids), BATCH_SIZE):
+            count, _ = Score.objects.filter(id__in=stale_ids[i:i + BATCH_SIZE]).delete()
+            deleted += count
+
+        if rows:
+            Score.objects.bulk_create(rows, batch_size=BATCH_SIZE, **options)
+
+    # 결과 페이지용 페이로드 캐시는 커밋 이후 기준으로 다시 만들도록 비웁니다.
+    transaction.on_commit(lambda: invalidate_results(user_ids))
+
+    report = WriteReport(
+        users=len(user_ids),
+        rows=len(rows),
+        deleted=deleted,
+        seconds=round(time.perf_counter() - start, 4),
+    )
+    print(f"💾 [ScoreStore] 사용자 {report.users}명 / {report.rows}행 저장, 이전 행 {report.deleted}개 삭제 ({report.seconds}s)")
+    return report
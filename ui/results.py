@@ -0,0 +1,158 @@
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+from .models import Score, UserInfo
+
+# =========================================================
+# 추천 결과 핸들 & 결과 페이로드 캐시
+# 설명: UserInputView가 추천을 저장하면 서명된 결과 핸들(user_id를 담은 토큰)을 세션에 넣습니다.
+#       결과 페이지 API들은 UserInfo.objects.last() 대신 이 핸들로 "내" 결과를 찾고,
+#       코디 이미지 + 순위별 향수 정보가 담긴 페이로드를 캐시에서 꺼내 씁니다.
+#       (캐시가 비었으면 values() 프로젝션 한 번의 쿼리로 다시 만들어 넣습니다)
+# =========================================================
+RESULT_SESSION_KEY = "result_handle"
+RESULT_HANDLE_SALT = "ui.results"
+RESULT_CACHE_TIMEOUT = 60 * 60  # 1시간
+
+
+def _cache_key(user_id):
+    return f"result_payload:{user_id}"
+
+
+def _full_url(path):
+    # 주소가 이미 전체 URL(http로 시작)인지 체크해서 처리합니다.
+    if not path:
+        return None
+    if path.startswith('http'):
+        return path
+    return f"{settings.STATIC_URL}{path}"
+
+
+# =========================================================
+# [기능] 결과 조회 빠른 경로 (values() 프로젝션 + 함수형 시리얼라이저)
+# 설명: Score → Perfume / PerfumeSeason / UserInfo 를 한 번의 JOIN 쿼리로 읽습니다.
+#       mainaccord1~3 은 PerfumeColor의 PK(향조 이름)이므로 추가 JOIN 없이 FK 컬럼 값만 씁니다.
+#       결과 개수와 상관없이 쿼리는 1번입니다. (결과가 없을 때만 코디 이미지용 UserInfo 1번 추가)
+# =========================================================
+RECOMMENDATION_RESULT_VALUES = (
+    "myscore", "user_style",
+    "perfume_id", "perfume__perfume_name", "perfume__brand", "perfume__gender",
+    "perfume__mainaccord1", "perfume__mainaccord2", "perfume__mainaccord3",
+    "perfume__season__spring", "perfume__season__summer",
+    "perfume__season__fall", "perfume__season__winter",
+    "user__top_img", "user__bottom_img", "user__dress_img",
+)
+
+SEASON_LABELS = (
+    ("Spring", "perfume__season__spring"),
+    ("Summer", "perfume__season__summer"),
+    ("Fall", "perfume__season__fall"),
+    ("Winter", "perfume__season__winter"),
+)
+
+
+def recommendation_result_rows(user_id):
+    return (
+        Score.objects.filter(user_id=user_id)
+        .order_by("-myscore")
+        .values(*RECOMMENDATION_RESULT_VALUES)
+    )
+
+
+def top_season_of(row):
+    """계절 비율이 가장 큰 계절 (동점이면 봄→여름→가을→겨울 순, 계절 정보가 없으면 None)"""
+    values = [(label, row[key]) for label, key in SEASON_LABELS]
+    if any(value is None for _, value in values):
+        return None
+    return max(values, key=lambda item: item[1])[0]
+
+
+def serialize_recommendation_row(row):
+    perfume_id = row["perfume_id"]
+    return {
+        "perfume_id": perfume_id,
+        "perfume_name": row["perfume__perfume_name"],
+        "brand": row["perfume__brand"],
+        "gender": row["perfume__gender"],
+        "myscore": row["myscore"],
+        "user_style": row["user_style"],
+        "top_season": top_season_of(row),
+        "accords": [
+            a for a in (row["perfume__mainaccord1"], row["perfume__mainaccord2"], row["perfume__mainaccord3"]) if a
+        ],
+        "image_url": f"{settings.STATIC_URL}ui/perfume_images/{perfume_id}.jpg",
+    }
+
+
+def build_result_payload(user_id):
+    """사용자의 코디 이미지와 myscore 순 향수 목록을 만듭니다. 사용자가 없으면 None."""
+    rows = list(recommendation_result_rows(user_id))
+    if rows:
+        images = (rows[0]["user__top_img"], rows[0]["user__bottom_img"], rows[0]["user__dress_img"])
+    else:
+        images = UserInfo.objects.filter(user_id=user_id).values_list("top_img", "bottom_img", "dress_img").first()
+        if images is None:
+            return None
+
+    top_img, bottom_img, dress_img = images
+    return {
+        "user_id": user_id,
+        "user_outfit": {
+            "top_img": _full_url(top_img),
+            "bottom_img": _full_url(bottom_img),
+            "onepiece_img": _full_url(dress_img),
+        },
+        "perfumes": [serialize_recommendation_row(row) for row in rows],
+    }
+
+
+def refresh_result(user_id):
+    """Score가 바뀐 뒤 호출: 페이로드를 다시 만들어 캐시에 넣습니다."""
+    payload = build_result_payload(user_id)
+    if payload is None:
+        cache.delete(_cache_key(user_id))
+    else:
+        cache.set(_cache_key(user_id), payload, RESULT_CACHE_TIMEOUT)
+    return payload
+
+
+def invalidate_results(user_ids):
+    """배치 재계산(rerank 등) 후 해당 사용자들의 캐시된 페이로드를 버립니다. 다음 조회 때 다시 만듭니다."""
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
+
+
+def make_result_handle(user_id):
+    return signing.dumps({"u": user_id}, salt=RESULT_HANDLE_SALT)
+
+
+def store_result(request, user_id):
+    """결과 페이로드를 캐시에 올리고 핸들을 세션에 저장합니다. 핸들을 반환합니다."""
+    refresh_result(user_id)
+    handle = make_result_handle(user_id)
+    request.session[RESULT_SESSION_KEY] = handle
+    request.session.modified = True
+    return handle
+
+
+def resolve_user_id(request):
+    """?handle= 쿼리 또는 세션의 핸들에서 user_id를 꺼냅니다. 없거나 위조됐으면 None."""
+    handle = request.GET.get("handle") or request.session.get(RESULT_SESSION_KEY)
+    if not handle:
+        return None
+    try:
+        return signing.loads(handle, salt=RESULT_HANDLE_SALT)["u"]
+    except (signing.BadSignature, KeyError, TypeError):
+        return None
+
+
+def resolve_result(request):
+    """현재 요청의 결과 페이로드 (캐시 우선). 핸들이 없으면 None."""
+    user_id = resolve_user_id(request)
+    if user_id is None:
+        return None
+
+    payload = cache.get(_cache_key(user_id))
+    if payload is None:
+        payload = refresh_result(user_id)
+    return payload
@@ -0,0 +1,249 @@
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+
+from .models import Perfume
+from .recommend.catalog import current_catalog_version, VERSION_CHECK_INTERVAL
+
+# =========================================================
+# MyNote 향수 검색용 트라이그램 색인
+# 설명: 향수 이름/브랜드를 소문자 + 공백/하이픈 제거로 정규화한 뒤 3글자 조각(trigram) 역색인을 만듭니다.
+#       검색어도 같은 방식으로 정규화하여 (정확 일치 > 앞부분 일치 > 부분 일치 > 조각 겹침 비율) 순으로 정렬하고,
+#       같은 순위면 평점 → 평점 수로 정렬합니다.
+#       카탈로그 버전이 바뀌면(import_perfume 등) 다음 검색 때 색인을 새로 만듭니다.
+# =========================================================
+MIN_TRIGRAM_SIMILARITY = 0.5  # 부분 일치가 아닌 결과(오타 등)는 조각이 절반 이상 겹칠 때만 포함
+
+# 자동완성: 1~3글자 접두어는 색인 생성 시 추천 목록을 미리 계산해 둡니다.
+PRECOMPUTED_PREFIX_LENGTH = 3
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_BRAND_LIMIT = 3
+
+_WORD_SPLIT = re.compile(r"[\s\-]+")
+
+
+def normalize(text):
+    # NFC: 한글이 자모 단위로 들어온 경우도 완성형으로 맞춰 같은 키가 되도록 합니다.
+    return unicodedata.normalize("NFC", text or "").lower().replace(" ", "").replace("-", "")
+
+
+def prefix_keys(text):
+    """자동완성 키: 전체 문자열 + 각 단어로 시작하는 나머지 문자열 ("bleu de chanel" → bleudechanel, dechanel, chanel)"""
+    words = [w for w in _WORD_SPLIT.split(unicodedata.normalize("NFC", text or "").lower()) if w]
+    return {"".join(words[i:]) for i in range(len(words))}
+
+
+def trigrams(text):
+    if len(text) < 3:
+        return {text} if text else set()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+# =========================================================
+# 자동완성용 접두어 트라이
+# 설명: 향수 이름/브랜드의 정규화 키를 글자 단위 트라이에 넣습니다. 각 노드는 그 접두어로 시작하는
+#       향수(doc)와 브랜드 집합을 가지므로 접두어 조회는 글자 수만큼만 내려가면 됩니다.
+#       짧은 접두어(1~3글자)는 인기순 추천 목록을 미리 만들어 두고 그대로 돌려줍니다.
+# =========================================================
+class _TrieNode:
+    __slots__ = ("children", "docs", "brands")
+
+    def __init__(self):
+        self.children = {}
+        self.docs = set()
+        self.brands = set()
+
+
+class PrefixTrie:
+    def __init__(self, perfume_ids, names, brands, ratings):
+        self.perfume_ids = perfume_ids
+        self.names = names
+        self.brands = brands
+        self.root = _TrieNode()
+
+        # 브랜드 인기도 = 소속 향수 평점 수 합계
+        self.brand_popularity = defaultdict(int)
+        for doc, brand in enumerate(brands):
+            if brand:
+                self.brand_popularity[brand] += ratings[doc][1]
+        self._doc_order = {
+            doc: rank for rank, doc in enumerate(
+                sorted(range(len(perfume_ids)), key=lambda d: (-ratings[d][1], -ratings[d][0], d))
+            )
+        }
+
+        for doc, (name, brand) in enumerate(zip(names, brands)):
+            for key in prefix_keys(name):
+                self._insert(key, doc=doc)
+            for key in prefix_keys(brand):
+                self._insert(key, doc=doc, brand=brand)
+
+        self._precomputed = {}
+        self._precompute(self.root, "")
+
+    def _insert(self, key, doc, brand=None):
+        node = self.root
+        for ch in key:
+            node = node.children.setdefault(ch, _TrieNode())
+            node.docs.add(doc)
+            if brand:
+                node.brands.add(brand)
+
+    def _precompute(self, node, prefix):
+        if prefix:
+            self._precomputed[prefix] = self._suggest(node)
+        if len(prefix) < PRECOMPUTED_PREFIX_LENGTH:
+            for ch, child in node.children.items():
+                self._precompute(child, prefix + ch)
+
+    def _suggest(self, node):
+        brands = sorted(node.brands, key=lambda b: (-self.brand_popularity[b], b))[:AUTOCOMPLETE_BRAND_LIMIT]
+        docs = sorted(node.docs, key=self._doc_order.__getitem__)[:AUTOCOMPLETE_LIMIT - len(brands)]
+        return tuple(
+            [{"type": "brand", "text": b} for b in brands]
+            + [
+                {"type": "perfume", "text": self.names[d], "brand": self.brands[d], "perfume_id": self.perfume_ids[d]}
+                for d in docs
+            ]
+        )
+
+    @property
+    def precomputed_count(self):
+        return len(self._precomputed)
+
+    def suggest(self, raw_prefix):
+        prefix = normalize(raw_prefix)
+        if not prefix:
+            return ()
+        if prefix in self._precomputed:
+            return self._precomputed[prefix]
+
+        node = self.root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return ()
+        return self._suggest(node)
+
+
+class PerfumeSearchIndex:
+    def __init__(self, version, rows):
+        """rows: (perfume_id, perfume_name, brand, rating_value, rating_count) 목록"""
+        self.version = version
+        self.perfume_ids = []
+        self.names = []
+        self.brands = []
+        self.ratings = []
+        self._norm_name = []
+        self._norm_brand = []
+        postings = defaultdict(set)
+
+        for doc, (pid, name, brand, rating_value, rating_count) in enumerate(rows):
+            self.perfume_ids.append(pid)
+            self.names.append(name)
+            self.brands.append(brand)
+            self.ratings.append((rating_value or 0.0, rating_count or 0))
+            norm_name, norm_brand = normalize(name), normalize(brand)
+            self._norm_name.append(norm_name)
+            self._norm_brand.append(norm_brand)
+            for gram in trigrams(norm_name) | trigrams(norm_brand):
+                postings[gram].add(doc)
+
+        self._postings = {gram: frozenset(docs) for gram, docs in postings.items()}
+        self._doc_by_id = {pid: doc for doc, pid in enumerate(self.perfume_ids)}
+        self.autocomplete = PrefixTrie(self.perfume_ids, self.names, self.brands, self.ratings)
+
+    def __len__(self):
+        return len(self.perfume_ids)
+
+    def _rank(self, doc, query, query_grams):
+        name, brand = self._norm_name[doc], self._norm_brand[doc]
+        if query in (name, brand):
+            tier = 3
+        elif name.startswith(query) or brand.startswith(query):
+            tier = 2
+        elif query in name or query in brand:
+            tier = 1
+        else:
+            tier = 0
+
+        doc_grams = trigrams(name) | trigrams(brand)
+        similarity = len(query_grams & doc_grams) / len(query_grams) if query_grams else 0.0
+        if tier == 0 and similarity < MIN_TRIGRAM_SIMILARITY:
+            return None
+        rating_value, rating_count = self.ratings[doc]
+        return tier, similarity, rating_value, rating_count
+
+    def search(self, raw_query, limit=20):
+        """정규화된 검색어로 순위가 매겨진 perfume_id 목록을 돌려줍니다. (limit=None이면 전부)"""
+        query = normalize(raw_query)
+        if not query:
+            return []
+
+        query_grams = trigrams(query)
+        if len(query) < 3:
+            # 1~2글자는 조각이 없으므로 부분 일치 후보를 전체에서 찾습니다.
+            candidates = [
+                doc for doc in range(len(self))
+                if query in self._norm_name[doc] or query in self._norm_brand[doc]
+            ]
+        else:
+            candidates = set()
+            for gram in query_grams:
+                candidates |= self._postings.get(gram, frozenset())
+
+        ranked = []
+        for doc in candidates:
+            rank = self._rank(doc, query, query_grams)
+            if rank is not None:
+                ranked.append((rank, doc))
+        ranked.sort(key=lambda item: (item[0], -item[1]), reverse=True)
+
+        docs = [doc for _, doc in ranked]
+        if limit is not None:
+            docs = docs[:limit]
+        return [self.perfume_ids[doc] for doc in docs]
+
+    def describe(self, perfume_id):
+        """perfume_id → (이름, 브랜드). 검색 결과 응답을 DB 조회 없이 만들 때 씁니다."""
+        doc = self._doc_by_id[perfume_id]
+        return self.names[doc], self.brands[doc]
+
+
+def build_search_index(version):
+    rows = Perfume.objects.order_by("perfume_id").values_list(
+        "perfume_id", "perfume_name", "brand", "rating_value", "rating_count"
+    )
+    return PerfumeSearchIndex(version, list(rows))
+
+
+_index = None
+_last_checked = 0.0
+_lock = threading.Lock()
+
+
+def get_search_index():
+    """
+    카탈로그 버전과 같은 버전의 검색 색인을 반환합니다. (버전이 바뀌면 다시 만듦)
+    버전 번호만 읽으므로 추천용 numpy 카탈로그는 로딩하지 않습니다. (확인은 VERSION_CHECK_INTERVAL초에 한 번)
+    """
+    global _index, _last_checked
+
+    index = _index
+    now = time.monotonic()
+    if index is not None and now - _last_checked < VERSION_CHECK_INTERVAL:
+        return index
+
+    version = current_catalog_version()
+    _last_checked = now
+    if index is not None and index.version == version:
+        return index
+
+    with _lock:
+        if _index is None or _index.version != version:
+            print(f"🔎 [Search] 향수 검색 색인 생성 (version={version})")
+            _index = build_search_index(version)
+            print(f"🔎 [Search] 자동완성 접두어 {_index.autocomplete.precomputed_count}개 사전 계산")
+        return _index
@@ -0,0 +1,84 @@
+from django.db import connection, transaction
+from django.db.models import F, Max
+
+from .models import IdSequence, UserSmellingInput
+
+# =========================================================
+# 번호 할당기 (id_sequence)
+# 설명: smelling_user_id처럼 AutoField가 아닌 "묶음 번호"를 MAX(...) + 1 대신 시퀀스 행 하나로 나눠 줍니다.
+#       MySQL은 UPDATE ... SET last_value = LAST_INSERT_ID(last_value + n) 한 문장으로
+#       행 잠금과 증가를 끝내고, 증가된 값은 같은 연결의 insert id로 바로 받습니다. (테이블 스캔 없음)
+#       count를 크게 주면 배치 import용 번호 블록을 한 번에 예약합니다.
+#       시퀀스 행이 없으면 처음 한 번만 기존 테이블의 MAX로 시작값을 정합니다.
+#       (할당 후 저장이 실패하면 그 번호는 비어 있는 채로 남습니다)
+# =========================================================
+SMELLING_USER_SEQUENCE = "smelling_user_id"
+
+# MyNote 저장 후 결과 페이지가 읽을 묶음 번호 (세션 키)
+MY_NOTE_SESSION_KEY = "my_note_smelling_user_id"
+
+
+def _max_smelling_user_id():
+    return UserSmellingInput.objects.aggregate(m=Max("smelling_user_id"))["m"] or 0
+
+
+# 시퀀스 이름 → 시퀀스 행이 없을 때 시작값(현재 최댓값)을 구하는 함수
+SEQUENCE_SEEDS = {
+    SMELLING_USER_SEQUENCE: _max_smelling_user_id,
+}
+
+
+def _ensure_sequence(name):
+    IdSequence.objects.get_or_create(name=name, defaults={"last_value": SEQUENCE_SEEDS[name]()})
+
+
+def _increment_mysql(name, count):
+    table = connection.ops.quote_name(IdSequence._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET last_value = LAST_INSERT_ID(last_value + %s) WHERE name = %s",
+            [count, name],
+        )
+        if cursor.rowcount != 1:
+            return None
+        return cursor.lastrowid
+
+
+def _increment_generic(name, count):
+    with transaction.atomic():
+        current = (
+            IdSequence.objects.select_for_update()
+            .filter(name=name)
+            .values_list("last_value", flat=True)
+            .first()
+        )
+        if current is None:
+            return None
+        IdSequence.objects.filter(name=name).update(last_value=F("last_value") + count)
+        return current + count
+
+
+def allocate_ids(name, count=1):
+    """name 시퀀스에서 연속된 번호 count개를 예약해 range로 돌려줍니다."""
+    if count < 1:
+        raise ValueError("❌ 예약할 번호 개수는 1 이상이어야 합니다.")
+
+    increment = _increment_mysql if connection.vendor == "mysql" else _increment_generic
+    last = increment(name, count)
+    if last is None:
+        _ensure_sequence(name)
+        last = increment(name, count)
+    return range(last - count + 1, last + 1)
+
+
+def next_id(name):
+    return allocate_ids(name, 1)[0]
+
+
+def advance_sequence(name, value):
+    """
+    외부에서 번호를 직접 넣은 뒤(예: CSV import) 시퀀스가 value 이상에서 이어지도록 올립니다.
+    이미 더 크면 그대로 둡니다.
+    """
+    _ensure_sequence(name)
+    IdSequence.objects.filter(name=name, last_value__lt=value).update(last_value=value)
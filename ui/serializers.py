@@ -1,6 +1,7 @@
 
 from rest_framework import serializers
 from .models import TopBottom, Dress, ClothesColor, PerfumeColor, Perfume, PerfumeSeason, PerfumeClassification, UserInfo, Score
+from .recommend.calculation_v4 import MAX_TOP_K
 
 
 # ==========================================
@@ -84,6 +85,9 @@ class UserInputSerializer(serializers.Serializer):
     recipient = serializers.CharField(required=False, allow_null=True)
     situation = serializers.CharField(required=False, allow_null=True)
 
+    # 추천 개수 (기본 3개)
+    top_k = serializers.IntegerField(required=False, min_value=1, max_value=MAX_TOP_K)
+
     def validate(self, data):
         """
         코디 정보(상의+하의 또는 원피스) 중 하나는 반드시 완성되어야 함을 검증합니다.
@@ -1,3 +1,718 @@
-from django.test import TestCase
+import os
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
 
-# Create your tests here.
+import pandas as pd
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from conf import db_router
+from conf.db_backend.stats import PoolStats
+
+from .management.commands.import_all import STAGES, _PoolExecutor
+from .management.import_engine import (
+    ForeignKeyResolver, ImportReport, bulk_upsert, read_csv_chunks, sniff_encoding, to_int, to_float, to_str,
+)
+from .models import (
+    PerfumeColor, Perfume, PerfumeSeason, PerfumeFeature, PerfumeClassification, CatalogVersion,
+    ClothesColor, TopBottom, StylePrediction, Weight, UserInfo, Score, ScoreComponents,
+    IdSequence, UserSmellingInput,
+)
+from .recommend.calculation_v4 import (
+    STYLE_FRAGRANCE_SCORE, SEASON_MAP, myscore_cal, myscore_cal_many, myscore_cal_cached, score_user,
+)
+from .recommend.catalog import bump_catalog_version, load_catalog
+from .recommend.colors import parse_rgb, mix_rgb, calc_color_score
+from .recommend.rerank import rerank_scores
+from .recommend.result_cache import RecommendationCache, outfit_signature, recommendation_cache
+from .recommend.score_store import write_scores
+from .results import build_result_payload, make_result_handle, RESULT_SESSION_KEY
+from .search import PerfumeSearchIndex
+from .sequences import (
+    allocate_ids, next_id, advance_sequence, SMELLING_USER_SEQUENCE, MY_NOTE_SESSION_KEY,
+)
+
+
+class RecommendationResultQueryCountTest(TestCase):
+    """결과 조회 빠른 경로는 결과 개수와 상관없이 쿼리 1번이어야 합니다."""
+
+    @classmethod
+    def setUpTestData(cls):
+        accords = [PerfumeColor.objects.create(mainaccord=name, color="(1, 2, 3)")
+                   for name in ("citrus", "woody", "musky")]
+        cls.perfumes = []
+        for i in range(1, 6):
+            perfume = Perfume.objects.create(
+                perfume_id=i, perfume_name=f"perfume-{i}", brand="brand", gender="unisex",
+                mainaccord1=accords[0], mainaccord2=accords[1], mainaccord3=accords[2],
+            )
+            PerfumeSeason.objects.create(perfume=perfume, spring=0.1, summer=0.2, fall=0.5, winter=0.2)
+            cls.perfumes.append(perfume)
+
+    def _user_with_scores(self, n):
+        user = UserInfo.objects.create(season="spring", top_img="ui/top.png", bottom_img="ui/bottom.png")
+        for rank, perfume in enumerate(self.perfumes[:n]):
+            Score.objects.create(user=user, perfume=perfume, myscore=1.0 - rank * 0.1, user_style="캐주얼")
+        return user
+
+    def test_single_query_regardless_of_result_size(self):
+        for n in (1, 5):
+            user = self._user_with_scores(n)
+            with self.assertNumQueries(1):
+                payload = build_result_payload(user.user_id)
+
+            self.assertEqual(len(payload["perfumes"]), n)
+            first = payload["perfumes"][0]
+            self.assertEqual(first["perfume_id"], 1)
+            self.assertEqual(first["accords"], ["citrus", "woody", "musky"])
+            self.assertEqual(first["top_season"], "Fall")
+            self.assertTrue(payload["user_outfit"]["top_img"].endswith("ui/top.png"))
+
+    def test_missing_season_gives_none(self):
+        PerfumeSeason.objects.filter(perfume_id=1).delete()
+        user = self._user_with_scores(1)
+
+        payload = build_result_payload(user.user_id)
+
+        self.assertIsNone(payload["perfumes"][0]["top_season"])
+
+
+class CatalogFeatureFreshnessTest(TestCase):
+    """카탈로그 버전을 올리면 perfume_feature도 같은 버전 기준으로 다시 만들어져야 합니다."""
+
+    @classmethod
+    def setUpTestData(cls):
+        accord = PerfumeColor.objects.create(mainaccord="citrus", color="(10, 20, 30)")
+        cls.perfume = Perfume.objects.create(
+            perfume_id=1, perfume_name="perfume-1", brand="brand", gender="unisex",
+            mainaccord1=accord, mainaccord2=accord, mainaccord3=accord,
+        )
+        PerfumeSeason.objects.create(perfume=cls.perfume, spring=1.0, summer=1.0, fall=1.0, winter=1.0)
+
+    def test_bump_rebuilds_features(self):
+        load_catalog(bump_catalog_version())
+        PerfumeSeason.objects.filter(perfume=self.perfume).update(spring=3.0)
+
+        catalog = load_catalog(bump_catalog_version())
+
+        self.assertEqual(PerfumeFeature.objects.get(perfume=self.perfume).spring_share, 0.5)
+        self.assertEqual(catalog.season_shares[0][0], 0.5)
+
+    def test_stale_feature_table_is_not_used(self):
+        version = bump_catalog_version()
+        # 원본만 바뀌고 특징 테이블은 이전 버전 기준으로 남은 경우
+        PerfumeSeason.objects.filter(perfume=self.perfume).update(spring=3.0)
+        CatalogVersion.objects.filter(name="perfume").update(version=version + 1)
+
+        catalog = load_catalog(version + 1)
+
+        self.assertEqual(catalog.season_shares[0][0], 0.5)
+
+
+class ScoringFixtureMixin:
+    """향수 6개 + 투피스 코디 1벌(스타일 사전 계산 완료) + Weight로 된 작은 추천 데이터"""
+
+    ACCORDS = {"citrus": "(250, 200, 40)", "woody": "(120, 80, 40)", "musky": "(200, 190, 180)",
+               "floral": "#F4A6C0", "aquatic": "rgb(60, 150, 220)"}
+    PERFUMES = [
+        # (향조 3개, 향 분류, 봄/여름/가을/겨울)
+        (("citrus", "aquatic", "musky"), "감귤류의 상큼한 향", (0.4, 0.9, 0.2, 0.1)),
+        (("woody", "musky", "citrus"), "머스크같은 중후한향", (0.1, 0.05, 0.7, 0.9)),
+        (("floral", "citrus", "woody"), "플로럴향, 달콤한향", (0.8, 0.3, 0.3, 0.2)),
+        (("musky", "floral", "aquatic"), "파우더느낌의 부드러운향", (0.3, 0.3, 0.3, 0.3)),
+        (("aquatic", "citrus", "floral"), "시원하고 신선한 바다 향", (0.3, 1.0, 0.1, 0.0)),
+        (("woody", "woody", "floral"), "싱그러운 풀 향", (0.0, 0.0, 0.0, 0.0)),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        accords = {name: PerfumeColor.objects.create(mainaccord=name, color=color)
+                   for name, color in cls.ACCORDS.items()}
+        for i, ((a1, a2, a3), fragrance, seasons) in enumerate(cls.PERFUMES, 1):
+            perfume = Perfume.objects.create(
+                perfume_id=i, perfume_name=f"perfume-{i}", brand="brand", gender="unisex",
+                mainaccord1=accords[a1], mainaccord2=accords[a2], mainaccord3=accords[a3],
+            )
+            PerfumeClassification.objects.create(perfume=perfume, fragrance=fragrance)
+            PerfumeSeason.objects.create(perfume=perfume, **dict(zip(("spring", "summer", "fall", "winter"), seasons)))
+
+        navy = ClothesColor.objects.create(color="네이비", rgb_tuple="(20, 30, 80)")
+        beige = ClothesColor.objects.create(color="베이지", rgb_tuple="(220, 200, 170)")
+        top = TopBottom.objects.create(top_color=navy, top_category="셔츠")
+        bottom = TopBottom.objects.create(bottom_color=beige, bottom_category="팬츠")
+        StylePrediction.objects.create(outfit_key=StylePrediction.make_key(top.id, bottom.id), style="로맨틱",
+                                       top_id=top.id, bottom_id=bottom.id)
+        cls.weight = Weight.objects.create(style_weight=0.5, color_weight=0.3, season_weight=0.2)
+        cls.user = UserInfo.objects.create(season="여름", top_id=top, bottom_id=bottom)
+        cls.top, cls.bottom = top, bottom
+        cls.top_rgb, cls.bottom_rgb = parse_rgb(navy.rgb_tuple), parse_rgb(beige.rgb_tuple)
+
+    def patch_catalog(self):
+        """프로세스 전역 카탈로그 캐시 대신 이 테스트 데이터로 만든 카탈로그를 쓰게 합니다."""
+        catalog = load_catalog(bump_catalog_version())
+        stack = ExitStack()
+        for module in ("ui.recommend.calculation_v4", "ui.recommend.rerank"):
+            stack.enter_context(mock.patch(f"{module}.get_catalog", return_value=catalog))
+        return stack
+
+
+class VectorizedScoringRegressionTest(ScoringFixtureMixin, TestCase):
+    """벡터화한 myscore는 기존 향수별 반복문 계산과 부동소수점 반올림 오차 범위에서 같아야 합니다."""
+
+    def _reference_scores(self):
+        """기존 v4 반복문 계산: 향수마다 원점수를 구하고 MinMaxScaler + ε smoothing 후 가중합"""
+        eps = 0.02
+        style_scores = STYLE_FRAGRANCE_SCORE["로맨틱"]
+        clothes_vec = [self.top_rgb[i] * 0.7 + self.bottom_rgb[i] * 0.3 for i in range(3)]
+
+        raw = []
+        for i, ((a1, a2, a3), fragrance, seasons) in enumerate(self.PERFUMES, 1):
+            f_vec = mix_rgb(*(parse_rgb(self.ACCORDS[a]) for a in (a1, a2, a3)))
+            total = sum(seasons)
+            season = seasons[1] / total * 100 if total > 0 else 0
+            raw.append((i, style_scores[fragrance], calc_color_score(clothes_vec, f_vec), season))
+
+        def scaled(values):
+            lo, hi = min(values), max(values)
+            span = hi - lo if hi - lo > 0 else 1.0
+            return [((v - lo) / span + eps) / (1 + eps) for v in values]
+
+        ids = [row[0] for row in raw]
+        s, c, se = (scaled([row[col] for row in raw]) for col in (1, 2, 3))
+        w = self.weight
+        return {pid: w.style_weight * s[j] + w.color_weight * c[j] + w.season_weight * se[j]
+                for j, pid in enumerate(ids)}
+
+    def test_matches_reference_loop(self):
+        expected = self._reference_scores()
+        with self.patch_catalog():
+            scores = myscore_cal(self.user.user_id, k=len(self.PERFUMES))
+
+        actual = {score.perfume_id: score.myscore for score in scores}
+        self.assertEqual(actual.keys(), expected.keys())
+        for pid, value in expected.items():
+            self.assertAlmostEqual(actual[pid], value, places=9)
+
+        expected_order = sorted(expected, key=lambda pid: (-expected[pid], pid))
+        self.assertEqual([score.perfume_id for score in scores], expected_order)
+
+
+
+class BatchScoringSideEffectTest(ScoringFixtureMixin, TestCase):
+    """myscore_cal_many는 persist/store_vectors를 켠 경우에만 DB에 씁니다."""
+
+    def test_preview_writes_nothing(self):
+        with self.patch_catalog():
+            results = myscore_cal_many([self.user.user_id], k=3)
+
+        self.assertEqual(len(results[self.user.user_id]), 3)
+        self.assertFalse(Score.objects.exists())
+        self.assertFalse(ScoreComponents.objects.exists())
+
+    def test_flags_write_scores_and_vectors(self):
+        with self.patch_catalog():
+            myscore_cal_many([self.user.user_id], k=3, persist=True, store_vectors=True)
+
+        self.assertEqual(Score.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(ScoreComponents.objects.count(), 1)
+
+class RerankKeepsTopKTest(ScoringFixtureMixin, TestCase):
+    """가중치 변경 후 재정렬해도 사용자마다 저장했던 Score 행 수(top_k)는 그대로여야 합니다."""
+
+    def test_rerank_keeps_each_users_row_count(self):
+        other = UserInfo.objects.create(season="겨울", top_id=self.top, bottom_id=self.bottom)
+        with self.patch_catalog():
+            write_scores({self.user.user_id: myscore_cal(self.user.user_id, k=5),
+                          other.user_id: myscore_cal(other.user_id)})
+            Weight.objects.create(style_weight=0.1, color_weight=0.1, season_weight=0.8)
+
+            # 첫 실행은 성분 벡터가 없어 전체 계산, 두 번째는 저장된 벡터를 재사용합니다.
+            for expected_reused in (0, 2):
+                summary = rerank_scores()
+                self.assertEqual(summary["reused_signatures"], expected_reused)
+                self.assertEqual(Score.objects.filter(user=self.user).count(), 5)
+                self.assertEqual(Score.objects.filter(user=other).count(), 3)
+
+
+class BuildStylePredictionsTest(TestCase):
+    """스타일 예측이 하나라도 실패하면 기존 StylePrediction 표를 지우지 않고 커맨드가 실패해야 합니다."""
+
+    @classmethod
+    def setUpTestData(cls):
+        navy = ClothesColor.objects.create(color="네이비", rgb_tuple="(20, 30, 80)")
+        cls.top = TopBottom.objects.create(top_color=navy, top_category="셔츠")
+        cls.bottom = TopBottom.objects.create(bottom_color=navy, bottom_category="팬츠")
+        StylePrediction.objects.create(outfit_key="T0-B0", style="클래식", top_id=0, bottom_id=0)
+
+    def test_failed_prediction_keeps_old_table(self):
+        with mock.patch("ui.management.commands.build_style_predictions.predict_styles",
+                        side_effect=FileNotFoundError("model.pkl")):
+            with self.assertRaises(CommandError):
+                call_command("build_style_predictions")
+
+        self.assertEqual(list(StylePrediction.objects.values_list("outfit_key", flat=True)), ["T0-B0"])
+
+    def test_success_replaces_table(self):
+        with mock.patch("ui.management.commands.build_style_predictions.predict_styles",
+                        side_effect=lambda rows, is_dress: ["로맨틱"] * len(rows)):
+            call_command("build_style_predictions")
+
+        key = StylePrediction.make_key(self.top.id, self.bottom.id)
+        self.assertEqual(dict(StylePrediction.objects.values_list("outfit_key", "style")), {key: "로맨틱"})
+
+
+def _kill_worker(name):
+    os._exit(1)
+
+
+def _finish_stage(name):
+    return name, True, 0.0, None
+
+
+class ImportAllExecutorTest(SimpleTestCase):
+    """워커 프로세스가 죽어도 그 단계만 실패하고, 이후 단계는 새 풀에서 계속 실행돼야 합니다."""
+
+    def test_dead_worker_fails_its_stage_only(self):
+        executor = _PoolExecutor(1)
+        try:
+            executor.submit(_kill_worker, "import_color")
+            [(name, ok, _, error)] = executor.next_results({"import_color"})
+            self.assertEqual((name, ok), ("import_color", False))
+            self.assertIn("워커 프로세스 오류", error)
+
+            executor.submit(_finish_stage, "import_perfume")
+            self.assertEqual(executor.next_results({"import_perfume"}), [("import_perfume", True, 0.0, None)])
+        finally:
+            executor.shutdown()
+
+    def test_smelling_score_waits_for_referenced_tables(self):
+        self.assertEqual(STAGES["import_user_smelling_score"], STAGES["import_user_smelling"])
+
+
+class PerfumeSearchIndexTest(SimpleTestCase):
+    """검색 순위(정확 > 앞부분 > 부분 > 조각 겹침)와 자동완성 트라이"""
+
+    ROWS = [
+        (1, "Rose", "Byredo", 4.0, 10),
+        (2, "Rose Noir", "Tom Ford", 4.5, 300),
+        (3, "Tea Rose", "Diptyque", 4.8, 900),
+        (4, "Rosewood", "Tom Ford", 3.9, 500),
+        (5, "Sauvage", "Dior", 4.2, 800),
+    ]
+
+    def setUp(self):
+        self.index = PerfumeSearchIndex(1, self.ROWS)
+
+    def test_tiers_then_rating(self):
+        # 정확 일치(1) > 앞부분 일치(2, 4: 평점 순) > 부분 일치(3)
+        self.assertEqual(self.index.search("rose"), [1, 2, 4, 3])
+        self.assertEqual(self.index.search("Tom-Ford"), [2, 4])
+
+    def test_trigram_threshold(self):
+        # "rosx": 조각 {ros, osx} 중 절반이 겹치므로 포함, "rosxyz": 1/4만 겹치므로 제외
+        self.assertIn(1, self.index.search("rosx"))
+        self.assertEqual(self.index.search("rosxyz"), [])
+
+    def test_short_query_uses_substring_scan(self):
+        self.assertEqual(self.index.search("au"), [5])
+
+    def test_autocomplete_prefixes(self):
+        trie = self.index.autocomplete
+        # 1~3글자 접두어는 미리 계산된 목록을 그대로 돌려줍니다. (정규화 후 같은 객체)
+        self.assertIs(trie.suggest("Ro"), trie.suggest("ro"))
+        self.assertIs(trie.suggest("t"), trie.suggest("T"))
+        self.assertIsNot(trie.suggest("rose"), trie.suggest("rose"))
+
+        self.assertEqual(trie.suggest("t")[0], {"type": "brand", "text": "Tom Ford"})
+        # 단어 단위 키: "Tea Rose"도 "rose"로 시작하는 키를 가집니다.
+        self.assertEqual({s["perfume_id"] for s in trie.suggest("rose")}, {1, 2, 3, 4})
+        self.assertEqual([s["perfume_id"] for s in trie.suggest("rosen")], [2])
+        self.assertEqual(trie.suggest("zzz"), ())
+
+
+class IdSequenceTest(TestCase):
+    """id_sequence 번호 할당: 처음에는 기존 테이블 MAX에서 시작하고, 이후에는 시퀀스 행만 증가합니다."""
+
+    def test_seeds_from_table_max(self):
+        UserSmellingInput.objects.create(smelling_user_id=7)
+        UserSmellingInput.objects.create(smelling_user_id=3)
+
+        self.assertEqual(next_id(SMELLING_USER_SEQUENCE), 8)
+        # 시퀀스 행이 생긴 뒤에는 테이블에 더 큰 번호가 들어와도 MAX를 다시 읽지 않습니다.
+        UserSmellingInput.objects.create(smelling_user_id=100)
+        self.assertEqual(next_id(SMELLING_USER_SEQUENCE), 9)
+
+    def test_block_allocation(self):
+        self.assertEqual(list(allocate_ids(SMELLING_USER_SEQUENCE, 3)), [1, 2, 3])
+        self.assertEqual(list(allocate_ids(SMELLING_USER_SEQUENCE, 2)), [4, 5])
+        self.assertEqual(IdSequence.objects.get(name=SMELLING_USER_SEQUENCE).last_value, 5)
+        with self.assertRaises(ValueError):
+            allocate_ids(SMELLING_USER_SEQUENCE, 0)
+
+    def test_advance_only_moves_forward(self):
+        advance_sequence(SMELLING_USER_SEQUENCE, 50)
+        advance_sequence(SMELLING_USER_SEQUENCE, 20)
+        self.assertEqual(next_id(SMELLING_USER_SEQUENCE), 51)
+
+
+class MyNoteResultViewTest(TestCase):
+    """MyNote 결과 화면은 세션에 저장된 번호의 묶음만 보여줍니다."""
+
+    @classmethod
+    def setUpTestData(cls):
+        UserSmellingInput.objects.create(smelling_user_id=1, brand="mine", top_img="ui/top.png")
+        UserSmellingInput.objects.create(smelling_user_id=2, brand="someone-else", top_img="ui/top.png")
+
+    def test_uses_session_id(self):
+        session = self.client.session
+        session[MY_NOTE_SESSION_KEY] = 1
+        session.save()
+
+        response = self.client.get(reverse("my_note_result"))
+        self.assertEqual([note["brand"] for note in response.context["mynote_list"]], ["mine"])
+
+    def test_without_session_shows_nothing(self):
+        response = self.client.get(reverse("my_note_result"))
+        self.assertEqual(response.context["mynote_list"], [])
+
+
+class RecommendationCacheTest(ScoringFixtureMixin, TestCase):
+    """코디 서명 + Weight + 카탈로그 버전 + k 기준 LRU 추천 캐시"""
+
+    def setUp(self):
+        recommendation_cache.clear()
+
+    def test_lru_eviction(self):
+        cache = RecommendationCache(maxsize=2)
+        cache.put("a", [1])
+        cache.put("b", [2])
+        self.assertEqual(cache.get("a"), (1,))  # a를 최근 사용으로 올림
+        cache.put("c", [3])
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), (3,))
+        self.assertEqual(cache.stats()["size"], 2)
+        self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (2, 1))
+
+    def test_signature_ignores_dislike_order_and_season_language(self):
+        a = UserInfo(season="여름", disliked_accord="woody, citrus", top_id=self.top, bottom_id=self.bottom)
+        b = UserInfo(season="summer", disliked_accord="citrus,woody", top_id=self.top, bottom_id=self.bottom)
+        self.assertEqual(outfit_signature(a, SEASON_MAP), outfit_signature(b, SEASON_MAP))
+
+    def test_same_signature_is_scored_once(self):
+        other = UserInfo.objects.create(season="summer", top_id=self.top, bottom_id=self.bottom)
+        with self.patch_catalog(), \
+                mock.patch("ui.recommend.calculation_v4.score_user", wraps=score_user) as scored:
+            first = myscore_cal_cached(self.user)
+            second = myscore_cal_cached(other)
+            # 가중치가 바뀌면 키가 달라져 다시 계산합니다.
+            Weight.objects.create(style_weight=1.0, color_weight=0.0, season_weight=0.0)
+            myscore_cal_cached(other)
+
+        self.assertEqual(scored.call_count, 2)
+        self.assertEqual([s.perfume_id for s in first], [s.perfume_id for s in second])
+        self.assertTrue(all(s.user == other for s in second))
+
+
+class WriteScoresTest(TestCase):
+    """write_scores는 사용자별 Score 행 집합을 주어진 목록과 정확히 같게 맞춥니다. (지울 행만 삭제 + upsert)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        accord = PerfumeColor.objects.create(mainaccord="citrus", color="(1, 2, 3)")
+        for i in range(1, 5):
+            Perfume.objects.create(perfume_id=i, perfume_name=f"perfume-{i}", brand="brand", gender="unisex",
+                                   mainaccord1=accord, mainaccord2=accord, mainaccord3=accord)
+        cls.user = UserInfo.objects.create(season="spring")
+        cls.other = UserInfo.objects.create(season="fall")
+
+    def _score(self, user, perfume_id, myscore):
+        return Score(user=user, perfume_id=perfume_id, myscore=myscore, style_score=0.5,
+                     color_score=0.5, season_score=0.5, user_style="캐주얼")
+
+    def _rows(self, user):
+        return dict(Score.objects.filter(user=user).values_list("perfume_id", "myscore"))
+
+    def test_replaces_user_rows_in_place(self):
+        write_scores([self._score(self.user, p, 0.1) for p in (1, 2, 3)])
+        write_scores([self._score(self.other, 1, 0.9)])
+        kept_id = Score.objects.get(user=self.user, perfume_id=2).id
+
+        with mock.patch("ui.recommend.score_store.invalidate_results") as invalidate, \
+                self.captureOnCommitCallbacks(execute=True):
+            report = write_scores({self.user.user_id: [self._score(self.user, 2, 0.7),
+                                                       self._score(self.user, 4, 0.8)]})
+
+        self.assertEqual(self._rows(self.user), {2: 0.7, 4: 0.8})
+        self.assertEqual(Score.objects.get(user=self.user, perfume_id=2).id, kept_id)  # 기존 행을 갱신
+        self.assertEqual(self._rows(self.other), {1: 0.9})  # 다른 사용자는 그대로
+        self.assertEqual((report.users, report.rows, report.deleted), (1, 2, 2))
+        invalidate.assert_called_once_with([self.user.user_id])
+
+    def test_empty_list_clears_user(self):
+        write_scores([self._score(self.user, 1, 0.1)])
+        write_scores({self.user.user_id: []})
+        self.assertEqual(self._rows(self.user), {})
+
+
+class ScoreViewWriteTest(ScoringFixtureMixin, TestCase):
+    """ScoreView는 트랜잭션 밖에서 계산하고, 계산 중 가중치가 바뀌면 최신 가중치로 다시 계산해 저장합니다."""
+
+    def setUp(self):
+        recommendation_cache.clear()
+
+    def test_scores_outside_transaction_and_retries_on_weight_change(self):
+        outer_depth = len(connection.atomic_blocks)  # 테스트 자체의 트랜잭션
+        depths = []
+
+        def score_then_change_weight(user_row, k, state):
+            depths.append(len(connection.atomic_blocks))
+            scores = myscore_cal_cached(user_row, k=k, state=state)
+            if len(depths) == 1:
+                Weight.objects.create(style_weight=0.0, color_weight=0.0, season_weight=1.0)
+            return scores
+
+        with self.patch_catalog(), \
+                mock.patch("ui.api_views.myscore_cal_cached", side_effect=score_then_change_weight):
+            response = self.client.post(reverse("recommendation"), {"user_id": self.user.user_id, "k": 4})
+            expected = myscore_cal(self.user.user_id, k=4)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["rows_written"], 4)
+        self.assertEqual(depths, [outer_depth, outer_depth])
+        # 저장된 점수는 두 번째(최신 가중치) 계산 결과입니다.
+        self.assertEqual(
+            dict(Score.objects.filter(user=self.user).values_list("perfume_id", "myscore")),
+            {s.perfume_id: s.myscore for s in expected},
+        )
+
+
+class ResultHandleTest(TestCase):
+    """결과 API는 서명된 결과 핸들이 가리키는 사용자의 결과만 돌려줍니다. (최근 사용자로 대체하지 않음)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.mine = UserInfo.objects.create(season="spring", top_img="ui/mine.png")
+        UserInfo.objects.create(season="fall", top_img="ui/latest.png")
+
+    def setUp(self):
+        cache.clear()
+
+    def _outfit(self, **params):
+        return self.client.get(reverse("user-outfit"), params)
+
+    def test_query_handle(self):
+        response = self._outfit(handle=make_result_handle(self.mine.user_id))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["top_img"].endswith("ui/mine.png"))
+
+    def test_session_handle(self):
+        session = self.client.session
+        session[RESULT_SESSION_KEY] = make_result_handle(self.mine.user_id)
+        session.save()
+        self.assertTrue(self._outfit().json()["top_img"].endswith("ui/mine.png"))
+
+    def test_missing_or_forged_handle(self):
+        self.assertEqual(self._outfit().status_code, 404)
+        self.assertEqual(self._outfit(handle=make_result_handle(self.mine.user_id) + "x").status_code, 404)
+        # 다른 salt로 서명한 값도 받지 않습니다.
+        self.assertEqual(self._outfit(handle=signing.dumps({"u": self.mine.user_id})).status_code, 404)
+
+
+class DbPoolStatsTest(TestCase):
+    """지속 연결 통계: 재사용 비율/대기 시간 계산과 관리자 전용 조회 API"""
+
+    def test_snapshot(self):
+        stats = PoolStats()
+        stats.record_connect(0.02)
+        stats.add(in_use=1)
+        stats.add(in_use=-1, reuses=3, health_checks=3, health_check_failures=1)
+
+        snapshot = stats.snapshot()
+        self.assertEqual((snapshot["open"], snapshot["in_use"], snapshot["idle"]), (1, 0, 1))
+        self.assertEqual(snapshot["reuse_ratio"], 0.75)
+        self.assertEqual(snapshot["avg_connect_ms"], 20.0)
+        self.assertEqual(snapshot["avg_wait_ms"], 5.0)  # 재사용 3번은 대기 0
+        self.assertEqual(snapshot["health_check_failures"], 1)
+
+    def test_api_is_admin_only(self):
+        url = reverse("db-pool-stats")
+        self.assertIn(self.client.get(url).status_code, (401, 403))
+
+        admin = get_user_model().objects.create_user("ops", password="pw", is_staff=True)
+        self.client.force_login(admin)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("reuse_ratio", response.json()["pool"])
+
+
+class CatalogReplicaRouterTest(SimpleTestCase):
+    """카탈로그 복제본은 MySQL과 버전이 같을 때만 읽기에 쓰고, 버전 확인은 간격마다 한 번만 합니다."""
+
+    def setUp(self):
+        self.versions = {None: 3, db_router.REPLICA_ALIAS: 3}
+        patches = [
+            mock.patch.multiple(db_router, _enabled=True, _fresh=False, _last_checked=0.0),
+            mock.patch("ui.recommend.catalog.current_catalog_version", side_effect=self._version),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.router = db_router.CatalogReplicaRouter()
+
+    def _version(self, using=None):
+        version = self.versions[using]
+        if isinstance(version, Exception):
+            raise version
+        return version
+
+    def _expire(self):
+        db_router._last_checked = 0.0
+
+    def test_fresh_replica_serves_catalog_reads_only(self):
+        self.assertEqual(self.router.db_for_read(Perfume), db_router.REPLICA_ALIAS)
+        self.assertIsNone(self.router.db_for_read(Score))
+
+    def test_stale_replica_falls_back_after_interval(self):
+        self.assertEqual(self.router.db_for_read(Perfume), db_router.REPLICA_ALIAS)
+
+        self.versions[None] = 4  # import로 MySQL 카탈로그 버전이 올라감
+        self.assertEqual(self.router.db_for_read(Perfume), db_router.REPLICA_ALIAS)  # 확인 간격 안에서는 그대로
+        self._expire()
+        self.assertEqual(self.router.db_for_read(Perfume), "default")
+
+    def test_check_failure_or_catalog_write_disables_replica(self):
+        self.versions[db_router.REPLICA_ALIAS] = RuntimeError("no such table")
+        self.assertEqual(self.router.db_for_read(Perfume), "default")
+        self.assertFalse(db_router._enabled)
+
+        db_router._enabled = True
+        self._expire()
+        self.versions[db_router.REPLICA_ALIAS] = 3
+        self.assertEqual(self.router.db_for_write(Perfume), "default")
+        self.assertEqual(self.router.db_for_read(Perfume), "default")
+
+
+class ImportEngineUpsertTest(TestCase):
+    """CSV import 공용 엔진: 컬럼 단위 변환과 청크 upsert (청크가 실패하면 행 단위 재시도)"""
+
+    def test_column_converters(self):
+        raw = pd.Series(["100026.0", " 7 ", "abc", None, ""])
+        self.assertEqual(list(to_int(raw)), [100026, 7, None, None, None])
+        self.assertEqual(list(to_int(raw, default=0)), [100026, 7, 0, 0, 0])
+        self.assertEqual(list(to_float(pd.Series(["2,89", "x"]), default=0.0, decimal_comma=True)), [2.89, 0.0])
+        self.assertEqual(list(to_float(pd.Series(["1,234"]))), [1234.0])
+        self.assertEqual(list(to_str(pd.Series([" a ", "  ", None]))), ["a", None, None])
+
+    def test_upsert_inserts_and_updates(self):
+        fields = ["style_weight", "color_weight", "season_weight"]
+        bulk_upsert(Weight, [Weight(weight_id=1, style_weight=1.0, color_weight=1.0, season_weight=1.0)], fields)
+
+        report = ImportReport(Weight._meta.db_table)
+        written = bulk_upsert(Weight, [
+            Weight(weight_id=1, style_weight=0.5, color_weight=0.3, season_weight=0.2),
+            Weight(weight_id=2, style_weight=0.1, color_weight=0.1, season_weight=0.8),
+        ], fields, report=report)
+
+        self.assertEqual((written, report.written, report.failed), (2, 2, 0))
+        self.assertEqual(Weight.objects.get(weight_id=1).style_weight, 0.5)
+        self.assertEqual(Weight.objects.count(), 2)
+
+    def test_failed_chunk_retries_row_by_row(self):
+        report = ImportReport(Weight._meta.db_table)
+        written = bulk_upsert(Weight, [
+            Weight(weight_id=1, style_weight=0.5, color_weight=0.3, season_weight=0.2),
+            Weight(weight_id=2, style_weight=None, color_weight=0.3, season_weight=0.2),  # NOT NULL 위반
+            Weight(weight_id=3, style_weight=0.1, color_weight=0.1, season_weight=0.8),
+        ], ["style_weight", "color_weight", "season_weight"], report=report, chunk_size=10)
+
+        self.assertEqual((written, report.failed), (2, 1))
+        self.assertEqual(sorted(Weight.objects.values_list("weight_id", flat=True)), [1, 3])
+
+
+class CsvChunkReadTest(TestCase):
+    """CSV는 인코딩을 한 번만 판별하고 chunk_rows행씩 읽습니다. (청크로 나눠도 import 결과는 같음)"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+
+    def _write(self, name, text, encoding):
+        path = self.dir / name
+        path.write_text(text, encoding=encoding)
+        return path
+
+    def test_chunks_and_clean_columns(self):
+        path = self._write("a.csv", " perfume_id ,spring\n" + "".join(f"{i},0.{i}\n" for i in range(1, 6)), "utf-8-sig")
+
+        chunks = list(read_csv_chunks(path, chunk_rows=2))
+        self.assertEqual([len(df) for df in chunks], [2, 2, 1])
+        self.assertEqual(list(chunks[0].columns), ["perfume_id", "spring"])
+        self.assertEqual(len(next(read_csv_chunks(path, chunk_rows=0))), 5)
+
+    def test_sniff_encoding(self):
+        korean = "계절,이름\n봄,장미\n"
+        self.assertEqual(sniff_encoding(self._write("cp.csv", korean, "cp949")), "cp949")
+        # 블록 경계에서 멀티바이트 글자가 잘려도 UTF-8로 판별합니다.
+        with mock.patch("ui.management.import_engine.SNIFF_BLOCK_BYTES", 1):
+            self.assertEqual(sniff_encoding(self._write("u8.csv", korean, "utf-8")), "utf-8-sig")
+
+    def test_import_season_in_one_row_chunks(self):
+        accord = PerfumeColor.objects.create(mainaccord="citrus", color="(1, 2, 3)")
+        for pid in (1, 2):
+            Perfume.objects.create(perfume_id=pid, perfume_name=f"p{pid}", brand="b", gender="unisex",
+                                   mainaccord1=accord, mainaccord2=accord, mainaccord3=accord)
+        self._write("perfume_seasons.csv",
+                    "perfume_id,spring,summer,fall,winter\n1,1,0,0,0\n2,\"92,5\",0,0,0\n99,1,1,1,1\n1,0,1,0,0\n",
+                    "utf-8")
+
+        with override_settings(BASE_DIR=self.dir):
+            call_command("import_season", chunk_rows=1)
+
+        rows = {row[0]: row[1:] for row in PerfumeSeason.objects.values_list("perfume_id", "spring", "summer")}
+        self.assertEqual(rows, {1: (0.0, 1.0), 2: (92.5, 0.0)})  # 같은 ID는 마지막 행, 없는 향수 99는 건너뜀
+
+
+class ForeignKeyResolverTest(TestCase):
+    """참조 키는 import마다 한 번만 읽고, 청크 확인은 메모리에서 합니다. (없는 키는 생성하거나 None + 요약)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        PerfumeColor.objects.create(mainaccord="citrus", color="(1, 2, 3)")
+        ClothesColor.objects.create(color="네이비", rgb_tuple="(20, 30, 80)")
+
+    def test_missing_keys_become_none_and_are_reported(self):
+        resolver = ForeignKeyResolver(ClothesColor)
+        with self.assertNumQueries(0):
+            # import 커맨드와 같이 to_str로 정제한 컬럼을 넘깁니다.
+            resolved = resolver.resolve(to_str(pd.Series(["네이비", "핑크", None, "핑크"])), "상의_색상")
+            mask = resolver.exists(to_str(pd.Series(["네이비", "민트", None])), "하의_색상")
+
+        self.assertEqual(list(resolved), ["네이비", None, None, None])
+        self.assertEqual(list(mask), [True, False, False])
+        self.assertEqual(resolver.unresolved, {"상의_색상": [2, ["핑크"]], "하의_색상": [1, ["민트"]]})
+
+    def test_create_adds_missing_keys_in_one_insert(self):
+        resolver = ForeignKeyResolver(PerfumeColor, create=lambda name: PerfumeColor(mainaccord=name, color="#CCCCCC"))
+        with self.assertNumQueries(1):
+            resolved = resolver.resolve(to_str(pd.Series(["citrus", "woody", "musky", "woody"])), "mainaccord1")
+
+        self.assertEqual(list(resolved), ["citrus", "woody", "musky", "woody"])
+        self.assertEqual(resolver.created, 2)
+        self.assertEqual(set(PerfumeColor.objects.values_list("mainaccord", flat=True)), {"citrus", "woody", "musky"})
+        with self.assertNumQueries(0):
+            resolver.resolve(to_str(pd.Series(["woody"])), "mainaccord2")
+
+    def test_report_reuses_resolver(self):
+        report = ImportReport("perfume")
+        self.assertIs(report.resolver(PerfumeColor), report.resolver(PerfumeColor))
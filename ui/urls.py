@@ -41,14 +41,17 @@ urlpatterns = [
     path('api/perfume-top3-images/', api_views.PerfumeTop3ImageAPI.as_view(), name='perfume-top3-images'),
     path('api/recommendation-results/', api_views.RecommendationResultAPIView.as_view(), name='recommendation-results'),
     path('api/recommendation-summary/', api_views.RecommendationSummaryAPIView.as_view(),  name='recommendation-summary'),
+    path('api/result-page/', api_views.ResultPageAPIView.as_view(), name='result-page'),
     path('api/my-note/style/', MyNoteStyleAPIView.as_view(), name='my-note-style'),
     path('api/my-note/perfume/cart/', api_views.MyNotePerfumeCartAPIView.as_view()),
     path('api/my-note/perfume/search/', api_views.MyNotePerfumeSearchAPIView.as_view()),
+    path('api/my-note/perfume/autocomplete/', api_views.MyNotePerfumeAutocompleteAPIView.as_view()),
     path("api/my-note/perfume/complete/", MyNotePerfumeCompleteAPIView.as_view()),
     path('api/someone-summary/', SomeoneSummaryAPIView.as_view(), name='someone-summary'),
     path('api/gift-message/', GiftMessageAPIView.as_view(), name='gift-message'),
     path("my-note/result/", views.my_note_result, name="my_note_result"),
     path("api/my-note/filter-images/", api_views.MyNoteFilterImagesAPIView.as_view()),
+    path('api/ops/db-pool/', api_views.DbPoolStatsAPIView.as_view(), name='db-pool-stats'),
 
     # ==========================================
     # 4. 데이터 API 라우터 연결
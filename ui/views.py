@@ -1,9 +1,11 @@
 
 from django.shortcuts import render
 from .models import UserSmellingInput
+from .sequences import MY_NOTE_SESSION_KEY
 from django.shortcuts import redirect
 from django.views.decorators.http import require_POST
 from ui.recommend.weight_cal import find_best_weights
+from ui.recommend.rerank import start_rerank_job
 from ui.models import Weight
 
 # ==========================================
@@ -35,26 +37,24 @@ def my_note_style(request):
 def my_note_perfume(request):
     return render(request, "ui/my_note_perfume.html")
 
+# 아직 저장된 MyNote가 없는 경우의 결과 화면
+EMPTY_MY_NOTE_CONTEXT = {
+    "onepiece_img": None,
+    "top_img": None,
+    "bottom_img": None,
+    "mynote_list": [],
+}
+
+
 def my_note_result(request):
     # =========================
-    # 1. 가장 최근 smelling_user_id
+    # 1. 방금 저장한 smelling_user_id (저장 API가 id_sequence로 받아 세션에 넣어 둔 번호)
+    #    세션에 없으면 MAX 조회로 다른 사람의 최근 MyNote를 보여주지 않고 빈 결과를 보여줍니다.
     # =========================
-    last_row = (
-        UserSmellingInput.objects
-        .order_by("-smelling_user_id")
-        .first()
-    )
-
-    if not last_row:
-        # 아직 저장된 MyNote가 없는 경우
-        return render(request, "ui/my_note_result.html", {
-            "onepiece_img": None,
-            "top_img": None,
-            "bottom_img": None,
-            "mynote_list": [],
-        })
-
-    smelling_user_id = last_row.smelling_user_id
+    smelling_user_id = request.session.get(MY_NOTE_SESSION_KEY)
+    if smelling_user_id is None:
+        # 이 세션에서 아직 저장한 MyNote가 없는 경우
+        return render(request, "ui/my_note_result.html", EMPTY_MY_NOTE_CONTEXT)
 
     # =========================
     # 2. 같은 MyNote 묶음 전체
@@ -71,6 +71,8 @@ def my_note_result(request):
     bottom_img = None
 
     style_row = rows.first()
+    if style_row is None:
+        return render(request, "ui/my_note_result.html", EMPTY_MY_NOTE_CONTEXT)
 
     if style_row.dress_img:
         onepiece_img = style_row.dress_img
@@ -109,4 +111,7 @@ def complete_and_update_weight(request):
         season_weight=w_season,
     )
 
+    # 기존 사용자 Score를 새 가중치로 재정렬 (별도 프로세스에서 rerank_scores 커맨드 실행)
+    start_rerank_job()
+
     return redirect("home")